@@ -2,12 +2,27 @@ import os
 import sys
 import subprocess
 import json
+import hashlib
 from functools import lru_cache  # Memory caching
-from flask import Blueprint, jsonify, request, current_app
+from flask import Blueprint, jsonify, request, current_app, Response, stream_with_context, url_for
 import webview
-from jinja2 import Environment, FileSystemLoader
 import threading
-from services.section_calculator import calculate_section_properties
+from services.section_cache import cached_section_properties, load_section, section_image, section_image_png, section_shape_hash
+from services.section_batch import (
+    section_param_hash, iter_section_batch, submit_section_job, section_job_state, wait_section_result,
+    resolve_pending_sections
+)
+from services.section_analytic import analytic_section_properties
+from services.section_catalogue import FAMILIES, search_profiles, find_profile, profile_section_properties, catalogue_section_properties
+from services.section_workers import SectionTimeoutError
+from services.simulation_scheduler import get_simulation_scheduler, ACTIVE_STATES
+from services.simulation_logs import get_log_tail
+from services.simulation_results import read_mass_properties, read_reactions
+from services.simulation_cache import run_key, restore_run
+from services.group_areas import update_group_areas
+from services.parametric_sweep import ParametricSweep, register_sweep, find_sweep
+from services.jinja.builders.solver_profile import build_solver_profile, apply_export_profile
+from services.jinja.generate_comm import write_study, export_meshes, render_export
 
 # from services.vtk_converter import call_med_extractor  # DELETED
 # from services.med.vtk_extruder import extrude_beam_memory, extrude_shell_memory  # Imported inside routes now
@@ -20,6 +35,8 @@ MED_ENV_DIR = os.path.join(ROOT_DIR, "MEDCOUPLING-9.15.0", "MEDCOUPLING-9.15.0")
 MESHER_SCRIPT = os.path.join(ROOT_DIR, "backend", "services", "med", "med_mesher.py")
 RESULTS_SCRIPT = os.path.join(ROOT_DIR, "backend", "services", "med", "med_results_service.py")
 ANALYSIS_SCRIPT = os.path.join(ROOT_DIR, "backend", "services", "med", "med_analysis_service.py")
+MERGE_SCRIPT = os.path.join(ROOT_DIR, "backend", "services", "med", "med_merge_results.py")
+AREAS_SCRIPT = os.path.join(ROOT_DIR, "backend", "services", "med", "med_group_areas.py")
 
 api_blueprint = Blueprint('api', __name__)
 
@@ -38,106 +55,8 @@ def get_verification_data():
             return jsonify({"status": "error", "message": "No project path provided"}), 400
 
         sim_dir = os.path.join(project_path, "simulation_files")
-        mass_file = os.path.join(sim_dir, "mass_properties.csv")
-        reac_file = os.path.join(sim_dir, "reactions.csv")
-
-        # 1. Parse Mass Properties
-        mass_data = None
-        if os.path.exists(mass_file):
-            try:
-                # Code_Aster CSV format is specific: Skip header comments (#)
-                # find the header line starting with LIEU,ENTITE,MASSE...
-                with open(mass_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                header_idx = -1
-                for i, line in enumerate(lines):
-                    if line.strip().startswith("LIEU"):
-                        header_idx = i
-                        break
-                
-                if header_idx != -1 and header_idx + 1 < len(lines):
-                    # Data is usually on the next line
-                    data_line = lines[header_idx + 1]
-                    parts = [p.strip() for p in data_line.split(',')]
-                    # Filter out empty strings result of trailing commas
-                    vals = [x for x in parts if x]
-                    
-                    if len(vals) >= 15: # Ensure we have enough columns
-                        # Mapping based on standard Code_Aster header
-                        # LIEU, ENTITE, MASSE, CDG_X, CDG_Y, CDG_Z, IX_G, IY_G, IZ_G...
-                        mass_data = {
-                            "mass": float(vals[2]),
-                            "cdg_x": float(vals[3]),
-                            "cdg_y": float(vals[4]),
-                            "cdg_z": float(vals[5]),
-                            "ix_g": float(vals[6]),
-                            "iy_g": float(vals[7]),
-                            "iz_g": float(vals[8])
-                        }
-            except Exception as e:
-                print(f"Error parsing mass CSV: {e}")
-
-        # 2. Parse Reactions
-        reactions_data = []
-        if os.path.exists(reac_file):
-            try:
-                with open(reac_file, 'r', encoding='utf-8') as f:
-                    lines = f.readlines()
-                
-                # REAC_NODA format often has multiple tables in one file or multiple files
-                # Simplified parser: look for data lines after headers
-                # We expect headers like: NOEUD, DX, DY, DZ, DRX, DRY, DRZ...
-                # BUT IMPR_TABLE output for RESULTANTE is simpler: Parameter names and values
-                
-                # Strategy: Detect case name from TITRE comments or Intitule column
-                current_case = "Unknown"
-                for line in lines:
-                    line = line.strip()
-                    
-                    # Code_Aster IMPR_TABLE with TITRE prints usually # TITRE : REACTIONS_Case 1
-                    # But can appear as ##REACTIONS_Case 1 in some versions
-                    if "REACTIONS_" in line and line.startswith('#'):
-                        # Extract everything after REACTIONS_ until a space or end of string
-                        parts = line.split("REACTIONS_")
-                        if len(parts) > 1:
-                            # Take the first word and clean it
-                            current_case = parts[1].split()[0].split(',')[0].strip()
-                            continue
-                        
-                    if not line or line.startswith('#') or "DX" in line or "NOEUD" in line: # Skip header/comments
-                        continue
-                        
-                    parts = [p.strip() for p in line.split(',')]
-                    vals = [v for v in parts if v]
-                    
-                    # Heuristic: line with numbers corresponding to forces
-                    if len(vals) >= 6: 
-                        try:
-                            # Fallback: If case is unknown, look at the first column (Intitule)
-                            # which often contains 'Reac_Case_1'
-                            row_case = current_case
-                            if row_case == "Unknown" and len(vals) > 6:
-                                first_col = vals[0]
-                                if "Reac_" in first_col:
-                                    row_case = first_col.split("Reac_")[-1].strip()
-
-                            # Try to parse at least 6 floats from the end
-                            floats = [float(v) for v in vals[-6:]]
-                            reactions_data.append({
-                                "case_name": row_case,
-                                "fx": floats[0],
-                                "fy": floats[1],
-                                "fz": floats[2],
-                                "mx": floats[3],
-                                "my": floats[4],
-                                "mz": floats[5]
-                            })
-                        except:
-                            continue
-
-            except Exception as e:
-                print(f"Error parsing reaction CSV: {e}")
+        mass_data = read_mass_properties(sim_dir)
+        reactions_data = read_reactions(sim_dir)
 
         return jsonify({
             "status": "success",
@@ -187,6 +106,24 @@ def med_env_run_cached(script_name, file_path, file_mtime):
     """Cached version of med_env_run with file modification time for invalidation."""
     return med_env_run(script_name, file_path)
 
+def add_mesh_nodes(folder_path, project_config):
+    """
+    Node count of every project mesh (med_mesher _FULL_MESH_, same cache as scan_workspace) as
+    project_config["mesh_nodes"], for the solver profile DOF estimate of projects without 'mesh' data.
+    """
+    if project_config.get("mesh") or project_config.get("mesh_nodes"):
+        return
+    counts = {}
+    for m in project_config.get("meshes", []):
+        path = os.path.join(folder_path, m.get("filename", f"{m['name']}.med"))
+        if not os.path.exists(path):
+            continue
+        mesher = med_env_run_cached("med_mesher.py", path, os.path.getmtime(path))
+        full_mesh = (mesher.get("groups") or {}).get("_FULL_MESH_") if mesher.get("status") == "success" else None
+        if full_mesh:
+            counts[os.path.basename(path)] = full_mesh.get("num_points", 0)
+    project_config["mesh_nodes"] = counts
+
 @api_blueprint.route('/open_folder_dialog', methods=['GET'])
 def open_folder_dialog():
     """Opens native Windows Folder Picker using PyWebView."""
@@ -307,25 +244,20 @@ def init_aster_files(folder_path, mesh_files):
         with open(mesh_json_path, 'w', encoding='utf-8') as f:
             json.dump({"unit_start": 80, "meshes": mesh_data_list}, f, indent=4)
         
-        # Generate export.export using Jinja2
-        jinja_dir = os.path.join(BASE_DIR, "services", "jinja", "templates")
-        env = Environment(loader=FileSystemLoader(jinja_dir), trim_blocks=True, lstrip_blocks=True)
-        tpl_export = env.get_template("export.j2")
-        
-        export_meshes = []
-        for i, m in enumerate(mesh_data_list):
-            export_meshes.append({
-                "path": os.path.abspath(os.path.join(folder_path, m["filename"])),
-                "unit": 80 + i
-            })
-        
-        export_content = tpl_export.render(
-            temp_path=os.path.abspath(temp_working_dir),
-            comm_path=os.path.abspath(os.path.join(sim_files_dir, "med.comm")),
-            meshes=export_meshes,
-            message_path=os.path.abspath(os.path.join(sim_files_dir, "message")),
-            base_path=os.path.abspath(os.path.join(sim_files_dir, "base")),
-            csv_path=None
+        # Solver performance profile of an existing project (defaults for a new one)
+        project_config = {}
+        project_file = os.path.join(folder_path, "project.json")
+        if os.path.exists(project_file):
+            with open(project_file, 'r', encoding='utf-8') as f:
+                project_config = json.load(f)
+            add_mesh_nodes(folder_path, project_config)
+        solver_profile = build_solver_profile(project_config)
+
+        # Generate export.export (same template / mesh units as save_project)
+        export_content = render_export(
+            sim_files_dir, os.path.join(sim_files_dir, "med.comm"),
+            export_meshes(mesh_data_list, folder_path),
+            solver_profile["export"]
         )
         
         export_path = os.path.join(sim_files_dir, "export.export")
@@ -528,45 +460,208 @@ def launch_tool():
     except Exception as e:
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def section_image_url(section_type, params):
+    """Cacheable GET URL of the section drawing (the definition travels in the query string)."""
+    return url_for('api.get_section_image', type=section_type, params=json.dumps(params, sort_keys=True))
+
+@api_blueprint.route('/section_image', methods=['GET'])
+def get_section_image():
+    """
+    Section drawing as PNG: /section_image?type=I_SECTION&params={...json...}.
+    Rendered once per (type, params) into the disk cache; browser-cacheable (ETag = param hash).
+    """
+    try:
+        section_type = request.args.get('type')
+        params = json.loads(request.args.get('params', '{}'))
+        if not section_type:
+            return jsonify({"status": "error", "message": "Section type required"}), 400
+
+        param_hash = section_param_hash(section_type, params)
+        if request.if_none_match.contains(param_hash):
+            return Response(status=304)
+
+        response = Response(section_image_png(param_hash, section_type, params), mimetype='image/png')
+        response.set_etag(param_hash)
+        response.cache_control.public = True
+        response.cache_control.max_age = 86400
+        return response
+
+    except Exception as e:
+        print(f"[API] Section image error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
 @lru_cache(maxsize=1000)
-def calculate_section_cached(param_hash, section_type, params_tuple):
-    """Memory-cached section calculation."""
-    params = dict(params_tuple)
-    return calculate_section_properties(section_type, params)
+def calculate_section_cached(param_hash, section_type, params_json):
+    """Memory-cached section calculation (no image), backed by the persistent disk cache (section_cache)."""
+    params = json.loads(params_json)  # JSON key: POLYGON outlines are lists (unhashable)
+    return cached_section_properties(param_hash, section_type, params)
 
 @api_blueprint.route('/calculate_section', methods=['POST'])
 def calculate_section():
-    """Calculate section properties using direct function calls and cache."""
+    """
+    Calculate section properties using direct function calls and cache.
+    mode='fast': closed-form properties right away (complete=False, FEM-only keys None) while the
+    FEM job runs in the background; poll /section_result for the full values.
+    No plotting here: 'image_url' points at /section_image ('with_image': true embeds the base64 PNG).
+    """
     try:
-        import hashlib
-        
         data = request.get_json()
         section_type = data.get('type')
         params = data.get('params', {})
+        mode = data.get('mode', 'full')
+        with_image = bool(data.get('with_image', False))
         
         if not section_type:
             return jsonify({"status": "error", "message": "Section type required"}), 400
             
-        # 1. CACHE MANAGEMENT - Memory based
-        param_str = json.dumps({"type": section_type, "params": params}, sort_keys=True)
-        param_hash = hashlib.sha256(param_str.encode()).hexdigest()
+        # 1. CACHE MANAGEMENT - Catalogue -> Memory (lru) -> Disk (section_cache) -> FEM
+        param_hash = section_param_hash(section_type, params)
+
+        # Standard profile (same dimensions as a catalogue entry): precomputed, placed analytically
+        result = catalogue_section_properties(section_type, params)
+        if result is not None:
+            result["image"] = section_image(param_hash, section_type, params) if with_image else None
+            result["image_url"] = section_image_url(section_type, params)
+            result["hash"] = param_hash
+            return jsonify(result)
+
+        if mode == 'fast' and load_section(section_shape_hash(section_type, params)) is None:
+            result = analytic_section_properties(section_type, params)
+            result["image"] = section_image(param_hash, section_type, params) if with_image else None
+            result["image_url"] = section_image_url(section_type, params)
+            result["hash"] = param_hash
+            submit_section_job(section_type, params)
+            return jsonify(result)
+        
+        # Full mode: a new shape runs on the section workers (timeout, memory limit), never in this
+        # thread; joins the background job if one is already running
+        if load_section(section_shape_hash(section_type, params)) is None:
+            wait_section_result(section_type, params)
         
         # 2. MEMORY CACHE LOOKUP
-        params_tuple = tuple(sorted(params.items()))
-        output_json = calculate_section_cached(param_hash, section_type, params_tuple)
+        output_json = calculate_section_cached(param_hash, section_type, json.dumps(params, sort_keys=True))
+        output_json = {
+            **output_json,
+            "image": section_image(param_hash, section_type, params) if with_image else None,
+            "image_url": section_image_url(section_type, params)
+        }
                 
         return jsonify(output_json)
         
+    except ValueError as e:
+        # Invalid POLYGON outline (self-intersecting, overlapping parts...)
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except SectionTimeoutError as e:
+        return jsonify({"status": "error", "message": str(e)}), 504
     except Exception as e:
         print(f"[API] Section calc error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+@api_blueprint.route('/section_catalogue', methods=['GET'])
+def get_section_catalogue():
+    """
+    Standard steel profiles: /section_catalogue?family=IPE&q=IPE 2
+    Returns [{name, family, type, params}] ('type'/'params' go straight into /calculate_section).
+    """
+    try:
+        family = request.args.get('family')
+        if family and family.upper() not in FAMILIES:
+            return jsonify({"status": "error", "message": f"Unknown family: {family}"}), 400
+        profiles = search_profiles(family=family, query=request.args.get('q'))
+        return jsonify({"status": "success", "families": list(FAMILIES), "profiles": profiles})
+    except Exception as e:
+        print(f"[API] Section catalogue error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api_blueprint.route('/section_catalogue/<path:name>', methods=['GET'])
+def get_catalogue_profile(name):
+    """
+    One profile with its properties: /section_catalogue/IPE 200?rotation=90&offset_y=100
+    Rotation/offset are applied analytically (no FEM).
+    """
+    try:
+        entry = find_profile(name)
+        if entry is None:
+            return jsonify({"status": "error", "message": f"Profile not found: {name}"}), 404
+
+        pose = {k: request.args.get(k) for k in ('rotation', 'offset_y', 'offset_z') if request.args.get(k)}
+        params = {**entry["params"], **pose}
+        result = profile_section_properties(entry, params)
+        return jsonify({
+            **result,
+            "name": entry["name"],
+            "family": entry["family"],
+            "type": entry["type"],
+            "params": params,
+            "image_url": section_image_url(entry["type"], params)
+        })
+    except Exception as e:
+        print(f"[API] Catalogue profile error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api_blueprint.route('/section_result', methods=['POST'])
+def section_result():
+    """
+    Full FEM result of a section started by /calculate_section (mode='fast').
+    Returns {status: 'pending'} while the background job runs.
+    """
+    try:
+        data = request.get_json()
+        section_type = data.get('type')
+        params = data.get('params', {})
+
+        if not section_type:
+            return jsonify({"status": "error", "message": "Section type required"}), 400
+
+        param_hash = section_param_hash(section_type, params)
+        state = section_job_state(section_type, params)
+
+        if state["status"] == "missing":
+            submit_section_job(section_type, params)
+            return jsonify({"status": "pending", "hash": param_hash})
+        if state["status"] != "success":
+            return jsonify({**state, "hash": param_hash})
+
+        return jsonify({
+            **calculate_section_cached(param_hash, section_type, json.dumps(params, sort_keys=True)),
+            "image_url": section_image_url(section_type, params)
+        })
+
+    except Exception as e:
+        print(f"[API] Section result error: {e}")
+        return jsonify({"status": "error", "message": str(e)}), 500
+
+@api_blueprint.route('/calculate_sections', methods=['POST'])
+def calculate_sections():
+    """
+    Batch section calculation: {"sections": [{"type", "params"}, ...], "with_image": false}.
+    Duplicates are computed once, cache hits are returned first and the rest run on a
+    process pool. Streams NDJSON, one line per distinct section as soon as it is ready
+    ('indices' maps the line back to the request list).
+    """
+    data = request.get_json() or {}
+    sections = data.get('sections')
+    with_image = bool(data.get('with_image', False))
+
+    if not isinstance(sections, list) or not sections:
+        return jsonify({"status": "error", "message": "Section list required"}), 400
+
+    def generate():
+        try:
+            for result in iter_section_batch(sections, with_image=with_image):
+                yield json.dumps(result) + "\n"
+        except Exception as e:
+            print(f"[API] Section batch error: {e}")
+            yield json.dumps({"status": "error", "message": str(e)}) + "\n"
+
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
 @api_blueprint.route('/save_project', methods=['POST'])
 def save_project():
     """
     Saves the full project configuration to project.json.
     Also separates data into specific JSONs for the Jinja generation pipeline
-    and runs generate_comm.py.
+    and runs the .comm generator (in-process).
     """
     try:
         data = request.get_json()
@@ -579,6 +674,11 @@ def save_project():
             return jsonify({"status": "error", "message": "Missing path or config"}), 400
             
         project_file = os.path.join(folder_path, "project.json")
+
+        # 0. Analytic section placeholders -> full FEM values (waits for running background jobs)
+        resolved = resolve_pending_sections(project_config.get('geometries', []))
+        if resolved:
+            print(f"[SAVE] Completed FEM section properties for {resolved} geometries")
         
         # 1. Save master project.json
         with open(project_file, 'w', encoding='utf-8') as f:
@@ -588,60 +688,39 @@ def save_project():
         sim_dir = os.path.join(folder_path, "simulation_files")
         os.makedirs(sim_dir, exist_ok=True)
         dst_comm = os.path.abspath(os.path.join(sim_dir, "calcul.comm"))
+
+        # Node counts for the AUTO solver profile (after project.json: not saved with the project)
+        add_mesh_nodes(folder_path, project_config)
         
         if comm_content:
             print(f"[SAVE] Writing Frontend-generated .comm to: {dst_comm}")
             with open(dst_comm, 'w', encoding='utf-8') as f:
                 f.write(comm_content)
         else:
-            # Fallback to legacy generator if no content provided
-            script_path = os.path.join(os.path.dirname(BASE_DIR), "backend", "services", "jinja", "generate_comm.py")
-            print(f"[SAVE] Running Legacy Generator: {script_path}")
-            subprocess.run(
-                [sys.executable, script_path, "--project_path", folder_path],
-                capture_output=True,
-                text=True, 
-                encoding='utf-8',
-                errors='replace'
-            )
+            # Fallback to the backend generator (in-process) if no content provided
+            print(f"[SAVE] Running Backend Generator for: {folder_path}")
+            try:
+                # FORCE_COQUE total forces -> pressures: group areas from the MED environment (cached by mesh hash)
+                update_group_areas(folder_path, project_config, run_group_areas_command)
+                write_study(folder_path, project_config=project_config)
+            except Exception as e:
+                print(f"[SAVE] Generator failed: {e}")
             
         # 4. GENERATE EXPORT.EXPORT for SIMULATION
         export_file = os.path.join(sim_dir, "export.export")
 
+        solver_profile = build_solver_profile(project_config)
         if export_content:
             print(f"[SAVE] Writing Frontend-generated .export to: {export_file}")
             with open(export_file, "w", encoding="utf-8") as f:
-                f.write(export_content)
+                f.write(apply_export_profile(export_content, solver_profile["export"]))
         else:
             # Fallback to backend generator (Note: This still uses Unit 80 legacy logic)
             print(f"[SAVE] Running Legacy .export Generator (Unit 80 fallback)")
-            jinja_dir = os.path.join(BASE_DIR, "services", "jinja", "templates")
-            env = Environment(loader=FileSystemLoader(jinja_dir), trim_blocks=True, lstrip_blocks=True)
-            tpl_export = env.get_template("export.j2")
-            
-            # Prepare mesh list for export from unified config
-            mesh_data_list = project_config.get("meshes", [])
-            
-            export_mesh_objs = []
-            for i, m in enumerate(mesh_data_list):
-                full_path = os.path.abspath(os.path.join(folder_path, m["filename"]))
-                export_mesh_objs.append({
-                    "path": full_path,
-                    "unit": 80 + i 
-                })
-                
-            temp_working_dir = os.path.join(sim_dir, "temp")
-            os.makedirs(temp_working_dir, exist_ok=True)
-            
-            legacy_export_content = tpl_export.render(
-                temp_path=os.path.abspath(temp_working_dir),
-                comm_path=dst_comm, # Points to calcul.comm
-                meshes=export_mesh_objs,
-                message_path=os.path.abspath(os.path.join(sim_dir, "message")),
-                base_path=os.path.abspath(os.path.join(sim_dir, "base")),
-                resu_med_path=os.path.abspath(os.path.join(sim_dir, "resu.med")),
-                mass_csv_path=os.path.abspath(os.path.join(sim_dir, "mass_properties.csv")),
-                reactions_csv_path=os.path.abspath(os.path.join(sim_dir, "reactions.csv"))
+            legacy_export_content = render_export(
+                sim_dir, dst_comm,  # Points to calcul.comm
+                export_meshes(project_config.get("meshes", []), folder_path),
+                solver_profile["export"]
             )
             with open(export_file, "w", encoding="utf-8") as f:
                 f.write(legacy_export_content)
@@ -653,9 +732,57 @@ def save_project():
         traceback.print_exc()
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def get_scheduler():
+    """Simulation scheduler; config.txt can set MAX_SIMULATIONS, SIMULATION_CORES, SIMULATION_MEMORY_MB."""
+    config = get_prosolve_config()
+    limits = {
+        "max_runs": config.get("MAX_SIMULATIONS"),
+        "max_cores": config.get("SIMULATION_CORES"),
+        "max_memory_mb": config.get("SIMULATION_MEMORY_MB")
+    }
+    return get_simulation_scheduler(**{k: int(v) for k, v in limits.items() if v})
+
+def load_shard_manifest(sim_dir):
+    """
+    shards.json written by generate_comm.py --shards, None when the run is not sharded or the
+    manifest belongs to another calcul.comm (e.g. the .comm was regenerated by the frontend).
+    """
+    manifest_path = os.path.join(sim_dir, "shards.json")
+    comm_path = os.path.join(sim_dir, "calcul.comm")
+    if not os.path.exists(manifest_path) or not os.path.exists(comm_path):
+        return None
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+        with open(comm_path, 'rb') as f:
+            comm_sha = hashlib.sha256(f.read()).hexdigest()
+    except Exception as e:
+        print(f"[SIMULATION] Shard manifest ignored: {e}")
+        return None
+    if manifest.get("comm_sha256") != comm_sha:
+        print("[SIMULATION] Shard manifest is stale (calcul.comm changed): running unsharded")
+        return None
+    if not all(os.path.exists(s.get("export", "")) for s in manifest.get("shards", [])):
+        return None
+    return manifest
+
+def merge_shards_command(sim_dir):
+    """MED env command merging the shard resu.med files into simulation_files/resu.med."""
+    return (
+        f'cmd /c "cd /d "{MED_ENV_DIR}" && '
+        f'call env_launch.bat && '
+        f'cd /d "{ROOT_DIR}" && '
+        f'python "{MERGE_SCRIPT}" "{sim_dir}""'
+    )
+
 @api_blueprint.route('/run_simulation', methods=['POST'])
 def run_simulation():
-    """Executes the simulation using export.export."""
+    """
+    Queues the simulation (export.export) on the local scheduler. Sharded projects (shards.json)
+    queue one run per shard plus a merge job that waits for all of them.
+    An unchanged model (same normalized calcul.comm, meshes and solver) reuses the results of the
+    completed run from the run cache without solving; {"force": true} always solves.
+    """
     try:
         data = request.get_json()
         folder_path = data.get('folder_path')
@@ -675,33 +802,232 @@ def run_simulation():
         if not aster_bin:
              return jsonify({"status": "error", "message": "Code_Aster path not configured in Settings."}), 400
              
-        cmd = [aster_bin, export_path]
-        print(f"[SIMULATION] Starting: {cmd}")
-        
-        # Determine cwd (project folder or simulation_files?)
-        # Usually where export is or where we want output
-        
-        # Launch in a NEW CONSOLE and use cmd /k to keep window open after finish
-        cmd_open = ["cmd", "/k"] + cmd
-        print(f"[SIM] Launching Aster: {cmd_open}")
-        
-        subprocess.Popen(
-            cmd_open,
-            cwd=sim_dir,
-            creationflags=subprocess.CREATE_NEW_CONSOLE
-        )
+        scheduler = get_scheduler()
+        cache_key = run_key(os.path.join(sim_dir, "calcul.comm"), export_path, aster_bin)
+        if cache_key and not data.get('force') and restore_run(cache_key, sim_dir):
+            job = scheduler.record_cached(folder_path, export_path, aster_bin, cache_key)
+            return jsonify({
+                "status": "success",
+                "message": f"Model unchanged: results reused from a completed run (job {job['id']}). Run with force to solve again.",
+                "job": job,
+                "cached": True,
+                "usage": scheduler.usage()
+            })
+
+        manifest = load_shard_manifest(sim_dir)
+        if manifest:
+            shard_jobs = [scheduler.submit(folder_path, s["export"], aster_bin) for s in manifest["shards"]]
+            job = scheduler.submit_command(
+                folder_path, merge_shards_command(sim_dir), sim_dir, log_prefix="merge",
+                depends_on=[j["id"] for j in shard_jobs], cache_key=cache_key
+            )
+            print(f"[SIMULATION] Queued {len(shard_jobs)} shards + merge job {job['id']}")
+            return jsonify({
+                "status": "success",
+                "message": f"Simulation queued in {len(shard_jobs)} shards (merge job {job['id']}). Output: simulation_files/shards/",
+                "job": job,
+                "shard_jobs": shard_jobs,
+                "usage": scheduler.usage()
+            })
+
+        job = scheduler.submit(folder_path, export_path, aster_bin, cache_key=cache_key)
+        record_solve_base(sim_dir, job)
+        print(f"[SIMULATION] Queued job {job['id']}: {job['command']}")
         
         return jsonify({
             "status": "success", 
-            "message": "Simulation started. Console window will remain open for inspection."
+            "message": f"Simulation queued (job {job['id']}). Output: simulation_files/{os.path.basename(job['log_path'])}",
+            "job": job,
+            "usage": scheduler.usage()
         })
             
     except Exception as e:
         print(f"[SIMULATION] Error: {e}")
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def record_solve_base(sim_dir, job):
+    """
+    base.json = solution signature (solve.json of generate_comm.py) of the run that writes
+    simulation_files/base; removed when calcul.comm did not come from the generator.
+    """
+    base_file = os.path.join(sim_dir, "base.json")
+    try:
+        with open(os.path.join(sim_dir, "solve.json"), 'r', encoding='utf-8') as f:
+            solve = json.load(f)
+        with open(os.path.join(sim_dir, "calcul.comm"), 'rb') as f:
+            comm_sha = hashlib.sha256(f.read()).hexdigest()
+    except Exception:
+        solve, comm_sha = {}, None
+    if solve.get("comm_sha256") != comm_sha:
+        if os.path.exists(base_file):
+            os.remove(base_file)
+        return
+    with open(base_file, 'w', encoding='utf-8') as f:
+        json.dump({"solve_sha256": solve["solve_sha256"], "job_id": job["id"]}, f, indent=4)
+
+@api_blueprint.route('/run_post_processing', methods=['POST'])
+def run_post_processing():
+    """
+    Post-only rerun: POURSUITE on the base saved by the last solve (post.comm / post.export from
+    generate_comm.py --post_only). New CALC_CHAMP criteria, shell layers, reaction groups or
+    IMPR_RESU fields cost seconds; refused when the model / loads changed since that solve.
+    """
+    try:
+        data = request.get_json() or {}
+        folder_path = data.get('folder_path')
+        if not folder_path:
+            return jsonify({"status": "error", "message": "Path required"}), 400
+        sim_dir = os.path.join(folder_path, "simulation_files")
+
+        aster_bin = get_prosolve_config().get("ASTER_BIN")
+        if not aster_bin:
+            return jsonify({"status": "error", "message": "Code_Aster path not configured in Settings."}), 400
+
+        base_file = os.path.join(sim_dir, "base.json")
+        if not os.path.exists(base_file) or not os.path.exists(os.path.join(sim_dir, "base")):
+            return jsonify({"status": "error", "message": "No saved solver base: run the full simulation first."}), 400
+        with open(base_file, 'r', encoding='utf-8') as f:
+            base = json.load(f)
+
+        scheduler = get_scheduler()
+        solve_job = scheduler.get_job(base.get("job_id"))
+        if solve_job is not None and solve_job["status"] != "finished":
+            return jsonify({"status": "error", "message": f"The solve that writes the base is {solve_job['status']} (job {solve_job['id']})."}), 400
+
+        try:
+            write_study(folder_path, post_only=True)
+        except Exception as e:
+            print(f"[POST-ONLY] Generator failed: {e}")
+            return jsonify({"status": "error", "message": f"Post-processing generation failed: {e}"}), 500
+        with open(os.path.join(sim_dir, "post.json"), 'r', encoding='utf-8') as f:
+            post = json.load(f)
+
+        if post.get("solve_sha256") != base.get("solve_sha256"):
+            return jsonify({"status": "error", "message": "Model or loads changed since the last solve: run the full simulation."}), 400
+
+        job = scheduler.submit(folder_path, os.path.join(sim_dir, "post.export"), aster_bin)
+        print(f"[POST-ONLY] Queued job {job['id']} on the base of job {base.get('job_id')}")
+        return jsonify({
+            "status": "success",
+            "message": f"Post-processing queued (job {job['id']}), reusing the saved solution.",
+            "job": job,
+            "usage": scheduler.usage()
+        })
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
 
+@api_blueprint.route('/simulations', methods=['GET'])
+def list_simulations():
+    """Job table (newest first), optionally filtered by ?folder_path=."""
+    scheduler = get_scheduler()
+    return jsonify({
+        "status": "success",
+        "jobs": scheduler.list_jobs(request.args.get('folder_path')),
+        "usage": scheduler.usage()
+    })
+
+@api_blueprint.route('/simulations/<job_id>', methods=['GET'])
+def simulation_status(job_id):
+    job = get_scheduler().get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown simulation job: {job_id}"}), 404
+    return jsonify({"status": "success", "job": job})
+
+@api_blueprint.route('/simulations/<job_id>/cancel', methods=['POST'])
+def cancel_simulation(job_id):
+    job = get_scheduler().cancel(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown simulation job: {job_id}"}), 404
+    return jsonify({"status": "success", "job": job})
+
+def _simulation_log_path(job, which):
+    """'run' = live as_run output captured by the scheduler, 'message' = Code_Aster message file."""
+    if which == 'message':
+        return os.path.join(job.get("cwd") or os.path.dirname(job["export_path"]), "message")
+    return job["log_path"]
+
+@api_blueprint.route('/simulations/<job_id>/log', methods=['GET'])
+def simulation_log(job_id):
+    """
+    Lines appended since ?offset= (or since this ?client='s last poll; first poll = end of the file),
+    plus status / alarms scanned incrementally. ?file=run|message.
+    """
+    job = get_scheduler().get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown simulation job: {job_id}"}), 404
+    offset = request.args.get('offset', type=int)
+    result = get_log_tail().poll(
+        _simulation_log_path(job, request.args.get('file', 'run')), client_id=request.args.get('client'), offset=offset
+    )
+    return jsonify({"status": "success", "job": job, "log": result})
+
+@api_blueprint.route('/simulations/<job_id>/log/stream', methods=['GET'])
+def simulation_log_stream(job_id):
+    """Server-Sent Events of the log while the job runs (resumes from Last-Event-ID / ?offset=)."""
+    scheduler = get_scheduler()
+    job = scheduler.get_job(job_id)
+    if job is None:
+        return jsonify({"status": "error", "message": f"Unknown simulation job: {job_id}"}), 404
+    offset = request.headers.get('Last-Event-ID', request.args.get('offset'))
+    offset = int(offset) if offset not in (None, '') else None
+
+    def is_done():
+        current = scheduler.get_job(job_id)
+        return current is None or current["status"] not in ACTIVE_STATES
+
+    events = get_log_tail().stream(_simulation_log_path(job, request.args.get('file', 'run')), offset=offset, is_done=is_done)
+    return Response(stream_with_context(events), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@api_blueprint.route('/sweeps', methods=['POST'])
+def start_sweep():
+    """
+    Parametric sweep: {"folder_path", "parameters": [{"path", "values"} | {"path", "start", "stop", "steps"}],
+    "mode": "grid" | "zip", "run": true}. Variants are generated in the background and queued on the
+    simulation scheduler ("run": false = generate only).
+    """
+    try:
+        data = request.get_json() or {}
+        folder_path = data.get('folder_path')
+        if not folder_path or not os.path.exists(os.path.join(folder_path, "project.json")):
+            return jsonify({"status": "error", "message": "Saved project required (project.json not found)"}), 400
+
+        aster_bin = None
+        if data.get('run', True):
+            aster_bin = get_prosolve_config().get("ASTER_BIN")
+            if not aster_bin:
+                return jsonify({"status": "error", "message": "Code_Aster path not configured in Settings."}), 400
+
+        sweep = ParametricSweep.create(folder_path, data.get('parameters') or [], data.get('mode', 'grid'), data.get('name'))
+        add_mesh_nodes(folder_path, sweep.base_config)
+        register_sweep(sweep)
+        sweep.start(get_scheduler(), aster_bin)
+        print(f"[SWEEP] {sweep.state['id']}: {len(sweep.state['variants'])} variants")
+        return jsonify({"status": "success", "sweep": sweep.summary()})
+    except ValueError as e:
+        return jsonify({"status": "error", "message": str(e)}), 400
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        return jsonify({"status": "error", "message": str(e)}), 500
 
+@api_blueprint.route('/sweeps/<sweep_id>', methods=['GET'])
+def sweep_status(sweep_id):
+    """Variant states + comparison table (max VM, max displacement, reactions, mass)."""
+    sweep = find_sweep(sweep_id, request.args.get('folder_path'))
+    if sweep is None:
+        return jsonify({"status": "error", "message": f"Unknown sweep: {sweep_id}"}), 404
+    summary = sweep.refresh(get_scheduler(), summarize=lambda resu_path: run_extraction_command(resu_path, "--summary"))
+    return jsonify({"status": "success", "sweep": summary})
+
+@api_blueprint.route('/sweeps/<sweep_id>/cancel', methods=['POST'])
+def cancel_sweep(sweep_id):
+    sweep = find_sweep(sweep_id, (request.get_json(silent=True) or {}).get('folder_path'))
+    if sweep is None:
+        return jsonify({"status": "error", "message": f"Unknown sweep: {sweep_id}"}), 404
+    return jsonify({"status": "success", "sweep": sweep.cancel(get_scheduler())})
 
 @api_blueprint.route('/open_project', methods=['POST'])
 def open_project_config():
@@ -763,7 +1089,8 @@ def get_mesh_data():
 def get_mesh_vtk():
     """Reads ALL mesh files in VTK format for visualization."""
     try:
-        from services.med.vtk_extruder import med_to_vtk_pipeline as med_to_vtk_json
+        import numpy as np
+        from services.med.vtk_extruder import med_to_vtk_pipeline as med_to_vtk_json, cells_to_lists
         
         data = request.get_json()
         folder_path = data.get('folder_path')
@@ -780,7 +1107,7 @@ def get_mesh_vtk():
         print(f"[API] Found {len(files)} mesh files: {files}")
         
         # Combine all meshes
-        combined_points = []
+        point_blocks = []
         combined_cells = {}
         point_offset = 0
         
@@ -795,25 +1122,21 @@ def get_mesh_vtk():
                 continue
             
             # Add points with offset
-            combined_points.extend(result["points"])
+            point_blocks.append(result["points"])
             
-            # Add cells with adjusted indices
+            # Add cells with adjusted indices (vectorized: one add per group)
             for group_name, group_data in result["cells"].items():
                 # Prefix group name with file name to avoid conflicts
                 prefixed_name = f"{mesh_file.replace('.med', '')}_{group_name}"
                 
-                # Adjust cell connectivity indices
-                adjusted_connectivity = []
-                for cell in group_data["connectivity"]:
-                    adjusted_cell = [idx + point_offset for idx in cell]
-                    adjusted_connectivity.append(adjusted_cell)
-                
                 combined_cells[prefixed_name] = {
                     "type": group_data["type"],
-                    "connectivity": adjusted_connectivity
+                    "connectivity": cells_to_lists(group_data["offsets"], group_data["connectivity"] + point_offset)
                 }
             
-            point_offset += len(result["points"])
+            point_offset += result["num_points"]
+        
+        combined_points = np.concatenate(point_blocks).tolist() if point_blocks else []
         
         print(f"[API] Combined mesh: {len(combined_points)} points, {len(combined_cells)} groups")
         
@@ -835,6 +1158,62 @@ def get_mesh_vtk():
 
 
 
+# Geometry fields that affect the 3D scene (images/properties are left out of the cache key)
+SCENE_GEOMETRY_FIELDS = ('group', '_category', 'type', 'section_params', 'section_mesh')
+
+def build_scene_components(full_path, med_file, geometry_state, lod=False, shell_mode="welded", engine="vtk"):
+    """
+    Runs the extrusion engine for one MED file and packs the viewer components.
+    Returns (packed_points, components): the points are shared by all components of the file.
+    Raises RuntimeError when the extrusion fails.
+    engine='vtk': med_mesher -> vtk_extruder; engine='med': med_extruder inside the MED env.
+    """
+    from services.med.vtk_extruder import (
+        med_to_vtk_pipeline as med_to_vtk_json, med_extruder_pipeline, cells_to_vtk_legacy, pack_typed_array
+    )
+
+    # This returns a merged structure: { points: [...], cells: { "GroupA": {conn...}, "GroupB": ... } }
+    if engine == "med":
+        vtk_result = med_extruder_pipeline(full_path, geometries=geometry_state, lod=lod)
+    else:
+        vtk_result = med_to_vtk_json(full_path, geometries=geometry_state, lod=lod, shell_mode=shell_mode)
+    
+    if vtk_result.get("status") != "success":
+        # Raised, not returned: lru_cache keeps results only, a transient failure is retried next request
+        raise RuntimeError(vtk_result.get("message") or "extrusion failed")
+        
+    # Typed-array payload: points packed once per file (sent once, see point_sets), cells in VTK legacy layout
+    packed_points = pack_typed_array(vtk_result["points"], "float32")
+
+    # Flatten groups into separate scene components for the inventory
+    components = []
+    for group_name, group_data in vtk_result["cells"].items():
+        component = {
+            "id": f"{med_file}_{group_name}",
+            "data": {
+                "cells": pack_typed_array(cells_to_vtk_legacy(group_data["offsets"], group_data["connectivity"]), "uint32"),
+                "vtk_type": group_data.get("vtk_type", 5),
+                "is_extruded": group_data.get("is_extruded", False),
+                "is_base": group_data.get("is_base", False)
+            }
+        }
+        pick_map = group_data.get("pick_map")
+        if pick_map:
+            # Picking: célula -> varredura -> elementos (índices no grupo) e estações ao longo do eixo
+            component["data"]["pick_map"] = {
+                "cell_sweep": pack_typed_array(pick_map["cell_sweep"], "uint32"),
+                "sweeps": pick_map["sweeps"]
+            }
+        if group_data.get("lod"):
+            component["data"]["lod"] = group_data["lod"]
+        components.append(component)
+    return packed_points, components
+
+@lru_cache(maxsize=16)
+def build_scene_components_cached(full_path, file_mtime, geometry_json, lod, shell_mode, engine):
+    """Server-side cache of the packed scene (all LOD tiers, successful builds only), invalidated by MED mtime or geometry change."""
+    return build_scene_components(full_path, os.path.basename(full_path), json.loads(geometry_json), lod, shell_mode, engine)
+
 @api_blueprint.route('/3d/generate', methods=['POST'])
 def generate_3d_view():
     """
@@ -842,14 +1221,24 @@ def generate_3d_view():
     1. Receives geometry state (params for extrusion).
     2. Reads MED files.
     3. Applies native VTK extrusion (Beam/Shell) in memory.
-    4. Returns a list of separate components for the viewer.
+    4. Returns a list of separate components for the viewer; the points of each MED file are
+       sent once in 'point_sets' and referenced by index (data.point_set).
+    With 'lod' (default on) each extruded group also carries its LOD tiers
+    (data.lod = {group, tier, section_size}); the viewer picks one by screen-space size.
+    'shell_mode' selects the shell solidification: 'welded' (default) or legacy 'vtk'.
+    'engine' selects the extrusion backend: 'vtk' (default) or 'med' (native MEDCoupling skin, shells only).
     """
     try:
-        from services.med.vtk_extruder import med_to_vtk_pipeline as med_to_vtk_json
-        
         data = request.get_json()
         project_path = data.get('project_path')
         geometry_state = data.get('geometry_state', [])
+        lod = bool(data.get('lod', True))
+        shell_mode = data.get('shell_mode', 'welded')
+        if shell_mode not in ('welded', 'vtk'):
+            return jsonify({"status": "error", "message": f"Invalid shell_mode: {shell_mode}"}), 400
+        engine = data.get('engine', 'vtk')
+        if engine not in ('vtk', 'med'):
+            return jsonify({"status": "error", "message": f"Invalid engine: {engine}"}), 400
         
         print(f"[3D-VIEW] START: project_path={project_path}")
         print(f"[3D-VIEW] RECEIVED {len(geometry_state)} geometry configs.")
@@ -866,36 +1255,33 @@ def generate_3d_view():
         if not med_files:
             return jsonify({"status": "warning", "message": "No mesh files found", "data": []})
 
+        geometry_json = json.dumps(
+            [{k: g.get(k) for k in SCENE_GEOMETRY_FIELDS} for g in geometry_state], sort_keys=True
+        )
         scene_components = []
+        point_sets = []
 
         for med_file in med_files:
             full_path = os.path.join(project_path, med_file)
             print(f"[3D-GEN] Processing {med_file} with {len(geometry_state)} geometry configs...")
             
-            # This returns a merged structure: { points: [...], cells: { "GroupA": {conn...}, "GroupB": ... } }
-            vtk_result = med_to_vtk_json(full_path, geometries=geometry_state)
-            
-            if vtk_result.get("status") != "success":
-                print(f"[3D-GEN] Failed to process {med_file}: {vtk_result.get('message')}")
+            try:
+                packed_points, components = build_scene_components_cached(
+                    full_path, os.path.getmtime(full_path), geometry_json, lod, shell_mode, engine
+                )
+            except Exception as e:
+                print(f"[3D-GEN] Failed to process {med_file}: {e}")
                 continue
-                
-            # Flatten groups into separate scene components for the inventory
-            for group_name, group_data in vtk_result["cells"].items():
-                component = {
-                    "id": f"{med_file}_{group_name}",
-                    "data": {
-                        "points": vtk_result["points"],
-                        "connectivity": group_data["connectivity"],
-                        "vtk_type": group_data.get("vtk_type", 5),
-                        "is_extruded": group_data.get("is_extruded", False),
-                        "is_base": group_data.get("is_base", False)
-                    }
-                }
-                scene_components.append(component)
+            # Copies: the cached components are shared between requests
+            scene_components.extend(
+                {**c, "data": {**c["data"], "point_set": len(point_sets)}} for c in components
+            )
+            point_sets.append(packed_points)
 
         return jsonify({
             "status": "success",
-            "data": scene_components
+            "data": scene_components,
+            "point_sets": point_sets
         })
 
     except Exception as e:
@@ -1232,6 +1618,17 @@ def run_extraction_command(file_path, cmd):
     )
     return _execute_pipe_command(command)
 
+def run_group_areas_command(mesh_paths):
+    """Bridge to the surface group areas of the meshes (FORCE_COQUE)."""
+    files = " ".join(f'"{path}"' for path in mesh_paths)
+    command = (
+        f'cmd /c "cd /d "{MED_ENV_DIR}" && '
+        f'call env_launch.bat && '
+        f'cd /d "{ROOT_DIR}" && '
+        f'python "{AREAS_SCRIPT}" {files}"'
+    )
+    return _execute_pipe_command(command)
+
 def run_processor_command(data_bundle, field_name):
     """Bridge to the VTK-Native processor."""
     # Data is passed asescaped JSON string
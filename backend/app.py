@@ -1,6 +1,15 @@
 import os
 import sys
+
+# Frozen build: the section workers are this executable (services.section_workers.worker_command);
+# dispatched before the Flask / pywebview imports
+if len(sys.argv) > 1 and sys.argv[1] == "--section-worker":
+    from services.section_extractor import serve
+    serve(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    sys.exit(0)
+
 import socket
+import multiprocessing
 import threading
 import webview
 from flask import Flask, jsonify
@@ -41,6 +50,7 @@ def start_server(port, app):
     app.run(host='127.0.0.1', port=port, threaded=True)
 
 if __name__ == '__main__':
+    multiprocessing.freeze_support()
     port = get_free_port()
     app = create_app()
     
@@ -0,0 +1,85 @@
+"""
+Group Areas - surface group areas for FORCE_COQUE (total force -> pressure)
+force_coque_calc.j2 used to measure every loaded group inside Code_Aster (dummy material and
+AFFE_CARA_ELEM + one POST_ELEM MASS_INER per load). The areas are now computed at save time
+by services/med/med_group_areas.py (MED environment), for all 2D groups of a mesh at once, and
+cached by mesh content hash:
+    <CACHE_DIR>/<mesh sha256>.json -> {group: area}
+generate_comm.py reads simulation_files/group_areas.json and writes constant pressures; loads on
+groups without a known area keep the in-solver conversion.
+"""
+import os
+import json
+
+from services.simulation_cache import file_hash
+from services.simulation_scheduler import atomic_write
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+CACHE_DIR = os.environ.get("PROSOLVE_AREA_CACHE", os.path.join(BACKEND_DIR, ".cache", "group_areas"))
+
+AREAS_FILE = "group_areas.json"
+
+
+def mesh_stamp(path: str) -> list:
+    """[size, mtime_ns]: generate_comm.py checks the meshes did not change since the areas were computed."""
+    st = os.stat(path)
+    return [st.st_size, st.st_mtime_ns]
+
+
+def mesh_group_areas(mesh_paths: list, compute) -> dict:
+    """
+    {mesh_path: {group: area}}; compute(paths) -> {"status", "areas": {path: {group: area}}} runs
+    only for meshes missing from the cache (one MED environment launch for all of them).
+    """
+    result = {}
+    missing = {}
+    for path in mesh_paths:
+        digest = file_hash(path)
+        try:
+            with open(os.path.join(CACHE_DIR, f"{digest}.json"), "r", encoding="utf-8") as f:
+                result[path] = json.load(f)
+        except (OSError, ValueError):
+            missing[path] = digest
+
+    if missing:
+        computed = compute(list(missing))
+        if computed.get("status") != "success":
+            raise RuntimeError(computed.get("message", "Group area computation failed"))
+        for path, digest in missing.items():
+            areas = computed["areas"].get(path, {})
+            atomic_write(os.path.join(CACHE_DIR, f"{digest}.json"), json.dumps(areas).encode("utf-8"))
+            result[path] = areas
+        print(f"[AREAS] Computed group areas of {len(missing)} meshes")
+    return result
+
+
+def update_group_areas(folder_path: str, project_config: dict, compute) -> dict:
+    """
+    simulation_files/group_areas.json for the FORCE_COQUE loads of the project (removed when
+    there are none or the areas are unavailable, so a stale file is never used).
+    """
+    areas_path = os.path.join(folder_path, "simulation_files", AREAS_FILE)
+    foc_list = (project_config.get("force_coque") or {}).get("force_coque", [])
+    mesh_paths = [os.path.abspath(os.path.join(folder_path, m.get("filename", f"{m['name']}.med")))
+                  for m in project_config.get("meshes", [])]
+    try:
+        if not foc_list or not mesh_paths:
+            raise LookupError("no FORCE_COQUE loads")
+        per_mesh = mesh_group_areas(mesh_paths, compute)
+    except Exception as e:
+        if os.path.exists(areas_path):
+            os.remove(areas_path)
+        if not isinstance(e, LookupError):
+            print(f"[AREAS] Unavailable, pressures computed in Code_Aster: {e}")
+        return {}
+
+    # Group names are unique in the assembled mesh (ASSE_MAILLAGE): sum in case a name repeats
+    areas = {}
+    for groups in per_mesh.values():
+        for group, area in groups.items():
+            areas[group] = areas.get(group, 0.0) + area
+    atomic_write(areas_path, json.dumps({
+        "meshes": {path: mesh_stamp(path) for path in mesh_paths},
+        "areas": areas
+    }, indent=4).encode("utf-8"))
+    return areas
@@ -1,7 +1,10 @@
-def build_force_coque(config, model_name="MODELE"):
+def build_force_coque(config, model_name="MODELE", group_areas=None):
     """
     Constrói dados para FORCE_COQUE com normalização de área.
+    group_areas: {grupo: área} pré-calculado no save (services/group_areas.py); esses grupos recebem
+    a pressão constante e só os demais passam pelo loop POST_ELEM dentro do Code_Aster.
     """
+    group_areas = group_areas or {}
     foc_list = config.get("force_coque", [])
     if not foc_list:
         return {}, {} # Sem dados
@@ -20,6 +23,17 @@ def build_force_coque(config, model_name="MODELE"):
         force = item["total_force"]
         direction = item.get("direction", "PRES") # Default PRES, or FX, FY, FZ...
 
+        area = group_areas.get(group)
+        if area is not None:
+            if area > 0.0:
+                pressure = force / area
+                print(f"[FORCE_COQUE] Load '{name}' on '{group}': {pressure:.2f} Pa (Force: {force}, Area: {area:.2f})")
+            else:
+                print(f"[FORCE_COQUE] WARNING: Area is zero for group {group}. Force {name} set to 0.")
+                pressure = 0.0
+            load_items.append({"name": name, "group": group, "direction": direction, "pressure": pressure})
+            continue
+
         # Adiciona à lista de cálculo
         press_config.append( (name, group, force) )
 
@@ -34,13 +48,17 @@ def build_force_coque(config, model_name="MODELE"):
             "lookup_key": name 
         })
 
-    calc_data = {
-        "model_name": model_name,
-        "press_config": press_config,
-        # Precisamos de uma lista de TODOS os grupos envolvidos para criar o campo dummy corretamente?
-        # O script original usa 'all_groups_ma'. Vamos passar a lista de grupos usados aqui.
-        "groups": list(set([item["group"] for item in foc_list]))
-    }
+    if not press_config:
+        # Todas as áreas conhecidas: sem materiais/AFFE_CARA_ELEM dummy nem POST_ELEM no estudo
+        calc_data = {}
+    else:
+        calc_data = {
+            "model_name": model_name,
+            "press_config": press_config,
+            # Precisamos de uma lista de TODOS os grupos envolvidos para criar o campo dummy corretamente?
+            # O script original usa 'all_groups_ma'. Vamos passar a lista de grupos usados aqui.
+            "groups": sorted(set(group for _, group, _ in press_config))
+        }
 
     load_data = {
         "model_name": model_name,
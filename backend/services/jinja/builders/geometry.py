@@ -49,7 +49,7 @@ def build_geometry(geometry_list, model_name="MODELE", result_name="CARA_ELEM"):
                 "vecteur": f"({vx}, {vy}, {vz})"
             })
 
-        elif section_type in ["I_SECTION", "RECTANGLE", "BOX", "CIRCLE", "TUBE", "BEAM"]:
+        elif section_type in ["I_SECTION", "RECTANGLE", "BOX", "CIRCLE", "TUBE", "CHANNEL", "POLYGON", "BEAM"]:
             # Model assignment - Use user selection from frontend
             beam_model = item.get("type", "POU_D_T")  # Fallback to POU_D_T for safety
             model_items.append({
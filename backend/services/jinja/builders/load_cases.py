@@ -1,11 +1,53 @@
+# Modos de geração dos load cases (meca_statique.load_case_mode):
+#   STATIQUE: um MECA_STATIQUE por caso (matriz montada e fatorizada a cada caso)
+#   MULT:     um único MACRO_ELAS_MULT (fatorização única) quando todos os casos têm as mesmas
+#             condições de contorno e diferem apenas nas cargas; senão volta para STATIQUE
+LOAD_CASE_MODES = ("STATIQUE", "MULT")
+
+MULT_RESULT_NAME = "RESU_MULT"
+NOM_CAS_MAX = 16  # NOM_CAS is a K16 in Code_Aster
+
+
+def _nom_cas_names(case_names):
+    """Unique NOM_CAS (<= 16 chars) per case; truncated names that collide get a numbered suffix."""
+    names = []
+    for i, case_name in enumerate(case_names):
+        nom_cas = case_name[:NOM_CAS_MAX]
+        n = i + 1
+        # A suffixed name can itself collide (e.g. with a case literally named like it)
+        while nom_cas in names:
+            suffix = f"_{n}"
+            nom_cas = case_name[:NOM_CAS_MAX - len(suffix)] + suffix
+            n += 1
+        names.append(nom_cas)
+    return names
+
+
+def _mult_fallback_reason(meca_runs, ddl_names):
+    """None if the cases can share one factorization, else why not (same supports, loads only)."""
+    if len(meca_runs) < 2:
+        return "single load case"
+    supports = [
+        sorted(e["charge"] for e in run["excit_list"] if e["charge"] in ddl_names) for run in meca_runs
+    ]
+    if any(s != supports[0] for s in supports[1:]):
+        return "load cases have different boundary conditions"
+    if any(len(run["excit_list"]) == len(supports[0]) for run in meca_runs):
+        return "a load case has no loads"
+    return None
+
+
 def build_load_cases(lc_list, meca_config, pes_data, ddl_data, model_name="MODELE", reaction_extraction_data=None, **kwargs):
     """
-    Constrói a lista de configurações de Load Cases (MECA_STATIQUE).
+    Constrói a lista de configurações de Load Cases (MECA_STATIQUE ou MACRO_ELAS_MULT).
+    Retorna {"mode", "runs", "mult"}: 'runs' tem sempre um item por caso (nomes dos campos MED),
+    'mult' os dados do MACRO_ELAS_MULT (None em modo STATIQUE).
     """
     # Lista de NOMES válidos gerados pelos builds anteriores
     # ddl_data e pes_data são agora listas de configurações (cada uma tem 'name' ou 'result_name')
     valid_names = [d["name"] for d in ddl_data]
-    
+    ddl_names = set(valid_names)
+
     if isinstance(pes_data, list):
         for p in pes_data:
             if "result_name" in p:
@@ -13,7 +55,7 @@ def build_load_cases(lc_list, meca_config, pes_data, ddl_data, model_name="MODEL
     elif pes_data and "result_name" in pes_data:
         # Fallback para objeto único
         valid_names.append(pes_data["result_name"])
-    
+
     foc_data = kwargs.get("foc_data")
     if foc_data and "result_name" in foc_data:
         valid_names.append(foc_data["result_name"])
@@ -23,7 +65,7 @@ def build_load_cases(lc_list, meca_config, pes_data, ddl_data, model_name="MODEL
         valid_names.append(nod_data["result_name"])
 
     meca_runs = []
-    
+
     if not lc_list:
         # Fallback se não houver LC, tenta usar o primeiro DDL disponível ou avisa
         default_load = valid_names[0] if valid_names else "CHARGE_DDL"
@@ -36,12 +78,12 @@ def build_load_cases(lc_list, meca_config, pes_data, ddl_data, model_name="MODEL
         # Sanitize name: remove spaces and special chars for Python variable compatibility
         case_name = raw_name.replace(" ", "_").replace("-", "_")
         result_name = f"RESU_{case_name}"
-        
+
         excit_list_lc = []
-        
+
         # Merge loads and restrictions from the case definition
         combined_names = lc.get("loads", []) + lc.get("restrictions", [])
-        
+
         for load_name in combined_names:
             # Validação: se o nome existe nos loads gerados
             if load_name in valid_names:
@@ -54,6 +96,8 @@ def build_load_cases(lc_list, meca_config, pes_data, ddl_data, model_name="MODEL
         meca_runs.append({
             "case_name": case_name,
             "result_name": result_name,
+            "solver": "MECA_STATIQUE",
+            "nom_cas": None,
             "cara_elem": base_config.get("cara_elem", "CARA_ELEM"),
             "cham_mater": base_config.get("cham_mater", "CHAM_MATER"),
             "modele": model_name,
@@ -64,6 +108,47 @@ def build_load_cases(lc_list, meca_config, pes_data, ddl_data, model_name="MODEL
             "reaction_extraction": reaction_extraction_data
         })
 
+    mode = str(base_config.get("load_case_mode", "STATIQUE")).upper()
+    if mode == "MULT":
+        reason = _mult_fallback_reason(meca_runs, ddl_names)
+        if reason:
+            print(f"[LOAD-CASES] MACRO_ELAS_MULT not applicable ({reason}): one MECA_STATIQUE per case")
+            mode = "STATIQUE"
+    else:
+        mode = "STATIQUE"
+
+    if mode == "STATIQUE":
+        return {
+            "mode": mode,
+            "runs": meca_runs,
+            "mult": None
+        }
+
+    # MULT: supports applied once (CHAR_MECA_GLOBAL), one CAS_CHARGE per case with its loads only.
+    # The runs keep their case_name (MED field names) and select their case by NOM_CAS.
+    global_charges = [e["charge"] for e in meca_runs[0]["excit_list"] if e["charge"] in ddl_names]
+    cases = []
+    for run, nom_cas in zip(meca_runs, _nom_cas_names([r["case_name"] for r in meca_runs])):
+        cases.append({
+            "nom_cas": nom_cas,
+            "charges": [e["charge"] for e in run["excit_list"] if e["charge"] not in ddl_names]
+        })
+        run.update(result_name=MULT_RESULT_NAME, solver="MACRO_ELAS_MULT", nom_cas=nom_cas)
+
+    first = meca_runs[0]
+    print(f"[LOAD-CASES] {len(cases)} load cases in one MACRO_ELAS_MULT (single factorization)")
     return {
-        "runs": meca_runs
+        "mode": mode,
+        "runs": meca_runs,
+        "mult": {
+            "result_name": MULT_RESULT_NAME,
+            "modele": first["modele"],
+            "cham_mater": first["cham_mater"],
+            "cara_elem": first["cara_elem"],
+            "global_charges": global_charges,
+            "cases": cases,
+            "option": first["option"],
+            "solveur": first["solveur"],
+            "info": first["info"]
+        }
     }
@@ -0,0 +1,146 @@
+import os
+import re
+
+# Perfis de desempenho do solver (project.json -> "solver_profile"):
+#   {"preset": "AUTO" | "SMALL" | "MEDIUM" | "LARGE" | "HUGE",
+#    "ncpus": .., "mpi_nbcpu": .., "memory_limit": .., "time_limit": .., "solveur": {...}}
+# AUTO escolhe o preset pela estimativa de DOF do modelo; os campos explícitos sobrescrevem o preset.
+# ncpus = threads OpenMP (MUMPS/BLAS); mpi_nbcpu > 1 exige a versão MPI do Code_Aster.
+# Presets com "auto": False (PETSc, só com a versão MPI) nunca são escolhidos pelo AUTO: só explícitos.
+SOLVER_PRESETS = {
+    "SMALL": {
+        "max_dof": 50_000,
+        "ncpus": 1, "mpi_nbcpu": 1, "memory_limit": 2048, "time_limit": 900.0,
+        "solveur": {"METHODE": "MUMPS", "RENUM": "AUTO", "GESTION_MEMOIRE": "AUTO"},
+    },
+    "MEDIUM": {
+        "max_dof": 500_000,
+        "ncpus": 4, "mpi_nbcpu": 1, "memory_limit": 4096, "time_limit": 3600.0,
+        "solveur": {"METHODE": "MUMPS", "RENUM": "METIS", "GESTION_MEMOIRE": "AUTO"},
+    },
+    "LARGE": {
+        "max_dof": 3_000_000,
+        "ncpus": 8, "mpi_nbcpu": 1, "memory_limit": 16384, "time_limit": 14400.0,
+        # Block low-rank factorization: less memory/time, accuracy controlled by LOW_RANK_SEUIL
+        "solveur": {"METHODE": "MUMPS", "RENUM": "METIS", "GESTION_MEMOIRE": "AUTO",
+                    "ACCELERATION": "FR+", "LOW_RANK_SEUIL": 1e-09},
+    },
+    "HUGE": {
+        "max_dof": None,
+        "ncpus": 8, "mpi_nbcpu": 1, "memory_limit": 32768, "time_limit": 43200.0,
+        # Direct BLR factorization, out-of-core when the memory limit requires it
+        "solveur": {"METHODE": "MUMPS", "RENUM": "METIS", "GESTION_MEMOIRE": "AUTO",
+                    "ACCELERATION": "FR+", "LOW_RANK_SEUIL": 1e-09},
+    },
+    "HUGE_PETSC": {
+        "max_dof": None, "auto": False,
+        "ncpus": 8, "mpi_nbcpu": 1, "memory_limit": 32768, "time_limit": 43200.0,
+        # Iterative solver preconditioned by a single-precision low-rank MUMPS factorization
+        "solveur": {"METHODE": "PETSC", "ALGORITHME": "FGMRES", "PRE_COND": "LDLT_SP",
+                    "RESI_RELA": 1e-08, "NMAX_ITER": 1000},
+    },
+}
+
+DEFAULT_PRESET = "SMALL"
+
+# DOF por nó conforme a categoria do grupo (vigas/cascas: 3 translações + 3 rotações)
+DOF_PER_NODE = {"1D": 6, "2D": 6, "3D": 3}
+
+EXPORT_KEYS = ("ncpus", "mpi_nbcpu", "memory_limit", "time_limit")
+
+
+def _group_nodes(data):
+    points = data.get("points")
+    if isinstance(points, list):
+        return len(points) // 3
+    return int(data.get("num_points") or data.get("count") or 0)
+
+
+def estimate_dof(project_config):
+    """
+    Estimativa de DOF a partir dos grupos de malha do project.json ('mesh': arquivo -> grupo -> dados).
+    O _FULL_MESH_ já contém os nós de todos os grupos: só ele é contado (senão a soma dos grupos, com
+    nós compartilhados repetidos). Sem 'mesh': 'mesh_nodes' (arquivo -> nós do MED, preenchido pela API).
+    Serve só para escolher o preset.
+    """
+    meshes = project_config.get("mesh") or {}
+    dof = 0
+    for groups in meshes.values():
+        if not isinstance(groups, dict):
+            continue
+        groups = {name: data for name, data in groups.items() if isinstance(data, dict)}
+        dof_per_node = max((DOF_PER_NODE.get(d.get("category"), 3) for d in groups.values()), default=3)
+        if "_FULL_MESH_" in groups:
+            dof += _group_nodes(groups["_FULL_MESH_"]) * dof_per_node
+            continue
+        for data in groups.values():
+            dof += _group_nodes(data) * DOF_PER_NODE.get(data.get("category"), 3)
+    if meshes:
+        return dof
+
+    # Contagem de nós do MED: 6 DOF/nó quando o modelo tem vigas ou cascas
+    categories = {g.get("_category") for g in project_config.get("geometries") or []}
+    dof_per_node = max((DOF_PER_NODE.get(c, 3) for c in categories), default=3)
+    return sum(int(n or 0) for n in (project_config.get("mesh_nodes") or {}).values()) * dof_per_node
+
+
+def preset_for_dof(dof):
+    for name, preset in SOLVER_PRESETS.items():
+        if not preset.get("auto", True):
+            continue
+        if preset["max_dof"] is None or dof <= preset["max_dof"]:
+            return name
+    return DEFAULT_PRESET
+
+
+def build_solver_profile(project_config):
+    """
+    Resolve o perfil de desempenho: {preset, dof_estimate, export: {ncpus, mpi_nbcpu, memory_limit,
+    time_limit}, solveur: {PALAVRA_CHAVE: valor}} usado no .export e no SOLVEUR dos MECA_STATIQUE.
+    """
+    config = project_config.get("solver_profile") or {}
+    dof = estimate_dof(project_config)
+
+    name = str(config.get("preset", "AUTO")).upper()
+    if name == "AUTO":
+        name = preset_for_dof(dof)
+    elif name not in SOLVER_PRESETS:
+        print(f"[SOLVER] Unknown preset {name}, using {DEFAULT_PRESET}")
+        name = DEFAULT_PRESET
+    preset = SOLVER_PRESETS[name]
+
+    export = {key: preset[key] for key in EXPORT_KEYS}
+    # NCPUS da aba de análise (slider) quando o perfil não define
+    analysis_ncpus = ((project_config.get("analysis") or {}).get("parameters") or {}).get("ncpus")
+    if analysis_ncpus:
+        export["ncpus"] = analysis_ncpus
+    export.update({key: config[key] for key in EXPORT_KEYS if config.get(key)})
+
+    export["ncpus"] = max(1, min(int(export["ncpus"]), os.cpu_count() or 1))
+    export["mpi_nbcpu"] = max(1, int(export["mpi_nbcpu"]))
+    export["memory_limit"] = int(export["memory_limit"])
+    export["time_limit"] = float(export["time_limit"])
+
+    solveur = dict(preset["solveur"])
+    if export["mpi_nbcpu"] > 1 and solveur.get("METHODE") == "MUMPS":
+        solveur["MATR_DISTRIBUEE"] = "OUI"  # each MPI process keeps only its part of the matrix
+    solveur.update({key.upper(): val for key, val in (config.get("solveur") or {}).items()})
+
+    print(f"[SOLVER] Profile {name} (~{dof} DOF): {export['ncpus']} threads, {export['mpi_nbcpu']} MPI, "
+          f"{export['memory_limit']} MB, {solveur.get('METHODE')}")
+    return {
+        "preset": name,
+        "dof_estimate": dof,
+        "export": export,
+        "solveur": solveur
+    }
+
+
+def apply_export_profile(export_content, export):
+    """Troca as linhas 'P ncpus/mpi_nbcpu/memory_limit/time_limit' de um .export já gerado (frontend)."""
+    for key in EXPORT_KEYS:
+        line = f"P {key} {export[key]}"
+        export_content, count = re.subn(rf"^P {key} .*$", line, export_content, flags=re.MULTILINE)
+        if not count:
+            export_content = re.sub(r"^(P actions .*)$", rf"\1\n{line}", export_content, count=1, flags=re.MULTILINE)
+    return export_content
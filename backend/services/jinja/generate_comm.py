@@ -1,129 +1,83 @@
 # =========================================================
 # generate_comm.py
 # Gera arquivo .comm do Code_Aster a partir de JSON + Jinja
+#
+# Biblioteca (API Flask, em processo, sem subir um interpretador por save):
+#     generate_comm(project_config) -> str         conteúdo do calcul.comm
+#     write_study(project_path, shards, post_only)  calcul.comm / shards / post.comm no projeto
+# Script:
+#     python generate_comm.py --project_path <projeto> [--shards K] [--post_only]
 # =========================================================
 
-import json
+import io
+import os
+import re
 import sys
+import copy
+import json
+import shutil
+import hashlib
 import argparse
+import datetime
 from pathlib import Path
-from jinja2 import Environment, FileSystemLoader
-
-# ---------------------------------------------------------
-# 1. Configuração de Diretórios e Argumentos
-# ---------------------------------------------------------
-parser = argparse.ArgumentParser(description="Gera script .comm do Code_Aster")
-parser.add_argument("--project_path", type=str, help="Caminho raiz do projeto")
-args = parser.parse_args()
+from jinja2 import Environment, FileSystemLoader, FileSystemBytecodeCache
 
 BASE_DIR = Path(__file__).resolve().parent
-BUILDERS_DIR = BASE_DIR / "builders"
 TEMPLATES_DIR = BASE_DIR / "templates"
-
-if args.project_path:
-    # Modo Produção: Usa a pasta simulation_files do projeto
-    PROJECT_DIR = Path(args.project_path)
-    SIM_DIR = PROJECT_DIR / "simulation_files"
-    STUDY_DIR = SIM_DIR
-    OUTPUT_DIR = SIM_DIR
-else:
-    # Modo Legado/Desenvolvimento: Usa as pastas locais
-    STUDY_DIR = BASE_DIR / "study"
-    OUTPUT_DIR = BASE_DIR / "output"
+BACKEND_DIR = BASE_DIR.parent.parent
 
 # ---------------------------------------------------------
-# 2. Importação de Builders
+# 1. Importação de Builders
 # ---------------------------------------------------------
-sys.path.insert(0, str(BUILDERS_DIR))
+# Como script, backend/ entra no sys.path para o mesmo caminho de import da API
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
 
 try:
-    from asse_maillage import build_asse_maillage
-    from affe_modele import build_affe_modele
-    from defi_materiau import build_defi_materiau
-    from affe_materiau import build_affe_materiau
-    from affe_char_meca_ddl import build_affe_char_meca_ddl 
-    from pesanteur import build_pesanteur
-    from load_cases import build_load_cases
-    from force_coque import build_force_coque
-    from post_elem_mass import build_post_elem_mass
-    from post_releve_t_reactions import build_post_releve_t_reactions
-    from force_nodale import build_force_nodale
-    from geometry import build_geometry
+    from services.jinja.builders.asse_maillage import build_asse_maillage
+    from services.jinja.builders.affe_modele import build_affe_modele
+    from services.jinja.builders.defi_materiau import build_defi_materiau
+    from services.jinja.builders.affe_materiau import build_affe_materiau
+    from services.jinja.builders.affe_char_meca_ddl import build_affe_char_meca_ddl
+    from services.jinja.builders.pesanteur import build_pesanteur
+    from services.jinja.builders.load_cases import build_load_cases
+    from services.jinja.builders.force_coque import build_force_coque
+    from services.jinja.builders.post_elem_mass import build_post_elem_mass
+    from services.jinja.builders.post_releve_t_reactions import build_post_releve_t_reactions
+    from services.jinja.builders.force_nodale import build_force_nodale
+    from services.jinja.builders.geometry import build_geometry
+    from services.jinja.builders.solver_profile import build_solver_profile
 except ImportError as e:
     raise ImportError(f"Erro ao importar builders: {e}")
 
-# 3. Leitura dos Arquivos de Configuração (JSON)
 # ---------------------------------------------------------
+# 2. Configuração Jinja (um Environment por processo)
+# ---------------------------------------------------------
+# Os templates compilados ficam no cache do Environment (recompilados só se o .j2 mudar);
+# o bytecode vai para disco e também serve às execuções como script.
+JINJA_CACHE_DIR = Path(os.environ.get("PROSOLVE_JINJA_CACHE", BACKEND_DIR / ".cache" / "jinja"))
 
-def load_json(path, key=None):
-    if not path.exists(): return [] if key else {}
+
+def _bytecode_cache():
     try:
-        with open(path, encoding="utf-8", errors='replace') as f:
-            data = json.load(f)
-            return data.get(key, []) if key else data
-    except Exception:
-        return [] if key else {}
+        JINJA_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+        return FileSystemBytecodeCache(str(JINJA_CACHE_DIR))
+    except OSError:
+        return None
 
-if args.project_path:
-    # Modo Produção: Usa a pasta simulation_files do projeto
-    PROJECT_DIR = Path(args.project_path)
-    SIM_DIR = PROJECT_DIR / "simulation_files"
-    STUDY_DIR = SIM_DIR
-    OUTPUT_DIR = SIM_DIR
-else:
-    # Modo Teste: Sem project_path - não faz nada
-    print("No project_path provided - running in test mode")
-    sys.exit(0)
-
-# A. Unified Project Config
-project_file = PROJECT_DIR / "project.json"
-project_config = load_json(project_file)
-
-if not project_config:
-    raise FileNotFoundError(f"Arquivo de projeto não encontrado em {project_file}")
-
-# Mesh data now comes from project.json meshes key
-mesh_config = project_config.get("meshes", [])
-if not mesh_config:
-    # Check if meshes are in a different key or if it's the old structure
-    raise FileNotFoundError(f"Dados de malha ('meshes') não encontrados em {project_file}")
-
-mesh_names = [m["name"] for m in mesh_config]
-
-# B. Materials & Geometry (From project.json keys)
-mat_props_list = project_config.get("materials", [])
-# Material assignments are now expected inside each material object as 'assignedGroups'
-# but we can also handle a separate list if present
-assign_list = project_config.get("material_assignments", [])
-if not assign_list and mat_props_list:
-    # Synthesize internal assignments for builder compatibility
-    assign_list = [{"material": m["name"], "groups": m.get("assignedGroups", [])} for m in mat_props_list]
-
-geometry_list = project_config.get("geometries", [])
-
-# F. Loadings (From project.json keys)
-ddl_list = project_config.get("restrictions", []) # restrictions maps to DDL
-meca_config = project_config.get("meca_statique", {})
-pes_config = project_config.get("pesanteur", {})
-lc_list = project_config.get("load_cases", [])
-foc_config = project_config.get("force_coque", {})
-mass_config = project_config.get("post_elem_mass", {})
-reac_config = project_config.get("post_releve_t_reactions", {})
-
-# Handle loads from unified list
-all_loads = project_config.get("loads", [])
-nod_list = [l for l in all_loads if l.get("type") == "FORCE_NODALE"]
-pesanteur_loads = [l for l in all_loads if l.get("type") == "PESANTEUR"]
-
-# If there's a legacy top-level pesanteur key, we could merge it, 
-# but the current UI uses the unified 'loads' list.
-if not pesanteur_loads and project_config.get("pesanteur"):
-    lp = project_config.get("pesanteur")
-    pesanteur_loads = lp if isinstance(lp, list) else [lp]
 
-# ---------------------------------------------------------
-# 4. Preparação dos Dados (Builders)
-# ---------------------------------------------------------
+env = Environment(
+    loader=FileSystemLoader(str(TEMPLATES_DIR)),
+    trim_blocks=True,
+    lstrip_blocks=True,
+    bytecode_cache=_bytecode_cache()
+)
+
+
+def get_template(name):
+    """Template compilado do Environment compartilhado (export.j2 na API, blocos do .comm aqui)."""
+    return env.get_template(name)
+
 
 FINAL_MESH = "MAIL"
 FINAL_MODEL = "MODELE"
@@ -133,161 +87,429 @@ FINAL_DDL = "CHARGE_DDL"
 FINAL_PES = "CHARGE_PES"
 FINAL_NOD = "CHARGE_NOD"
 
-# A. Assembly
-asse_data = build_asse_maillage(mesh_names, result_name=FINAL_MESH)
-
-# B & E. Geometry (Model + Properties)
-geom_data = build_geometry(geometry_list, model_name=FINAL_MODEL, result_name=FINAL_CARA)
-# Use affe_modele builder with physics data from geometries
-model_data = build_affe_modele(geometry_list, mesh_name=FINAL_MESH, result_name=FINAL_MODEL)
-
-# C & D. Materials
-defi_mat_data = build_defi_materiau(mat_props_list)
-affe_mat_data = build_affe_materiau(assign_list, model_name=FINAL_MODEL, result_name=FINAL_CHMAT)
-
-# F. DDL & Forces
-ddl_data = build_affe_char_meca_ddl(ddl_list, model_name=FINAL_MODEL, result_name=FINAL_DDL)
-pes_data = build_pesanteur({"pesanteur": pesanteur_loads}, model_name=FINAL_MODEL, result_name=FINAL_PES)
-foc_calc_data, foc_load_data = build_force_coque(foc_config, model_name=FINAL_MODEL)
-reac_data = build_post_releve_t_reactions(reac_config, ddl_list)
-nod_data = build_force_nodale(nod_list, model_name=FINAL_MODEL, result_name=FINAL_NOD)
-
-# G. Load Cases Summary
-lc_data = build_load_cases(
-    lc_list, 
-    meca_config, 
-    pes_data=pes_data, 
-    ddl_data=ddl_data, 
-    model_name=FINAL_MODEL,
-    reaction_extraction_data=reac_data,
-    foc_data=foc_load_data,
-    nod_data=nod_data
-)
+# ---------------------------------------------------------
+# 3. Leitura dos Arquivos de Configuração (JSON)
+# ---------------------------------------------------------
 
-# H. Mass
-mass_data = build_post_elem_mass(mass_config, model_name=FINAL_MODEL, field_mat_name=FINAL_CHMAT, cara_elem_name=FINAL_CARA)
+def load_json(path, key=None):
+    if not path.exists(): return [] if key else {}
+    try:
+        with open(path, encoding="utf-8", errors='replace') as f:
+            data = json.load(f)
+            return data.get(key, []) if key else data
+    except Exception:
+        return [] if key else {}
+
+
+def load_group_areas(sim_dir):
+    """{grupo: área} de simulation_files/group_areas.json (save), vazio se alguma malha mudou depois."""
+    data = load_json(Path(sim_dir) / "group_areas.json")
+    if not data:
+        return {}
+    for path, stamp in data.get("meshes", {}).items():
+        mesh_file = Path(path)
+        if not mesh_file.exists() or [mesh_file.stat().st_size, mesh_file.stat().st_mtime_ns] != stamp:
+            print(f"[FORCE_COQUE] group_areas.json is stale ({mesh_file.name}): areas computed in Code_Aster")
+            return {}
+    return data.get("areas", {})
 
 # ---------------------------------------------------------
-# 5. Configuração Jinja
+# 4. Preparação dos Dados (Builders)
 # ---------------------------------------------------------
-env = Environment(loader=FileSystemLoader(str(TEMPLATES_DIR)), trim_blocks=True, lstrip_blocks=True)
 
-try:
-    tpl_preamble = env.get_template("preamble.j2")
-    tpl_lire = env.get_template("lire_maillage.j2")
-    tpl_asse = env.get_template("asse_maillage.j2")
-    tpl_inspect = env.get_template("inspect_mesh.j2") 
-    tpl_model = env.get_template("affe_modele.j2")
-    tpl_defi = env.get_template("defi_materiau.j2")
-    tpl_affe = env.get_template("affe_materiau.j2")
-    tpl_cara = env.get_template("affe_cara_elem.j2")
-    tpl_ddl = env.get_template("affe_char_meca_ddl.j2") 
-    tpl_pes = env.get_template("pesanteur.j2")
-    tpl_lc = env.get_template("load_cases.j2")
-    tpl_foc_calc = env.get_template("force_coque_calc.j2")
-    tpl_foc_load = env.get_template("force_coque_load.j2")
-    tpl_nod = env.get_template("force_nodale.j2")
-    tpl_mass = env.get_template("post_elem_mass.j2")
-    tpl_geom_check = env.get_template("geometric_check.j2")
-    tpl_results = env.get_template("extract_results.j2")
-except Exception as e:
-    raise RuntimeError(f"Error loading Jinja templates: {e}")
+def prepare_study(project_config, project_dir=None):
+    """
+    Dados dos builders para um project.json (dict, não é modificado).
+    project_dir: pasta do projeto (malhas e simulation_files/group_areas.json), opcional.
+    """
+    project_config = copy.deepcopy(project_config)
+
+    # Mesh data now comes from project.json meshes key
+    mesh_config = project_config.get("meshes", [])
+    if not mesh_config:
+        # Check if meshes are in a different key or if it's the old structure
+        raise ValueError("Dados de malha ('meshes') não encontrados no projeto")
+
+    mesh_names = [m["name"] for m in mesh_config]
+
+    # B. Materials & Geometry (From project.json keys)
+    mat_props_list = project_config.get("materials", [])
+    # Material assignments are now expected inside each material object as 'assignedGroups'
+    # but we can also handle a separate list if present
+    assign_list = project_config.get("material_assignments", [])
+    if not assign_list and mat_props_list:
+        # Synthesize internal assignments for builder compatibility
+        assign_list = [{"material": m["name"], "groups": m.get("assignedGroups", [])} for m in mat_props_list]
+
+    geometry_list = project_config.get("geometries", [])
+
+    # F. Loadings (From project.json keys)
+    ddl_list = project_config.get("restrictions", []) # restrictions maps to DDL
+    meca_config = project_config.get("meca_statique", {})
+    lc_list = project_config.get("load_cases", [])
+    foc_config = project_config.get("force_coque", {})
+    mass_config = project_config.get("post_elem_mass", {})
+    reac_config = project_config.get("post_releve_t_reactions", {})
+
+    # Handle loads from unified list
+    all_loads = project_config.get("loads", [])
+    nod_list = [l for l in all_loads if l.get("type") == "FORCE_NODALE"]
+    pesanteur_loads = [l for l in all_loads if l.get("type") == "PESANTEUR"]
+
+    # If there's a legacy top-level pesanteur key, we could merge it,
+    # but the current UI uses the unified 'loads' list.
+    if not pesanteur_loads and project_config.get("pesanteur"):
+        lp = project_config.get("pesanteur")
+        pesanteur_loads = lp if isinstance(lp, list) else [lp]
+
+    group_areas = load_group_areas(Path(project_dir) / "simulation_files") if project_dir else {}
+
+    # A. Assembly
+    asse_data = build_asse_maillage(mesh_names, result_name=FINAL_MESH)
+
+    # B & E. Geometry (Model + Properties)
+    geom_data = build_geometry(geometry_list, model_name=FINAL_MODEL, result_name=FINAL_CARA)
+    # Use affe_modele builder with physics data from geometries
+    model_data = build_affe_modele(geometry_list, mesh_name=FINAL_MESH, result_name=FINAL_MODEL)
+
+    # C & D. Materials
+    defi_mat_data = build_defi_materiau(mat_props_list)
+    affe_mat_data = build_affe_materiau(assign_list, model_name=FINAL_MODEL, result_name=FINAL_CHMAT)
+
+    # F. DDL & Forces
+    ddl_data = build_affe_char_meca_ddl(ddl_list, model_name=FINAL_MODEL, result_name=FINAL_DDL)
+    pes_data = build_pesanteur({"pesanteur": pesanteur_loads}, model_name=FINAL_MODEL, result_name=FINAL_PES)
+    foc_calc_data, foc_load_data = build_force_coque(foc_config, model_name=FINAL_MODEL, group_areas=group_areas)
+    reac_data = build_post_releve_t_reactions(reac_config, ddl_list)
+    nod_data = build_force_nodale(nod_list, model_name=FINAL_MODEL, result_name=FINAL_NOD)
+
+    # Solver performance profile: preset SOLVEUR options under the explicit meca_statique ones
+    solver_profile = build_solver_profile(project_config)
+    meca_base = meca_config.setdefault("meca_statique", {})
+    meca_base["solveur"] = {**solver_profile["solveur"], **{k.upper(): v for k, v in meca_base.get("solveur", {}).items()}}
+
+    # G. Load Cases Summary
+    lc_data = build_load_cases(
+        lc_list,
+        meca_config,
+        pes_data=pes_data,
+        ddl_data=ddl_data,
+        model_name=FINAL_MODEL,
+        reaction_extraction_data=reac_data,
+        foc_data=foc_load_data,
+        nod_data=nod_data
+    )
+
+    # H. Mass
+    mass_data = build_post_elem_mass(mass_config, model_name=FINAL_MODEL, field_mat_name=FINAL_CHMAT, cara_elem_name=FINAL_CARA)
+
+    return {
+        "mesh_config": mesh_config,
+        "asse_data": asse_data,
+        "geom_data": geom_data,
+        "model_data": model_data,
+        "defi_mat_data": defi_mat_data,
+        "affe_mat_data": affe_mat_data,
+        "ddl_data": ddl_data,
+        "pes_data": pes_data,
+        "foc_calc_data": foc_calc_data,
+        "foc_load_data": foc_load_data,
+        "nod_data": nod_data,
+        "solver_profile": solver_profile,
+        "meca_base": meca_base,
+        "lc_data": lc_data,
+        "mass_data": mass_data
+    }
 
 # ---------------------------------------------------------
-# 6. Escrita do Arquivo .comm
+# 5. Renderização do .comm
 # ---------------------------------------------------------
-OUTPUT_DIR.mkdir(exist_ok=True)
-comm_path = OUTPUT_DIR / "calcul.comm"
-import io
-import re
 
-import datetime
+def render_comm(study, runs, mult=None, geometric_check=True, part=None):
+    """
+    Conteúdo do .comm para uma lista de load cases (todos, ou só os de um shard).
+    part: None = estudo completo, "solve" = só até as soluções (assinatura da base),
+    "post" = POURSUITE com só o pós-processamento (CALC_CHAMP, reações, massa, IMPR_RESU).
+    """
+    solve = part != "post"
+    post = part != "solve"
+    geom_data = study["geom_data"]
+    output_buffer = io.StringIO()
+
+    with output_buffer as f:
+        f.write(f"# Generated at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
+        f.write("DEBUT(LANG='FR')\n\n" if solve else "POURSUITE(LANG='FR')\n\n")
+
+        f.write(get_template("preamble.j2").render() + "\n")
+        if solve:
+            f.write(render_solve_setup(study, mult))
+
+        if runs:
+            tpl_lc = get_template("load_cases.j2")
+            for run in runs:
+                f.write(tpl_lc.render(**run, part=part))
+                f.write("\n\n\n\n")
+
+        if post and geometric_check:
+            f.write(get_template("geometric_check.j2").render(model_name=FINAL_MODEL, cara_elem_name=FINAL_CARA))
+            f.write("\n\n\n\n")
 
-# Resolve absolute paths for debugging
-print(f"DEBUG: Script starting. Path: {Path(__file__).resolve()}")
-print(f"DEBUG: PROJECT_DIR: {PROJECT_DIR.resolve()}")
-print(f"DEBUG: OUTPUT_DIR: {OUTPUT_DIR.resolve()}")
+        if post and runs:
+            has_shells = any(item.get("type") == "COQUE" for item in geom_data.get("cara_items", []))
+            f.write(get_template("extract_results.j2").render(has_shells=has_shells, cara_items=geom_data.get("cara_items", []), runs=runs))
+            f.write("\n\n\n\n")
 
-comm_path = (OUTPUT_DIR / "calcul.comm").resolve()
-print(f"Generating auditable script in: {comm_path}")
+        f.write("FIN()\n")
 
-output_buffer = io.StringIO()
+        # Extração e Limpeza do conteúdo (dentro do bloco with)
+        comm_content = output_buffer.getvalue()
 
-with output_buffer as f:
-    f.write(f"# Generated at: {datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')}\n")
-    f.write("DEBUT(LANG='FR')\n\n")
-    
-    f.write(tpl_preamble.render() + "\n")
-    for i, mesh in enumerate(mesh_config):
-        unit = mesh.get("unit", 80+i)
-        f.write(tpl_lire.render(mesh_name=mesh["name"], unit=unit, filename=mesh.get("filename", f"{mesh['name']}.med")))
-        f.write("\n\n\n\n")
+    # Permite ate 4 quebras de linha para o respiro de 3 linhas vazias
+    return re.sub(r'\n{5,}', '\n\n\n\n', comm_content)
 
-    if asse_data["mode"] == "ASSE":
-        f.write(tpl_asse.render(**asse_data))
-    elif asse_data["mode"] == "SINGLE":
-        if asse_data['final_mesh'] != FINAL_MESH:
-            f.write(f"{FINAL_MESH} = {asse_data['final_mesh']}\n")
-    f.write("\n\n\n\n")
 
-    if model_data["items"]:
-        f.write(tpl_model.render(**model_data))
-        f.write("\n\n\n\n")
+def render_solve_setup(study, mult=None):
+    """Malhas, modelo, materiais, características, cargas e MACRO_ELAS_MULT (parte que vai para a base)."""
+    asse_data = study["asse_data"]
+    model_data = study["model_data"]
+    defi_mat_data = study["defi_mat_data"]
+    affe_mat_data = study["affe_mat_data"]
+    geom_data = study["geom_data"]
+    foc_calc_data = study["foc_calc_data"]
+    foc_load_data = study["foc_load_data"]
+    ddl_data, pes_data, nod_data = study["ddl_data"], study["pes_data"], study["nod_data"]
+    output_buffer = io.StringIO()
 
-    if defi_mat_data or affe_mat_data["items"]:
-        if defi_mat_data:
-            f.write(tpl_defi.render(definitions=defi_mat_data) + "\n\n\n\n")
-            
-            # Robustness: if we have materials but NO assignments, 
-            # create a default assignment to TOUT='OUI' using the first material
-            if not affe_mat_data["items"]:
-                first_mat_var = defi_mat_data[0]["var_name"]
-                affe_mat_data["items"] = [{"mater": first_mat_var, "tout": "OUI"}]
-                
-        if affe_mat_data["items"]:
-            f.write(tpl_affe.render(**affe_mat_data) + "\n\n\n\n")
-
-    if geom_data["cara_items"]:
-        f.write(tpl_cara.render(**geom_data))
-        f.write("\n\n\n\n")
+    with output_buffer as f:
+        tpl_lire = get_template("lire_maillage.j2")
+        for i, mesh in enumerate(study["mesh_config"]):
+            unit = mesh.get("unit", 80+i)
+            f.write(tpl_lire.render(mesh_name=mesh["name"], unit=unit, filename=mesh.get("filename", f"{mesh['name']}.med")))
+            f.write("\n\n\n\n")
 
-    if foc_calc_data:
-        f.write(tpl_foc_calc.render(**foc_calc_data))
+        if asse_data["mode"] == "ASSE":
+            f.write(get_template("asse_maillage.j2").render(**asse_data))
+        elif asse_data["mode"] == "SINGLE":
+            if asse_data['final_mesh'] != FINAL_MESH:
+                f.write(f"{FINAL_MESH} = {asse_data['final_mesh']}\n")
         f.write("\n\n\n\n")
 
-    if ddl_data: f.write(tpl_ddl.render(commands=ddl_data) + "\n\n\n\n")
-    if pes_data: f.write(tpl_pes.render(commands=pes_data) + "\n\n\n\n")
-    if nod_data: f.write(tpl_nod.render(**nod_data) + "\n\n\n\n")
-    if foc_load_data and foc_load_data.get("load_items"):
-        f.write(tpl_foc_load.render(**foc_load_data) + "\n\n\n\n")
+        if model_data["items"]:
+            f.write(get_template("affe_modele.j2").render(**model_data))
+            f.write("\n\n\n\n")
+
+        if defi_mat_data or affe_mat_data["items"]:
+            if defi_mat_data:
+                f.write(get_template("defi_materiau.j2").render(definitions=defi_mat_data) + "\n\n\n\n")
 
-    if lc_data.get("runs"):
-        for run in lc_data["runs"]:
-            f.write(tpl_lc.render(**run))
+                # Robustness: if we have materials but NO assignments,
+                # create a default assignment to TOUT='OUI' using the first material
+                if not affe_mat_data["items"]:
+                    first_mat_var = defi_mat_data[0]["var_name"]
+                    affe_mat_data["items"] = [{"mater": first_mat_var, "tout": "OUI"}]
+
+            if affe_mat_data["items"]:
+                f.write(get_template("affe_materiau.j2").render(**affe_mat_data) + "\n\n\n\n")
+
+        if geom_data["cara_items"]:
+            f.write(get_template("affe_cara_elem.j2").render(**geom_data))
             f.write("\n\n\n\n")
 
-    f.write(tpl_geom_check.render(model_name=FINAL_MODEL, cara_elem_name=FINAL_CARA))
-    f.write("\n\n\n\n")
+        if foc_calc_data:
+            f.write(get_template("force_coque_calc.j2").render(**foc_calc_data))
+            f.write("\n\n\n\n")
 
-    if lc_data.get("runs"):
-        has_shells = any(item.get("type") == "COQUE" for item in geom_data.get("cara_items", []))
-        f.write(tpl_results.render(has_shells=has_shells, cara_items=geom_data.get("cara_items", []), **lc_data))
-        f.write("\n\n\n\n")
+        if ddl_data: f.write(get_template("affe_char_meca_ddl.j2").render(commands=ddl_data) + "\n\n\n\n")
+        if pes_data: f.write(get_template("pesanteur.j2").render(commands=pes_data) + "\n\n\n\n")
+        if nod_data: f.write(get_template("force_nodale.j2").render(**nod_data) + "\n\n\n\n")
+        if foc_load_data and foc_load_data.get("load_items"):
+            f.write(get_template("force_coque_load.j2").render(**foc_load_data) + "\n\n\n\n")
 
-    f.write("FIN()\n")
-    
-    # Extração e Limpeza do conteúdo (dentro do bloco with)
-    comm_content = output_buffer.getvalue()
+        if mult:
+            # meca_statique.load_case_mode = MULT: one factorization for all cases
+            f.write(get_template("macro_elas_mult.j2").render(**mult))
+            f.write("\n\n\n\n")
 
-# Limpeza e Escrita final
-# Permite ate 4 quebras de linha para o respiro de 3 linhas vazias
-comm_content = re.sub(r'\n{5,}', '\n\n\n\n', comm_content)
+        return output_buffer.getvalue()
 
-print(f"DEBUG: Writing {len(comm_content)} bytes to {comm_path}")
-try:
+
+def solve_signature(study):
+    """sha256 da parte de solução do estudo (sem o timestamp): a base salva só serve se ela não mudou."""
+    lc_data = study["lc_data"]
+    solve_content = render_comm(study, lc_data["runs"], lc_data.get("mult"), part="solve")
+    solve_content = "\n".join(l for l in solve_content.splitlines() if not l.startswith("# Generated at"))
+    return hashlib.sha256(solve_content.encode("utf-8")).hexdigest()
+
+
+def generate_comm(project_config, project_dir=None):
+    """Conteúdo completo do calcul.comm de um project.json (dict), sem escrever arquivos."""
+    study = prepare_study(project_config, project_dir)
+    return render_comm(study, study["lc_data"]["runs"], study["lc_data"].get("mult"))
+
+# ---------------------------------------------------------
+# 6. Escrita dos Arquivos do Projeto
+# ---------------------------------------------------------
+
+def export_meshes(mesh_config, mesh_root):
+    """Linhas F mmed do export.export: malhas relativas a mesh_root, mesmas unidades do LIRE_MAILLAGE."""
+    return [
+        {"path": os.path.abspath(os.path.join(mesh_root, m.get("filename", f"{m['name']}.med"))), "unit": m.get("unit", 80 + i)}
+        for i, m in enumerate(mesh_config)
+    ]
+
+
+def render_export(run_dir, comm_path, meshes, export_profile, base_mode="R", mass_csv=True):
+    """
+    export.export de uma execução: message, base, resu.med e CSVs em run_dir (temp/ criado).
+    Usado pelo save_project, shards, post_only e variantes do parametric_sweep.
+    """
+    run_dir = os.path.abspath(run_dir)
+    temp_dir = os.path.join(run_dir, "temp")
+    os.makedirs(temp_dir, exist_ok=True)
+    return get_template("export.j2").render(
+        temp_path=temp_dir,
+        comm_path=os.path.abspath(comm_path),
+        meshes=meshes,
+        message_path=os.path.join(run_dir, "message"),
+        base_path=os.path.join(run_dir, "base"),
+        base_mode=base_mode,
+        resu_med_path=os.path.join(run_dir, "resu.med"),
+        mass_csv_path=os.path.join(run_dir, "mass_properties.csv") if mass_csv else None,
+        reactions_csv_path=os.path.join(run_dir, "reactions.csv"),
+        **export_profile
+    )
+
+
+def write_study(project_path, shards=None, post_only=False, project_config=None):
+    """
+    Gera os arquivos em <projeto>/simulation_files: calcul.comm + solve.json (+ shards/ e
+    shards.json quando há mais de um shard) ou, com post_only, post.comm/post.export/post.json.
+    project_config: o project.json já carregado (senão é lido do projeto).
+    """
+    project_dir = Path(project_path)
+    output_dir = project_dir / "simulation_files"
+
+    if project_config is None:
+        # A. Unified Project Config
+        project_file = project_dir / "project.json"
+        project_config = load_json(project_file)
+        if not project_config:
+            raise FileNotFoundError(f"Arquivo de projeto não encontrado em {project_file}")
+
+    study = prepare_study(project_config, project_dir)
+    lc_data = study["lc_data"]
+
+    output_dir.mkdir(exist_ok=True)
+    comm_path = (output_dir / "calcul.comm").resolve()
+
+    # ---------------------------------------------------------
+    # 6b. Modo Pós-processamento (--post_only)
+    # ---------------------------------------------------------
+    # POURSUITE sobre a base do último cálculo (R base ... D 0): só CALC_CHAMP/POST_CHAMP,
+    # reações, massa e IMPR_RESU. calcul.comm não é reescrito; post.json leva a assinatura
+    # da solução para a API conferir com a da base (base.json).
+    if post_only:
+        post_comm_path = (output_dir / "post.comm").resolve()
+        post_export_path = (output_dir / "post.export").resolve()
+        with open(post_comm_path, "w", encoding="utf-8") as f_out:
+            f_out.write(render_comm(study, lc_data["runs"], lc_data.get("mult"), part="post"))
+        with open(post_export_path, "w", encoding="utf-8") as f_out:
+            # Sem malhas: o modelo vem da base (D = só leitura)
+            f_out.write(render_export(output_dir, post_comm_path, [], study["solver_profile"]["export"], base_mode="D"))
+        with open(output_dir / "post.json", "w", encoding="utf-8") as f_out:
+            json.dump({"solve_sha256": solve_signature(study)}, f_out, indent=4)
+        print(f"Success! Post-processing script generated at {post_comm_path}")
+        return {"comm_path": str(post_comm_path), "export_path": str(post_export_path)}
+
+    print(f"Generating auditable script in: {comm_path}")
+    comm_content = render_comm(study, lc_data["runs"], lc_data.get("mult"))
+
+    # Escrita final
     with open(comm_path, "w", encoding="utf-8") as f_out:
         f_out.write(comm_content)
     print(f"Success! .comm script generated at {comm_path}")
-except Exception as e:
-    print(f"CRITICAL ERROR writing script: {e}", file=sys.stderr)
-    sys.exit(1)
+
+    # Assinatura da solução deste calcul.comm: vira base.json quando ele é executado (/run_simulation)
+    comm_sha = hashlib.sha256(comm_content.encode("utf-8")).hexdigest()
+    with open(output_dir / "solve.json", "w", encoding="utf-8") as f_out:
+        json.dump({"comm_sha256": comm_sha, "solve_sha256": solve_signature(study)}, f_out, indent=4)
+
+    n_shards = write_shards(study, project_dir, output_dir, comm_sha, shards)
+    return {"comm_path": str(comm_path), "shards": n_shards}
+
+# ---------------------------------------------------------
+# 7. Sharding dos Load Cases (meca_statique.shards = K ou --shards K)
+# ---------------------------------------------------------
+# Cada shard é um .comm/.export completo com uma parte dos casos e seu próprio resu.med;
+# a execução (simulation_scheduler) roda os shards em paralelo e med_merge_results.py junta
+# os campos por caso (mesmos nomes MED de extract_results.j2) em simulation_files/resu.med.
+
+def write_shards(study, project_dir, output_dir, comm_sha, shards=None):
+    shards_dir = output_dir / "shards"
+    shards_manifest = output_dir / "shards.json"
+    lc_data = study["lc_data"]
+
+    n_shards = shards if shards is not None else int(study["meca_base"].get("shards", 1) or 1)
+    n_shards = max(1, min(n_shards, len(lc_data["runs"])))
+    if n_shards > 1 and lc_data.get("mult"):
+        # MACRO_ELAS_MULT já resolve todos os casos com uma fatorização
+        print("[SHARDS] MACRO_ELAS_MULT mode: load cases not sharded")
+        n_shards = 1
+
+    if n_shards == 1:
+        if shards_manifest.exists():
+            shards_manifest.unlink()
+        return 1
+
+    shard_export = dict(study["solver_profile"]["export"])
+    # Os shards rodam ao mesmo tempo: divide as threads do perfil (memória: o modelo inteiro por shard)
+    shard_export["ncpus"] = max(1, shard_export["ncpus"] // n_shards)
+    mesh_paths = export_meshes(study["mesh_config"], project_dir)
+
+    if shards_dir.exists():
+        shutil.rmtree(shards_dir, ignore_errors=True)
+    manifest = []
+    for k in range(n_shards):
+        shard_runs = lc_data["runs"][k::n_shards]
+        shard_dir = (shards_dir / f"shard_{k + 1:02d}").resolve()
+        shard_dir.mkdir(parents=True, exist_ok=True)
+        # Propriedades de massa (TAB_GEOM, unidade 26) só no primeiro shard
+        with open(shard_dir / "calcul.comm", "w", encoding="utf-8") as f_out:
+            f_out.write(render_comm(study, shard_runs, geometric_check=(k == 0)))
+        with open(shard_dir / "export.export", "w", encoding="utf-8") as f_out:
+            f_out.write(render_export(shard_dir, shard_dir / "calcul.comm", mesh_paths, shard_export, mass_csv=(k == 0)))
+        manifest.append({
+            "id": shard_dir.name,
+            "dir": str(shard_dir),
+            "export": str(shard_dir / "export.export"),
+            "cases": [run["case_name"] for run in shard_runs]
+        })
+
+    # O manifesto vale só para este calcul.comm (um .comm salvo pelo frontend o invalida)
+    with open(shards_manifest, "w", encoding="utf-8") as f_out:
+        json.dump({"comm_sha256": comm_sha, "shards": manifest}, f_out, indent=4)
+    print(f"[SHARDS] {len(lc_data['runs'])} load cases in {n_shards} shards: {shards_dir}")
+    return n_shards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gera script .comm do Code_Aster")
+    parser.add_argument("--project_path", type=str, help="Caminho raiz do projeto")
+    parser.add_argument("--shards", type=int, default=None, help="Divide os load cases em N processos Code_Aster (sobrescreve meca_statique.shards)")
+    parser.add_argument("--post_only", action="store_true", help="Gera post.comm/post.export (POURSUITE sobre a base salva) sem refazer a solução")
+    args = parser.parse_args()
+
+    if not args.project_path:
+        # Modo Teste: Sem project_path - não faz nada
+        print("No project_path provided - running in test mode")
+        sys.exit(0)
+
+    try:
+        write_study(args.project_path, shards=args.shards, post_only=args.post_only)
+    except OSError as e:
+        print(f"CRITICAL ERROR writing script: {e}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
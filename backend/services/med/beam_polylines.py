@@ -0,0 +1,297 @@
+"""
+Beam Polylines - Pré-processamento de vigas antes da extrusão.
+1. Encadeia os SEG2 conectados de um grupo em polilinhas (quebra em nós de ramificação).
+2. Funde trechos colineares (dentro de uma tolerância) mantendo as extremidades reais.
+3. Varre a seção de forma contínua ao longo da polilinha (juntas em meia-esquadria).
+Mantém o mapa segmento -> elemento para picking no viewer.
+"""
+import numpy as np
+
+# Seno do desvio angular abaixo do qual dois segmentos são considerados colineares
+COLLINEAR_TOL = 1e-3
+# Cosseno do ângulo de dobra acima do qual a varredura é interrompida (juntas > 90° ganham tampas próprias)
+MITER_LIMIT_COS = 0.0
+# Comprimento mínimo de segmento (mesmo critério do extrusor legado)
+MIN_LENGTH = 1e-6
+
+
+def segment_frame(dir_v):
+    """
+    Sistema local da viga (mesma convenção do extrusor por segmento):
+    X = direção do eixo, Y = Up x X, Z = X x Y. Up global = Z (ou Y para vigas verticais).
+    """
+    up_ref = np.array([0.0, 0.0, 1.0])
+    if abs(np.dot(dir_v, up_ref)) > 0.99:
+        up_ref = np.array([0.0, 1.0, 0.0])
+    y_axis = np.cross(up_ref, dir_v)
+    y_axis /= np.linalg.norm(y_axis)
+    z_axis = np.cross(dir_v, y_axis)
+    z_axis /= np.linalg.norm(z_axis)
+    return y_axis, z_axis
+
+
+def dominant_direction(segs, points):
+    """Direção média (normalizada por segmento) de um grupo de linhas."""
+    vecs = points[segs[:, 1]] - points[segs[:, 0]]
+    lengths = np.linalg.norm(vecs, axis=1)
+    valid = lengths > MIN_LENGTH
+    if not np.any(valid):
+        return None
+    return (vecs[valid] / lengths[valid, None]).mean(axis=0)
+
+
+def chain_segments(segs):
+    """
+    Encadeia segmentos conectados em cadeias de nós.
+    Nós de grau != 2 (extremidades e ramificações) encerram uma cadeia.
+
+    Returns:
+        Lista de (nodes, elements): nodes = [n0, ..., nk], elements = [e0, ..., e(k-1)]
+        onde e_j é o índice do SEG2 original (posição no grupo).
+    """
+    n_nodes = int(segs.max()) + 1 if len(segs) else 0
+    degree = np.bincount(segs.ravel(), minlength=n_nodes)
+
+    adjacency = {}
+    for e, (a, b) in enumerate(segs.tolist()):
+        adjacency.setdefault(a, []).append((e, b))
+        adjacency.setdefault(b, []).append((e, a))
+
+    used = np.zeros(len(segs), dtype=bool)
+    chains = []
+
+    def walk(start, first_edge, first_next):
+        nodes, elements = [start, first_next], [first_edge]
+        used[first_edge] = True
+        current = first_next
+        while degree[current] == 2 and current != start:
+            nxt = [(e, n) for e, n in adjacency[current] if not used[e]]
+            if not nxt:
+                break
+            e, n = nxt[0]
+            used[e] = True
+            nodes.append(n)
+            elements.append(e)
+            current = n
+        return nodes, elements
+
+    # 1. Cadeias abertas: partem de extremidades/ramificações
+    for node in np.flatnonzero((degree > 0) & (degree != 2)).tolist():
+        for e, n in adjacency[node]:
+            if not used[e]:
+                chains.append(walk(node, e, n))
+
+    # 2. Laços fechados restantes (todos os nós com grau 2)
+    for e in np.flatnonzero(~used).tolist():
+        if not used[e]:
+            a, b = segs[e].tolist()
+            chains.append(walk(a, e, b))
+
+    return chains
+
+
+def split_polyline(nodes, elements, points, collinear_tol=COLLINEAR_TOL):
+    """
+    Divide uma cadeia em varreduras e funde vértices colineares.
+
+    Returns:
+        Lista de sweeps: {"vertices": [nós mantidos], "elements": [...], "stations": [...]}
+        stations = comprimento acumulado em cada nó original da varredura
+        (o elemento j ocupa [stations[j], stations[j+1]] ao longo do eixo).
+    """
+    coords = points[nodes]
+    vecs = np.diff(coords, axis=0)
+    lengths = np.linalg.norm(vecs, axis=1)
+
+    sweeps = []
+    current = None
+    prev_dir = None
+    for j, (e, length) in enumerate(zip(elements, lengths)):
+        if length < MIN_LENGTH:
+            continue
+        dir_v = vecs[j] / length
+        if current is None or np.dot(prev_dir, dir_v) < MITER_LIMIT_COS:
+            current = {"vertices": [nodes[j]], "elements": [], "stations": [0.0]}
+            sweeps.append(current)
+        current["vertices"].append(nodes[j + 1])
+        current["elements"].append(e)
+        current["stations"].append(current["stations"][-1] + float(length))
+        prev_dir = dir_v
+
+    # Fusão colinear: um vértice só é mantido se o próximo nó se afasta da reta
+    # que parte do último vértice mantido (evita acumular desvios em membros curvos)
+    for sw in sweeps:
+        verts = sw["vertices"]
+        keep = [verts[0]]
+        for k in range(1, len(verts) - 1):
+            anchor = points[keep[-1]]
+            run = points[verts[k]] - anchor
+            ahead = points[verts[k + 1]] - anchor
+            run_len, ahead_len = np.linalg.norm(run), np.linalg.norm(ahead)
+            if run_len < MIN_LENGTH:
+                continue
+            if np.linalg.norm(np.cross(run / run_len, ahead / ahead_len)) > collinear_tol:
+                keep.append(verts[k])
+        keep.append(verts[-1])
+        sw["vertices"] = keep
+
+    return sweeps
+
+
+def build_beam_sweeps(connectivity, points, collinear_tol=COLLINEAR_TOL):
+    """
+    Pré-processamento completo de um grupo de vigas: encadeia, orienta e funde.
+    Cada varredura é orientada segundo a direção dominante do grupo
+    (evita flips do sistema local Y/Z entre membros do mesmo grupo).
+    """
+    segs = np.asarray(connectivity, dtype=np.int64).reshape(-1, 2)
+    if len(segs) == 0:
+        return []
+
+    avg_dir = dominant_direction(segs, points)
+    sweeps = []
+    for nodes, elements in chain_segments(segs):
+        if avg_dir is not None and np.dot(points[nodes[-1]] - points[nodes[0]], avg_dir) < -MIN_LENGTH:
+            nodes, elements = nodes[::-1], elements[::-1]
+        sweeps.extend(split_polyline(nodes, elements, points, collinear_tol))
+    return sweeps
+
+
+def section_boundary_edges(triangles):
+    """Arestas de contorno (aparecem em um único triângulo), orientadas pelo enrolamento do triângulo."""
+    tris = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    edges = np.concatenate([tris[:, [0, 1]], tris[:, [1, 2]], tris[:, [2, 0]]])
+    keys = np.sort(edges, axis=1)
+    _, inverse, counts = np.unique(keys, axis=0, return_inverse=True, return_counts=True)
+    return edges[counts[inverse.ravel()] == 1]
+
+
+def sweep_rings(vertices, points):
+    """
+    Posição e sistema local de cada anel da varredura.
+    Juntas internas usam o plano bissetor (meia-esquadria): o anel de entrada e o de saída
+    são projetados no plano ao longo de suas direções e promediados.
+    """
+    coords = points[vertices]
+    dirs = np.diff(coords, axis=0)
+    dirs /= np.linalg.norm(dirs, axis=1)[:, None]
+    frames = [segment_frame(d) for d in dirs]
+
+    rings = [(coords[0], frames[0], dirs[0], None)]
+    for k in range(1, len(vertices) - 1):
+        normal = dirs[k - 1] + dirs[k]
+        normal /= np.linalg.norm(normal)
+        rings.append((coords[k], (frames[k - 1], frames[k]), (dirs[k - 1], dirs[k]), normal))
+    rings.append((coords[-1], frames[-1], dirs[-1], None))
+    return rings
+
+
+def place_ring(section_yz, origin, frame, direction, normal):
+    """Coordenadas 3D dos vértices da seção em um anel."""
+    if normal is None:
+        y_axis, z_axis = frame
+        return origin + section_yz[:, :1] * y_axis + section_yz[:, 1:] * z_axis
+
+    placed = []
+    for (y_axis, z_axis), d in zip(frame, direction):
+        p = section_yz[:, :1] * y_axis + section_yz[:, 1:] * z_axis
+        # Projeta ao longo do eixo do segmento até o plano bissetor
+        t = -(p @ normal) / np.dot(d, normal)
+        placed.append(p + t[:, None] * d)
+    return origin + 0.5 * (placed[0] + placed[1])
+
+
+def sweep_section(sweeps, points, section_yz, triangles):
+    """
+    Gera a malha de superfície de todas as varreduras.
+    Tampas (triângulos da seção) só nas extremidades; paredes laterais (quads) só nas arestas
+    de contorno da seção; anéis internos carregam apenas os vértices de contorno.
+
+    Returns:
+        (coords Nx3, offsets, connectivity, cell_sweep) - cell_sweep[i] = índice da varredura da célula i.
+    """
+    tris = np.asarray(triangles, dtype=np.int64).reshape(-1, 3)
+    b_edges = section_boundary_edges(tris)
+    b_verts = np.unique(b_edges)
+    b_local = np.full(len(section_yz), -1, dtype=np.int64)
+    b_local[b_verts] = np.arange(len(b_verts))
+    n_sec, n_b = len(section_yz), len(b_verts)
+
+    coord_blocks, cell_blocks, size_blocks, sweep_ids = [], [], [], []
+    base = 0
+    for s_idx, sw in enumerate(sweeps):
+        rings = sweep_rings(sw["vertices"], points)
+        ring_index = []  # mapa seção -> índice global para cada anel
+        for r, (origin, frame, direction, normal) in enumerate(rings):
+            is_cap = r == 0 or r == len(rings) - 1
+            local = section_yz if is_cap else section_yz[b_verts]
+            coord_blocks.append(place_ring(local, origin, frame, direction, normal))
+            if is_cap:
+                ring_index.append(base + np.arange(n_sec))
+            else:
+                idx = np.full(n_sec, -1, dtype=np.int64)
+                idx[b_verts] = base + np.arange(n_b)
+                ring_index.append(idx)
+            base += len(local)
+
+        # Tampas: início com enrolamento invertido, fim com o original
+        caps = [ring_index[0][tris[:, ::-1]], ring_index[-1][tris]]
+        # Paredes laterais entre anéis consecutivos
+        walls = []
+        for r in range(len(rings) - 1):
+            a, b = ring_index[r], ring_index[r + 1]
+            walls.append(np.stack([a[b_edges[:, 0]], a[b_edges[:, 1]], b[b_edges[:, 1]], b[b_edges[:, 0]]], axis=1))
+
+        tri_cells = np.concatenate(caps)
+        quad_cells = np.concatenate(walls)
+        cell_blocks.extend([tri_cells.ravel(), quad_cells.ravel()])
+        size_blocks.extend([np.full(len(tri_cells), 3), np.full(len(quad_cells), 4)])
+        sweep_ids.append(np.full(len(tri_cells) + len(quad_cells), s_idx, dtype=np.int64))
+
+    if not coord_blocks:
+        return np.zeros((0, 3)), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    sizes = np.concatenate(size_blocks)
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    return np.concatenate(coord_blocks), offsets, np.concatenate(cell_blocks), np.concatenate(sweep_ids)
+
+
+def _cross2(a, b):
+    return a[0] * b[1] - a[1] * b[0]
+
+
+def outline_section(section_mesh, max_vertices=8):
+    """
+    Seção simplificada para LOD grosseiro: casco convexo dos vértices da seção,
+    reduzido a no máximo max_vertices (amostragem uniforme do casco) e triangulado em leque.
+    """
+    verts = np.asarray(section_mesh['vertices'], dtype=np.float64).reshape(-1, 2)
+    if len(verts) < 3:
+        return {"vertices": verts.tolist(), "triangles": []}
+
+    # Monotone chain (Andrew): casco em sentido anti-horário
+    pts = np.unique(verts, axis=0)
+
+    def half(points):
+        chain = []
+        for p in points:
+            while len(chain) >= 2 and _cross2(chain[-1] - chain[-2], p - chain[-2]) <= 0:
+                chain.pop()
+            chain.append(p)
+        return chain[:-1]
+
+    hull = np.array(half(pts) + half(pts[::-1]))
+    if len(hull) > max_vertices:
+        hull = hull[np.linspace(0, len(hull), max_vertices, endpoint=False).astype(int)]
+
+    triangles = [[0, k, k + 1] for k in range(1, len(hull) - 1)]
+    return {"vertices": hull.tolist(), "triangles": triangles}
+
+
+def section_size(section_mesh):
+    """Dimensão característica da seção (diagonal do retângulo envolvente)."""
+    verts = np.asarray(section_mesh['vertices'], dtype=np.float64).reshape(-1, 2)
+    if len(verts) == 0:
+        return 0.0
+    return float(np.linalg.norm(verts.max(axis=0) - verts.min(axis=0)))
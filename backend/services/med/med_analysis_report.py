@@ -47,21 +47,29 @@ def get_mesh_report(file_path):
     except Exception as e:
         return {"status": "error", "message": str(e), "traceback": traceback.format_exc()}
 
+def _last_iteration(file_path, mesh_name, field_name):
+    """(iteration, order, on_nodes) of the last time step of a field."""
+    for on_nodes, entity in ((True, ml.ON_NODES), (False, ml.ON_CELLS)):
+        try:
+            its = ml.GetFieldIterations(entity, file_path, mesh_name, field_name)
+        except:
+            continue
+        if its:
+            it, order = its[-1]
+            return it, order, on_nodes
+    return 1, 1, True
+
 def get_field_report(file_path, field_name, step_idx=0):
     """Extracts field data (Scalars or Vectors) from resu.med."""
     try:
         mesh_names = ml.GetMeshNames(file_path)
         mesh_name = mesh_names[0] if mesh_names else "00000001"
         
-        # Determine if field is Node or Cell based
-        f_obj = None
-        location = "node"
-        try:
-            f_obj = ml.ReadFieldNode(file_path, mesh_name, 0, field_name, 1, 1)
-            location = "node"
-        except:
-            f_obj = ml.ReadFieldCell(file_path, mesh_name, 0, field_name, 1, 1)
-            location = "cell"
+        # Own time step of the field (MACRO_ELAS_MULT: case k is written at NUME_ORDRE k)
+        it, order, on_nodes = _last_iteration(file_path, mesh_name, field_name)
+        reader = ml.ReadFieldNode if on_nodes else ml.ReadFieldCell
+        f_obj = reader(file_path, mesh_name, 0, field_name, it, order)
+        location = "node" if on_nodes else "cell"
             
         arr = f_obj.getArray()
         nb_comp = arr.getNumberOfComponents()
@@ -99,6 +107,31 @@ def get_metadata(file_path):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def get_summary(file_path):
+    """
+    Key outputs per field for the parametric sweep table:
+    DEPL_*: max translation magnitude (DX, DY, DZ); VM_*/SIEQ_*: max von Mises (1st component, VMIS).
+    """
+    try:
+        mesh_names = ml.GetMeshNames(file_path)
+        mesh_name = mesh_names[0] if mesh_names else "00000001"
+        summary = {"max_displacement": {}, "max_vm": {}}
+        for fn in ml.GetAllFieldNames(file_path):
+            if fn.startswith("DEPL_"): key = "max_displacement"
+            elif fn.startswith("VM_") or fn.startswith("SIEQ_"): key = "max_vm"
+            else: continue
+            it, order, on_nodes = _last_iteration(file_path, mesh_name, fn)
+            reader = ml.ReadFieldNode if on_nodes else ml.ReadFieldCell
+            values = reader(file_path, mesh_name, 0, fn, it, order).getArray().toNumPyArray()
+            values = values.reshape(len(values), -1)
+            if key == "max_displacement":
+                summary[key][fn] = float(np.linalg.norm(values[:, :3], axis=1).max())
+            else:
+                summary[key][fn] = float(values[:, 0].max())
+        return {"status": "success", "type": "summary", "data": summary}
+    except Exception as e:
+        return {"status": "error", "message": str(e), "traceback": traceback.format_exc()}
+
 if __name__ == "__main__":
     if len(sys.argv) < 3: sys.exit(1)
     
@@ -107,6 +140,7 @@ if __name__ == "__main__":
     
     if cmd == "--mesh": res = get_mesh_report(path)
     elif cmd == "--meta": res = get_metadata(path)
+    elif cmd == "--summary": res = get_summary(path)
     else: res = get_field_report(path, cmd) # Command is field name
     
     sys.stdout.write("__JSON_START__")
@@ -152,6 +152,18 @@ def get_analysis_meta(file_path):
     except Exception as e:
         return {"status": "error", "message": str(e)}
 
+def _read_field(file_path, mesh_name, field_name):
+    """(field, 'node'|'cell') at the field's own last time step (MACRO_ELAS_MULT: case k is written at NUME_ORDRE k)."""
+    for location, entity, reader in (("node", ml.ON_NODES, ml.ReadFieldNode), ("cell", ml.ON_CELLS, ml.ReadFieldCell)):
+        try:
+            its = ml.GetFieldIterations(entity, file_path, mesh_name, field_name)
+            if its:
+                it, order = its[-1]
+                return reader(file_path, mesh_name, 0, field_name, it, order), location
+        except:
+            continue
+    raise ValueError(f"Field {field_name} not found")
+
 def get_field_data(file_path, field_mode, step_idx=0):
     """
     Extracts specific field data (Deformation or Stress) for Analysis.
@@ -168,7 +180,7 @@ def get_field_data(file_path, field_mode, step_idx=0):
             depl_fn = next((f for f in field_names if "DEPL" in f), None)
             if not depl_fn: return {"status": "error", "message": "DEPL Not Found"}
             
-            f_obj = ml.ReadFieldNode(file_path, mesh_name, 0, depl_fn, 1, 1)
+            f_obj, _ = _read_field(file_path, mesh_name, depl_fn)
             arr_obj = f_obj.getArray()
             nb_comp = arr_obj.getNumberOfComponents()
             raw_data = arr_obj.toNumPyArray().flatten().tolist()
@@ -186,13 +198,8 @@ def get_field_data(file_path, field_mode, step_idx=0):
             f_obj = None
             location = "node"
             try:
-                f_obj = ml.ReadFieldNode(file_path, mesh_name, 0, field_mode, 1, 1)
-                location = "node"
-            except:
-                try:
-                    f_obj = ml.ReadFieldCell(file_path, mesh_name, 0, field_mode, 1, 1)
-                    location = "cell"
-                except: pass
+                f_obj, location = _read_field(file_path, mesh_name, field_mode)
+            except: pass
             
             if not f_obj: return {"status": "error", "message": f"Field {field_mode} Not Found"}
             
@@ -27,6 +27,22 @@ def get_aster_cell_type(mc_type):
     }
     return mapping.get(mc_type, f"TYPE_{mc_type}")
 
+# MEDCoupling -> VTK cell types (mixed skins, e.g. PENTA6 faces, become VTK_POLYGON)
+VTK_CELL_TYPES = {
+    mc.NORM_POINT1: 1, mc.NORM_SEG2: 3, mc.NORM_TRI3: 5, mc.NORM_QUAD4: 9,
+    mc.NORM_TETRA4: 10, mc.NORM_HEXA8: 12
+}
+VTK_POLYGON = 7
+
+def split_nodal_connectivity(conn, idx):
+    """
+    Remove o código de tipo que o MEDCoupling guarda no início de cada célula
+    ([type, n0, n1, ..., type, m0, ...]) e devolve (offsets, connectivity) sem laço por célula.
+    """
+    keep = np.ones(len(conn), dtype=bool)
+    keep[idx[:-1]] = False
+    return idx - np.arange(len(idx)), conn[keep]
+
 def perform_extrusion(file_path, geometries=None):
     if not os.path.exists(file_path):
         return {"status": "error", "message": f"File not found: {file_path}"}
@@ -72,7 +88,8 @@ def perform_extrusion(file_path, geometries=None):
                         thickness = float(params.get('thickness', 0.0))
                         offset_val = float(params.get('offset', 0.0))
                         model_type = str(geom.get('type', '')).upper()
-                        is_shell = model_type in ('DKT', 'DST', 'COQUE_3D', 'MEMBRANE') or \
+                        is_shell = geom.get('_category') == '2D' or \
+                                   model_type in ('DKT', 'DST', 'COQUE_3D', 'MEMBRANE') or \
                                    'SHELL' in model_type or 'QUAD' in model_type or 'TRIA' in model_type
                     
                     if is_shell and thickness > 0:
@@ -95,15 +112,15 @@ def perform_extrusion(file_path, geometries=None):
                         
                         # Add Original to merge list
                         submeshes_to_merge.append(group_mesh)
-                        group_meta.append((g_name, False))
+                        group_meta.append((g_name, False, thickness))
                         
-                        # Add Extruded Skin to merge list
+                        # Add Extruded Skin to merge list (same suffix as vtk_extruder)
                         submeshes_to_merge.append(skin_mesh)
-                        group_meta.append((g_name + "_EXTRUDED", True))
+                        group_meta.append((g_name + "_EXTRUSION", True, thickness))
                     else:
                         # Regular group without extrusion
                         submeshes_to_merge.append(group_mesh)
-                        group_meta.append((g_name, False))
+                        group_meta.append((g_name, False, 0.0))
                     continue # Succeeded with cell group
             except: pass
             
@@ -123,42 +140,42 @@ def perform_extrusion(file_path, geometries=None):
             
         merged_mesh = mc.MEDCouplingUMesh.MergeUMeshes(submeshes_to_merge)
         
-        all_points = merged_mesh.getCoords().toNumPyArray().tolist()
-        merged_con = merged_mesh.getNodalConnectivity().toNumPyArray().flatten()
-        merged_idx = merged_mesh.getNodalConnectivityIndex().toNumPyArray().flatten()
+        all_points = merged_mesh.getCoords().toNumPyArray().ravel()
+        merged_con = merged_mesh.getNodalConnectivity().toNumPyArray().ravel()
+        merged_idx = merged_mesh.getNodalConnectivityIndex().toNumPyArray().ravel()
+        offsets, connectivity = split_nodal_connectivity(merged_con, merged_idx)
         
         cells_output = {}
         cell_ptr = 0
         
-        for i, (final_name, is_ext) in enumerate(group_meta):
+        for i, (final_name, is_ext, thickness) in enumerate(group_meta):
             mesh = submeshes_to_merge[i]
             n_c = mesh.getNumberOfCells()
-            connectivity = []
-            
-            # Identify VTK type
-            mc_type = mesh.getTypeOfCell(0)
-            vtk_type = "unknown"
-            if mc_type == mc.NORM_SEG2: vtk_type = "line"
-            elif mc_type == mc.NORM_TRI3: vtk_type = "triangle"
-            elif mc_type == mc.NORM_QUAD4: vtk_type = "quad"
-            
-            for _ in range(n_c):
-                start, end = int(merged_idx[cell_ptr]), int(merged_idx[cell_ptr+1])
-                connectivity.append(merged_con[start:end].tolist())
-                cell_ptr += 1
+
+            # Identify VTK type (mixed skins fall back to polygon)
+            types = mesh.getAllGeoTypes()
+            vtk_type = VTK_CELL_TYPES.get(types[0], VTK_POLYGON) if len(types) == 1 else VTK_POLYGON
+
+            # Fatia do grupo no buffer mesclado: uma única conversão para lista por grupo
+            group_offsets = offsets[cell_ptr:cell_ptr + n_c + 1]
+            group_conn = connectivity[group_offsets[0]:group_offsets[-1]]
+            cell_ptr += n_c
                 
             cells_output[final_name] = {
-                "type": vtk_type,
-                "connectivity": connectivity,
+                "vtk_type": vtk_type,
+                "offsets": (group_offsets - group_offsets[0]).tolist(),
+                "connectivity": group_conn.tolist(),
                 "count": n_c,
-                "is_extruded": is_ext
+                "is_extruded": is_ext,
+                "is_base": not is_ext,
+                "thickness": thickness
             }
             
         return {
             "status": "success",
-            "points": all_points,
+            "points": all_points.tolist(),
             "cells": cells_output,
-            "num_points": len(all_points),
+            "num_points": len(all_points) // 3,
             "num_groups": len(cells_output)
         }
     except Exception as e:
@@ -174,4 +191,7 @@ if __name__ == "__main__":
                 d = json.load(f)
                 geos = d if isinstance(d, list) else d.get("geometries")
         except: pass
-    print(json.dumps(perform_extrusion(sys.argv[1], geos)))
+    # Markers like med_mesher: env_launch.bat may print to stdout before the payload
+    sys.stdout.write("__JSON_START__")
+    sys.stdout.write(json.dumps(perform_extrusion(sys.argv[1], geos)))
+    sys.stdout.write("__JSON_END__")
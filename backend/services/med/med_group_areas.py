@@ -0,0 +1,50 @@
+import sys
+import json
+import traceback
+
+# ==============================================================================
+# MED_GROUP_AREAS.PY - SURFACE GROUP AREAS
+# Input : one or more .med mesh files
+# Output: {mesh_path: {group: area}} for every group holding 2D cells
+#         (FORCE_COQUE total force -> pressure, see builders/force_coque.py).
+# One measure field per mesh level, then one indexed sum per group.
+# ==============================================================================
+
+try:
+    import MEDLoader as ml
+    import numpy as np
+except ImportError:
+    ml = None
+    np = None
+
+
+def get_group_areas(file_path):
+    areas = {}
+    mm = ml.MEDFileMesh.New(file_path)
+    for level in mm.getNonEmptyLevels():
+        level_mesh = mm.getMeshAtLevel(level)
+        if level_mesh.getMeshDimension() != 2:
+            continue
+        # |area| of every cell of the level, computed once for all groups
+        measures = level_mesh.getMeasureField(True).getArray().toNumPyArray().ravel()
+        for group in mm.getGroupsOnSpecifiedLev(level):
+            ids = mm.getGroupArr(level, group).toNumPyArray()
+            areas[group] = areas.get(group, 0.0) + float(np.sum(measures[ids]))
+    return areas
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2: sys.exit(1)
+
+    if ml is None:
+        res = {"status": "error", "message": "MEDLoader not available"}
+    else:
+        try:
+            res = {"status": "success", "areas": {path: get_group_areas(path) for path in sys.argv[1:]}}
+        except Exception as e:
+            traceback.print_exc()
+            res = {"status": "error", "message": str(e)}
+
+    sys.stdout.write("__JSON_START__")
+    sys.stdout.write(json.dumps(res))
+    sys.stdout.write("__JSON_END__")
@@ -0,0 +1,84 @@
+import sys
+import os
+import json
+import shutil
+import traceback
+
+# ==============================================================================
+# MED_MERGE_RESULTS.PY - SHARDED RUN MERGE
+# Input : simulation_files/ with shards.json (generate_comm.py --shards K)
+# Output: simulation_files/resu.med with the fields of every shard (one set of
+#         DEPL_/REAC_/SIPO_/VM_..._<case> fields per load case, same names as a
+#         single run), plus reactions.csv / mass_properties.csv / message.
+# ==============================================================================
+
+try:
+    import MEDLoader as ml
+except ImportError:
+    ml = None
+
+MANIFEST = "shards.json"
+
+
+def _concat(paths, target, header=None):
+    with open(target, "w", encoding="utf-8") as f_out:
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            if header:
+                f_out.write(header.format(name=os.path.basename(os.path.dirname(path))))
+            with open(path, "r", encoding="utf-8", errors="ignore") as f_in:
+                shutil.copyfileobj(f_in, f_out)
+
+
+def merge_shards(sim_dir):
+    with open(os.path.join(sim_dir, MANIFEST), "r", encoding="utf-8") as f:
+        shards = json.load(f)["shards"]
+
+    resu_paths = [os.path.join(s["dir"], "resu.med") for s in shards]
+    missing = [p for p in resu_paths if not os.path.exists(p)]
+    if missing:
+        return {"status": "error", "message": f"Missing shard results: {missing}"}
+
+    # Mesh of the first shard (the same mesh in all of them) + its fields, then the fields of the others.
+    # Field names carry the case name, so they never collide.
+    data = ml.MEDFileData(resu_paths[0])
+    fields = data.getFields()
+    for path in resu_paths[1:]:
+        other = ml.MEDFileFields(path)
+        for i in range(other.getNumberOfFields()):
+            fields.pushField(other[i])
+
+    # Write next to the final file, then replace (the viewer may be reading the old resu.med)
+    target = os.path.join(sim_dir, "resu.med")
+    tmp_path = target + ".merge"
+    data.write(tmp_path, 2)
+    os.replace(tmp_path, target)
+
+    _concat([os.path.join(s["dir"], "reactions.csv") for s in shards], os.path.join(sim_dir, "reactions.csv"))
+    _concat([os.path.join(s["dir"], "message") for s in shards], os.path.join(sim_dir, "message"),
+            header="\n# ===== {name} =====\n")
+    mass_path = os.path.join(shards[0]["dir"], "mass_properties.csv")
+    if os.path.exists(mass_path):
+        shutil.copyfile(mass_path, os.path.join(sim_dir, "mass_properties.csv"))
+
+    return {"status": "success", "shards": len(shards), "fields": fields.getNumberOfFields(), "file": target}
+
+
+if __name__ == "__main__":
+    if len(sys.argv) < 2: sys.exit(1)
+
+    if ml is None:
+        res = {"status": "error", "message": "MEDLoader not available"}
+    else:
+        try:
+            res = merge_shards(sys.argv[1])
+        except Exception as e:
+            traceback.print_exc()
+            res = {"status": "error", "message": str(e)}
+
+    print(f"[MERGE] {res}")
+    sys.stdout.write("__JSON_START__")
+    sys.stdout.write(json.dumps(res))
+    sys.stdout.write("__JSON_END__")
+    sys.exit(0 if res["status"] == "success" else 1)
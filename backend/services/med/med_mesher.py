@@ -90,7 +90,7 @@ def extract_mesh_data(file_path):
             # VTK Type
             try:
                 mc_type = mesh_obj.getTypeOfCell(0)
-                mapping = {mc.NORM_SEG2: 3, mc.NORM_TRI3: 5, mc.NORM_QUAD4: 9, mc.NORM_TETRA4: 10, mc.NORM_HEXA8: 12}
+                mapping = {mc.NORM_SEG2: 3, mc.NORM_SEG3: 21, mc.NORM_TRI3: 5, mc.NORM_QUAD4: 9, mc.NORM_TETRA4: 10, mc.NORM_HEXA8: 12}
                 vtk_type = mapping.get(mc_type, 5)
             except: vtk_type = 5
 
@@ -87,6 +87,18 @@ def get_field_meta(file_path):
     except Exception as e:
         return {"status": "error", "message": str(e), "traceback": traceback.format_exc()}
 
+def _read_field(file_path, mesh_name, field_name):
+    """(field, 'node'|'cell') at the field's own last time step (MACRO_ELAS_MULT: case k is written at NUME_ORDRE k)."""
+    for location, entity, reader in (("node", ml.ON_NODES, ml.ReadFieldNode), ("cell", ml.ON_CELLS, ml.ReadFieldCell)):
+        try:
+            its = ml.GetFieldIterations(entity, file_path, mesh_name, field_name)
+            if its:
+                it, order = its[-1]
+                return reader(file_path, mesh_name, 0, field_name, it, order), location
+        except:
+            continue
+    raise ValueError(f"Field {field_name} not found")
+
 def extract_nodal_displacement(file_path, step_idx=0):
     """Extracts DEPL field and returns point deltas as a proper 3D vector."""
     try:
@@ -103,7 +115,7 @@ def extract_nodal_displacement(file_path, step_idx=0):
         coords = mesh_obj.getCoords().toNumPyArray().flatten().tolist()
         
         # Read Field
-        f_depl = ml.ReadFieldNode(file_path, mesh_name, 0, depl_field, 1, 1)
+        f_depl, _ = _read_field(file_path, mesh_name, depl_field)
         arr_obj = f_depl.getArray()
         nb_comp = arr_obj.getNumberOfComponents()
         raw_data = arr_obj.toNumPyArray().flatten().tolist()
@@ -128,12 +140,8 @@ def calculate_von_mises(file_path, step_idx=0):
         vm_field = next((f for f in field_names if f.startswith("VM_")), None)
         
         if vm_field:
-            # Code_Aster usually outputs VM at nodes (ReadFieldNode)
-            try:
-                f_vm = ml.ReadFieldNode(file_path, mesh_name, 0, vm_field, 1, 1)
-            except:
-                # If fail, try Cell
-                f_vm = ml.ReadFieldCell(file_path, mesh_name, 0, vm_field, 1, 1)
+            # Code_Aster usually outputs VM at nodes (cells as fallback)
+            f_vm, _ = _read_field(file_path, mesh_name, vm_field)
                 
             arr = f_vm.getArray().toNumPyArray()
             return {"status": "success", "field_name": vm_field, "data": arr.flatten().tolist()}
@@ -143,10 +151,7 @@ def calculate_von_mises(file_path, step_idx=0):
         if not sigm_field:
             return {"status": "error", "message": "No Stress field found"}
 
-        try:
-            f_sigm = ml.ReadFieldNode(file_path, mesh_name, 0, sigm_field, 1, 1)
-        except:
-            f_sigm = ml.ReadFieldCell(file_path, mesh_name, 0, sigm_field, 1, 1)
+        f_sigm, _ = _read_field(file_path, mesh_name, sigm_field)
             
         arr = f_sigm.getArray().toNumPyArray() 
         
@@ -182,11 +187,7 @@ if __name__ == "__main__":
             mesh_name = mesh_names[0] if mesh_names else "00000001"
             
             # Auto-detect if it's Nodal or Cell
-            f_obj = None
-            try:
-                f_obj = ml.ReadFieldNode(target_med, mesh_name, 0, mode, 1, 1)
-            except:
-                f_obj = ml.ReadFieldCell(target_med, mesh_name, 0, mode, 1, 1)
+            f_obj, _ = _read_field(target_med, mesh_name, mode)
             
             if f_obj:
                 arr_obj = f_obj.getArray()
@@ -0,0 +1,178 @@
+"""
+Shell Solid - Solidificação das cascas (modo 'welded' do extrusor).
+1. Solda nós coincidentes do grupo (tolerância) e compacta para os nós usados.
+2. Orienta as faces de forma consistente por vizinhança (mantém a normal do MED na semente).
+3. Gera topo/fundo deslocados pela normal média dos nós e paredes laterais só nas arestas livres.
+Saída em um único buffer (offsets + connectivity) de triângulos/quads.
+"""
+from collections import deque
+import numpy as np
+
+# Tolerância (absoluta, unidades da malha) para soldar nós coincidentes
+WELD_TOL = 1e-6
+# Tipo VTK da saída mista tri/quad
+VTK_POLYGON = 7
+
+
+def weld_points(points, connectivity, tol=WELD_TOL):
+    """
+    Solda nós coincidentes referenciados pela conectividade.
+    Retorna (coords Mx3 compactas, connectivity reindexada).
+    """
+    used, local = np.unique(connectivity, return_inverse=True)
+    keys = np.round(points[used] / tol).astype(np.int64)
+    _, first, welded = np.unique(keys, axis=0, return_index=True, return_inverse=True)
+    welded = welded.ravel()
+    return points[used[first]], welded[local.ravel()]
+
+
+def clean_faces(offsets, connectivity):
+    """
+    Remove vértices repetidos consecutivos (criados pela solda) e faces degeneradas.
+    Só as faces afetadas passam pelo laço Python.
+    """
+    sizes = np.diff(offsets)
+    nxt = np.arange(len(connectivity)) + 1
+    nxt[offsets[1:] - 1] = offsets[:-1]
+    repeated = connectivity == connectivity[nxt]
+    if not np.any(repeated):
+        return offsets, connectivity
+
+    bad = np.zeros(len(sizes), dtype=bool)
+    bad[np.searchsorted(offsets, np.flatnonzero(repeated), side='right') - 1] = True
+
+    faces = []
+    for f in range(len(sizes)):
+        face = connectivity[offsets[f]:offsets[f + 1]]
+        if bad[f]:
+            keep = face != np.roll(face, -1)
+            face = face[keep]
+            if len(np.unique(face)) < 3:
+                continue
+        faces.append(face)
+
+    new_sizes = np.fromiter((len(f) for f in faces), dtype=np.int64, count=len(faces))
+    new_offsets = np.zeros(len(faces) + 1, dtype=np.int64)
+    np.cumsum(new_sizes, out=new_offsets[1:])
+    new_conn = np.concatenate(faces) if faces else np.zeros(0, dtype=np.int64)
+    return new_offsets, new_conn
+
+
+def half_edges(offsets, connectivity):
+    """Arestas orientadas (origem, destino, face) de todas as faces."""
+    sizes = np.diff(offsets)
+    face_of = np.repeat(np.arange(len(sizes)), sizes)
+    nxt = np.arange(len(connectivity)) + 1
+    nxt[offsets[1:] - 1] = offsets[:-1]
+    return connectivity, connectivity[nxt], face_of
+
+
+def orient_faces(offsets, connectivity, n_points):
+    """
+    Orientação consistente por busca em largura sobre arestas manifold (2 faces).
+    Cada componente conexa mantém a orientação da sua primeira face (normal do MED).
+    Retorna a máscara de faces a inverter.
+    """
+    n_faces = len(offsets) - 1
+    src, dst, face_of = half_edges(offsets, connectivity)
+    key = np.minimum(src, dst) * n_points + np.maximum(src, dst)
+    order = np.argsort(key, kind='stable')
+    k_sorted = key[order]
+
+    # Pares de meias-arestas que compartilham a mesma aresta (apenas arestas com exatamente 2 usos)
+    starts = np.flatnonzero(np.r_[True, k_sorted[1:] != k_sorted[:-1]])
+    counts = np.diff(np.r_[starts, len(k_sorted)])
+    pairs = starts[counts == 2]
+    h0, h1 = order[pairs], order[pairs + 1]
+    f0, f1 = face_of[h0], face_of[h1]
+    same_dir = src[h0] == src[h1]  # mesma direção -> orientações opostas
+
+    adjacency = [[] for _ in range(n_faces)]
+    for a, b, s in zip(f0.tolist(), f1.tolist(), same_dir.tolist()):
+        adjacency[a].append((b, s))
+        adjacency[b].append((a, s))
+
+    flip = np.zeros(n_faces, dtype=bool)
+    visited = np.zeros(n_faces, dtype=bool)
+    for seed in range(n_faces):
+        if visited[seed]:
+            continue
+        visited[seed] = True
+        queue = deque([seed])
+        while queue:
+            f = queue.popleft()
+            for nb, s in adjacency[f]:
+                if not visited[nb]:
+                    visited[nb] = True
+                    flip[nb] = flip[f] ^ s
+                    queue.append(nb)
+    return flip
+
+
+def flip_faces(offsets, connectivity, flip):
+    """Inverte a ordem dos vértices das faces marcadas (mantendo o primeiro vértice)."""
+    if not np.any(flip):
+        return connectivity
+    conn = connectivity.copy()
+    for f in np.flatnonzero(flip):
+        a, b = offsets[f], offsets[f + 1]
+        conn[a + 1:b] = conn[a + 1:b][::-1]
+    return conn
+
+
+def vertex_normals(coords, offsets, connectivity):
+    """Normais nos nós: soma das normais de Newell das faces (ponderadas pela área)."""
+    src, dst, face_of = half_edges(offsets, connectivity)
+    face_n = np.zeros((len(offsets) - 1, 3))
+    np.add.at(face_n, face_of, np.cross(coords[src], coords[dst]))
+
+    normals = np.zeros_like(coords)
+    np.add.at(normals, connectivity, face_n[face_of])
+    lengths = np.linalg.norm(normals, axis=1)
+    lengths[lengths == 0] = 1.0
+    return normals / lengths[:, None]
+
+
+def free_edges(offsets, connectivity, n_points):
+    """Meias-arestas (origem, destino) das arestas usadas por uma única face."""
+    src, dst, _ = half_edges(offsets, connectivity)
+    key = np.minimum(src, dst) * n_points + np.maximum(src, dst)
+    _, inverse, counts = np.unique(key, return_inverse=True, return_counts=True)
+    free = counts[inverse.ravel()] == 1
+    return src[free], dst[free]
+
+
+def solidify_shell(points, offsets, connectivity, thickness, offset=0.0, weld_tol=WELD_TOL):
+    """
+    Casca -> sólido fechado.
+    Nós do fundo em [0, M), nós do topo em [M, 2M); faces do fundo invertidas,
+    faces do topo e paredes (quads) apenas nas arestas livres.
+    Retorna (coords 2Mx3, offsets, connectivity).
+    """
+    points = np.asarray(points, dtype=np.float64).reshape(-1, 3)
+    offsets = np.asarray(offsets, dtype=np.int64)
+    connectivity = np.asarray(connectivity, dtype=np.int64)
+
+    coords, conn = weld_points(points, connectivity, weld_tol)
+    offsets, conn = clean_faces(offsets, conn)
+    n = len(coords)
+    if len(offsets) < 2:
+        return np.zeros((0, 3)), np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    conn = flip_faces(offsets, conn, orient_faces(offsets, conn, n))
+    normals = vertex_normals(coords, offsets, conn)
+
+    bottom = coords + normals * (offset - thickness / 2.0)
+    top = bottom + normals * thickness
+
+    # Fundo: ordem invertida para a normal apontar para fora do sólido
+    sizes = np.diff(offsets)
+    bottom_conn = flip_faces(offsets, conn, np.ones(len(sizes), dtype=bool))
+    a, b = free_edges(offsets, conn, n)
+    walls = np.column_stack([a, b, b + n, a + n]).ravel()
+
+    all_sizes = np.concatenate([sizes, sizes, np.full(len(a), 4, dtype=np.int64)])
+    out_offsets = np.zeros(len(all_sizes) + 1, dtype=np.int64)
+    np.cumsum(all_sizes, out=out_offsets[1:])
+    out_conn = np.concatenate([bottom_conn, conn + n, walls])
+    return np.vstack([bottom, top]), out_offsets, out_conn
@@ -1,9 +1,13 @@
 import os
 import subprocess
 import json
+import tempfile
+import base64
 import vtk
 import numpy as np
 from vtk.util import numpy_support
+from services.med.beam_polylines import COLLINEAR_TOL, build_beam_sweeps, sweep_section, outline_section, section_size
+from services.med.shell_solid import VTK_POLYGON, solidify_shell
 
 # ==============================================================================
 # PATH CONFIGURATION (SALOME / MED ENVIRONMENT)
@@ -18,6 +22,15 @@ PROJECT_ROOT = os.path.dirname(BACKEND_DIR)
 MED_ENV_DIR = os.path.join(PROJECT_ROOT, "MEDCOUPLING-9.15.0", "MEDCOUPLING-9.15.0")
 # Standalone Mesher Script in the same directory
 MESHER_SCRIPT = os.path.join(THIS_DIR, "med_mesher.py")
+# Native MEDCoupling extrusion engine (buildExtrudedMesh + buildBoundaryMesh)
+MED_EXTRUDER_SCRIPT = os.path.join(THIS_DIR, "med_extruder.py")
+
+# 3D generation engines: 'vtk' = med_mesher + in-memory extrusion, 'med' = med_extruder in the MED env
+ENGINES = ("vtk", "med")
+
+# Shell extrusion modes: 'welded' = NumPy solidification (shell_solid), 'vtk' = legacy filter chain
+SHELL_MODES = ("welded", "vtk")
+DEFAULT_SHELL_MODE = "welded"
 
 # VTK type mapping for point counts (used for backup/auto-detect if needed)
 VTK_NODES_MAP = {
@@ -28,188 +41,209 @@ VTK_NODES_MAP = {
     12: 8   # VTK_HEXAHEDRON
 }
 
+# Nós por célula -> (tipo VTK, nome) das superfícies homogêneas
+SURFACE_CELL_TYPES = {3: (5, "triangle"), 4: (9, "quad")}
+
+def cells_from_lists(cells):
+    """
+    Converte conectividade em Lista de Listas para o par (offsets, connectivity) NumPy.
+    Caminho rápido para grupos homogêneos (mesmo número de nós por célula).
+    """
+    if cells is None or len(cells) == 0:
+        return np.zeros(1, dtype=np.int64), np.zeros(0, dtype=np.int64)
+
+    try:
+        arr = np.asarray(cells, dtype=np.int64)
+    except ValueError:
+        arr = None  # Células de tamanhos variados
+
+    if arr is not None and arr.ndim == 2:
+        n_cells, n_nodes = arr.shape
+        offsets = np.arange(0, (n_cells + 1) * n_nodes, n_nodes, dtype=np.int64)
+        return offsets, arr.ravel()
+
+    sizes = np.fromiter((len(c) for c in cells), dtype=np.int64, count=len(cells))
+    offsets = np.zeros(len(sizes) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=offsets[1:])
+    connectivity = np.fromiter((i for c in cells for i in c), dtype=np.int64, count=int(offsets[-1]))
+    return offsets, connectivity
+
+def cells_to_lists(offsets, connectivity):
+    """
+    Inverso de cells_from_lists: volta para Lista de Listas (formato JSON legado).
+    """
+    if len(offsets) < 2:
+        return []
+    sizes = np.diff(offsets)
+    if np.all(sizes == sizes[0]):
+        return connectivity.reshape(-1, int(sizes[0])).tolist()
+    return [c.tolist() for c in np.split(connectivity, offsets[1:-1])]
+
+def cells_to_vtk_legacy(offsets, connectivity):
+    """
+    Monta o array de células no layout legado do VTK: [n, i0, i1, ..., n, j0, ...].
+    É o formato que o vtk.js consome direto em getPolys().setData().
+    """
+    sizes = np.diff(offsets)
+    return np.insert(connectivity, offsets[:-1], sizes)
+
+def surface_cell_type(offsets):
+    """
+    (vtk_type, nome) das células de superfície de um grupo: TRIANGLE / QUAD quando todas têm o
+    mesmo número de nós, senão VTK_POLYGON (extrusões misturam tampas triangulares e faces quad).
+    """
+    sizes = np.unique(np.diff(offsets))
+    if len(sizes) == 1 and int(sizes[0]) in SURFACE_CELL_TYPES:
+        return SURFACE_CELL_TYPES[int(sizes[0])]
+    return VTK_POLYGON, "polygon"
+
+def cells_to_vtk(offsets, connectivity):
+    """Cria um vtkCellArray a partir de (offsets, connectivity) sem laço Python."""
+    cell_array = vtk.vtkCellArray()
+    cell_array.SetData(
+        numpy_support.numpy_to_vtkIdTypeArray(np.ascontiguousarray(offsets, dtype=np.int64), deep=True),
+        numpy_support.numpy_to_vtkIdTypeArray(np.ascontiguousarray(connectivity, dtype=np.int64), deep=True)
+    )
+    return cell_array
+
+def points_to_vtk(points):
+    """Cria vtkPoints a partir de uma lista plana [x1, y1, z1, ...] ou array Nx3."""
+    coords = np.ascontiguousarray(np.asarray(points, dtype=np.float64).reshape(-1, 3))
+    pts = vtk.vtkPoints()
+    pts.SetData(numpy_support.numpy_to_vtk(coords, deep=True))
+    return pts
+
+def pack_typed_array(arr, dtype):
+    """
+    Serializa um array NumPy como bytes base64 (little-endian) para o frontend
+    reconstruir direto em Float32Array/Uint32Array, sem listas JSON intermediárias.
+    """
+    data = np.ascontiguousarray(arr, dtype=np.dtype(dtype).newbyteorder('<'))
+    return {
+        "dtype": np.dtype(dtype).name,
+        "length": int(data.size),
+        "b64": base64.b64encode(data.tobytes()).decode('ascii')
+    }
+
 def vtk_dataset_to_dict(vtk_data):
     """
-    Converte um objeto VTK processado (PolyData) de volta para o formato JSON.
+    Converte um objeto VTK processado (PolyData) de volta para o formato em memória.
+    Pontos e conectividade ficam como arrays NumPy (offsets + connectivity).
     """
     if not vtk_data or vtk_data.GetNumberOfPoints() == 0:
-        return {"status": "empty", "points": [], "connectivity": []}
+        return {"status": "empty", "points": np.zeros(0), "offsets": np.zeros(1, dtype=np.int64),
+                "connectivity": np.zeros(0, dtype=np.int64)}
 
     # 1. Extrair Pontos
-    points_array = vtk_data.GetPoints().GetData()
-    numpy_points = numpy_support.vtk_to_numpy(points_array)
-    points_list = numpy_points.flatten().tolist()
+    numpy_points = numpy_support.vtk_to_numpy(vtk_data.GetPoints().GetData())
+
+    # 2. Extrair Conectividade (direto dos vtkCellArray, sem GetCell(i))
+    if isinstance(vtk_data, vtk.vtkPolyData):
+        if vtk_data.GetNumberOfStrips() > 0:
+            tri = vtk.vtkTriangleFilter()
+            tri.SetInputData(vtk_data)
+            tri.PassVertsOn()
+            tri.PassLinesOn()
+            tri.Update()
+            vtk_data = tri.GetOutput()
+        cell_arrays = [vtk_data.GetVerts(), vtk_data.GetLines(), vtk_data.GetPolys()]
+    else:
+        cell_arrays = [vtk_data.GetCells()]
 
-    # 2. Extrair Conectividade
-    connectivity_list = []
-    num_cells = vtk_data.GetNumberOfCells()
-    
-    first_cell_type = vtk_data.GetCellType(0) if num_cells > 0 else 0
+    offsets_parts, conn_parts = [], []
+    base = 0
+    for ca in cell_arrays:
+        if ca is None or ca.GetNumberOfCells() == 0:
+            continue
+        offs = numpy_support.vtk_to_numpy(ca.GetOffsetsArray()).astype(np.int64)
+        conn = numpy_support.vtk_to_numpy(ca.GetConnectivityArray()).astype(np.int64)
+        offsets_parts.append(offs[:-1] + base)
+        conn_parts.append(conn)
+        base += len(conn)
+
+    offsets = np.append(np.concatenate(offsets_parts), base) if offsets_parts else np.zeros(1, dtype=np.int64)
+    connectivity = np.concatenate(conn_parts) if conn_parts else np.zeros(0, dtype=np.int64)
+    num_cells = len(offsets) - 1
 
-    for i in range(num_cells):
-        cell = vtk_data.GetCell(i)
-        pid = cell.GetPointIds()
-        ids = [pid.GetId(j) for j in range(pid.GetNumberOfIds())]
-        connectivity_list.append(ids)
+    first_cell_type = vtk_data.GetCellType(0) if vtk_data.GetNumberOfCells() > 0 else 0
 
     return {
         "vtk_type": first_cell_type,
         "count": num_cells,
-        "points": points_list,
-        "connectivity": connectivity_list
+        "points": numpy_points.ravel(),
+        "offsets": offsets,
+        "connectivity": connectivity
     }
 
-def normalize_line_connectivity(connectivity, points):
-    """
-    Garante que todos os segmentos de linha apontem na mesma direção dominante.
-    Evita 'flips' no sistema de coordenadas local durante a extrusão.
-    """
-    if not connectivity or len(connectivity) < 1:
-        return connectivity
-
-    # 1. Calcula a direção média do grupo (Referência Dominante)
-    avg_dir = np.zeros(3)
-    valid_count = 0
-    for seg in connectivity:
-        if len(seg) < 2: continue
-        p1, p2 = points[seg[0]], points[seg[1]]
-        vec = p2 - p1
-        if np.linalg.norm(vec) > 1e-6:
-            avg_dir += (vec / np.linalg.norm(vec))
-            valid_count += 1
-    
-    if valid_count == 0: return connectivity
-    avg_dir /= valid_count
-    
-    # 2. Normaliza a conectividade: Se o segmento estiver contra a média, inverte.
-    new_conn = []
-    for seg in connectivity:
-        if len(seg) < 2:
-            new_conn.append(seg)
-            continue
-        p1, p2 = points[seg[0]], points[seg[1]]
-        vec = p2 - p1
-        if np.dot(vec, avg_dir) < -1e-6:
-            # Inverte direção
-            new_conn.append([seg[1], seg[0]])
-        else:
-            new_conn.append(seg)
-            
-    return new_conn
-
-def extrude_beam_memory(beam_data, section_mesh, params):
+def extrude_beam_memory(beam_data, section_mesh, params, collinear_tol=COLLINEAR_TOL):
     """
     Gera a geometria 3D das vigas (Sweep/Extrude) usando dados em memória.
+    Os SEG2 do grupo são encadeados em polilinhas e trechos colineares fundidos
+    antes da varredura (beam_polylines), com um mapa célula -> elemento para picking.
     """
     # 1. Prepara a Seção Transversal (2D da memória)
-    s_pts = vtk.vtkPoints()
-    
     # section_mesh['vertices'] é tipicamente [[y1, z1], [y2, z2], ...]
-    verts = section_mesh['vertices']
-    if len(verts) > 0 and isinstance(verts[0], (list, tuple)):
-        for v in verts:
-            s_pts.InsertNextPoint(0, float(v[0]), float(v[1]))
-    else:
-        # Fallback para flat list [y1, z1, y2, z2, ...]
-        for i in range(0, len(verts), 2):
-            s_pts.InsertNextPoint(0, float(verts[i]), float(verts[i+1]))
-    
-    sect_poly = vtk.vtkPolyData()
-    sect_poly.SetPoints(s_pts)
-    cells = vtk.vtkCellArray()
-    for tri in section_mesh['triangles']:
-        cells.InsertNextCell(len(tri), tri)
-    sect_poly.SetPolys(cells)
+    # (ou flat list [y1, z1, y2, z2, ...] como fallback)
+    section_yz = np.asarray(section_mesh['vertices'], dtype=np.float64).reshape(-1, 2)
+    triangles = section_mesh['triangles']
 
     # NOTE: Double offset fix. 
     # The section_mesh vertices already include offset_y and offset_z
     # because section_calculator.py applies them. 
     # Applying them again here would double the displacement.
-    off_filt_output = sect_poly
 
     # 2. Prepara os dados da linha de centro
-    beam_pts = np.array(beam_data['points']).reshape(-1, 3)
-    
-    # NORMALIZAÇÃO: Garante que todos os segmentos apontem na mesma direção dominante.
-    # Isso evita flips nos eixos locais (Y/Z) que causariam 'ziguezague' no offset.
-    normalized_conn = normalize_line_connectivity(beam_data['connectivity'], beam_pts)
+    beam_pts = np.asarray(beam_data['points'], dtype=np.float64).reshape(-1, 3)
     
-    append_filter = vtk.vtkAppendPolyData()
-
-    # 3. Processa cada segmento
-    for seg in normalized_conn:
-        if len(seg) < 2: continue
-        p1, p2 = beam_pts[seg[0]], beam_pts[seg[1]]
-        vec = p2 - p1
-        length = np.linalg.norm(vec)
-        if length < 1e-6: continue
-        dir_v = vec / length
-
-        # ORIENTAÇÃO ROBUSTA (Eixo X alinhado com dir_v + Roll controlado)
-        # x_axis = dir_v
-        # y_axis = perpendicular ao x_axis e ao "Up" global
-        # z_axis = finaliza o sistema ortonormal (alinhado com o "Up" global)
-        
-        x_axis = dir_v
-        up_ref = np.array([0.0, 0.0, 1.0])
-        
-        # Caso a viga seja vertical, usamos o eixo Y como referência para evitar singularidade
-        if abs(np.dot(x_axis, up_ref)) > 0.99:
-            up_ref = np.array([0.0, 1.0, 0.0])
-            
-        y_axis = np.cross(up_ref, x_axis)
-        y_axis /= np.linalg.norm(y_axis)
-        z_axis = np.cross(x_axis, y_axis)
-        z_axis /= np.linalg.norm(z_axis)
-        
-        # Monta a matriz de transformação 4x4
-        # Mapeia: Local X(1,0,0) -> x_axis, Local Y(0,1,0) -> y_axis, Local Z(0,0,1) -> z_axis
-        mat = vtk.vtkMatrix4x4()
-        for i in range(3):
-            mat.SetElement(i, 0, x_axis[i])
-            mat.SetElement(i, 1, y_axis[i])
-            mat.SetElement(i, 2, z_axis[i])
-            mat.SetElement(i, 3, p1[i])
-            
-        trans = vtk.vtkTransform()
-        trans.SetMatrix(mat)
+    # 3. Encadeamento + fusão colinear (orientação pela direção dominante do grupo,
+    # evitando flips nos eixos locais Y/Z que causariam 'ziguezague' no offset)
+    sweeps = build_beam_sweeps(beam_data['connectivity'], beam_pts, collinear_tol)
+    if not sweeps or len(section_yz) == 0:
+        return {"status": "empty", "points": np.zeros(0), "offsets": np.zeros(1, dtype=np.int64),
+                "connectivity": np.zeros(0, dtype=np.int64)}
 
-        t_filt = vtk.vtkTransformPolyDataFilter()
-        t_filt.SetInputData(off_filt_output)
-        t_filt.SetTransform(trans)
-        
-        # Extrusão Linear
-        extruder = vtk.vtkLinearExtrusionFilter()
-        extruder.SetInputConnection(t_filt.GetOutputPort())
-        extruder.SetExtrusionTypeToVectorExtrusion()
-        extruder.SetVector(dir_v)
-        extruder.SetScaleFactor(length)
-        extruder.Update()
-
-        poly_copy = vtk.vtkPolyData()
-        poly_copy.DeepCopy(extruder.GetOutput())
-        append_filter.AddInputData(poly_copy)
-
-    append_filter.Update()
-    return vtk_dataset_to_dict(append_filter.GetOutput())
-
-def extrude_shell_memory(data, params):
+    # 4. Varredura contínua por polilinha
+    coords, offsets, connectivity, cell_sweep = sweep_section(sweeps, beam_pts, section_yz, triangles)
+
+    return {
+        "vtk_type": surface_cell_type(offsets)[0],
+        "count": len(offsets) - 1,
+        "points": coords.ravel(),
+        "offsets": offsets,
+        "connectivity": connectivity,
+        "pick_map": {
+            "cell_sweep": cell_sweep,
+            "sweeps": [{"elements": sw["elements"], "stations": sw["stations"]} for sw in sweeps]
+        }
+    }
+
+def extrude_shell_memory(data, params, mode=DEFAULT_SHELL_MODE):
     """
     Gera a geometria 3D (sólida) das cascas usando parâmetros da memória.
+    mode='welded': nós soldados, paredes só nas arestas livres e buffer compacto (shell_solid).
+    mode='vtk': cadeia legada GeometryFilter -> Normals -> Warp -> LinearExtrusion.
     """
     thickness = float(params.get('thickness', 10.0))
     offset = float(params.get('offset', 0.0))
 
+    if mode == "welded":
+        offsets, connectivity = cells_from_lists(data['connectivity'])
+        coords, out_offsets, out_conn = solidify_shell(data['points'], offsets, connectivity, thickness, offset)
+        if len(coords) == 0:
+            return {"status": "empty", "points": np.zeros(0), "offsets": np.zeros(1, dtype=np.int64),
+                    "connectivity": np.zeros(0, dtype=np.int64)}
+        return {
+            "vtk_type": VTK_POLYGON,
+            "count": len(out_offsets) - 1,
+            "points": coords.ravel(),
+            "offsets": out_offsets,
+            "connectivity": out_conn
+        }
+
     # 1. Reconstrói a malha original no VTK
-    pts = vtk.vtkPoints()
-    p_list = data['points']
-    for i in range(0, len(p_list), 3):
-        pts.InsertNextPoint(p_list[i], p_list[i+1], p_list[i+2])
-    
     grid = vtk.vtkUnstructuredGrid()
-    grid.SetPoints(pts)
-    for cell in data['connectivity']:
-        grid.InsertNextCell(data['vtk_type'], len(cell), cell)
+    grid.SetPoints(points_to_vtk(data['points']))
+    grid.SetCells(data['vtk_type'], cells_to_vtk(*cells_from_lists(data['connectivity'])))
 
     # 2. Converte UnstructuredGrid -> PolyData
     geom = vtk.vtkGeometryFilter()
@@ -280,11 +314,89 @@ def call_med_mesher(file_path):
         
     return {"status": "error", "message": "Mesh extraction failed"}
 
-def med_to_vtk_pipeline(file_path, geometries=[]):
+def call_med_extruder(file_path, geometries):
+    """
+    Executes med_extruder.py within the SALOME environment (geometry configs via a temp JSON file)
+    and returns the parsed JSON. Same stdout marker protocol as call_med_mesher.
+    """
+    if not os.path.exists(MED_ENV_DIR):
+        print(f"[VTK-EXTRUDER] Error: MEDCOUPLING directory not found at {MED_ENV_DIR}")
+        return {"status": "error", "message": "MEDCoupling environment missing"}
+
+    geo_file = None
+    try:
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+            json.dump(geometries or [], f)
+            geo_file = f.name
+
+        cmd = (
+            f'cmd /c "cd /d \"{MED_ENV_DIR}\" && '
+            f'call env_launch.bat && '
+            f'python \"{MED_EXTRUDER_SCRIPT}\" \"{file_path}\" \"{geo_file}\""'
+        )
+
+        print(f"[VTK-EXTRUDER] Executing med_extruder standalone...")
+        result = subprocess.run(cmd, capture_output=True, text=True, shell=True)
+
+        if result.returncode == 0:
+            output = result.stdout
+            if "__JSON_START__" in output and "__JSON_END__" in output:
+                json_str = output.split("__JSON_START__")[1].split("__JSON_END__")[0]
+                return json.loads(json_str)
+            print(f"[VTK-EXTRUDER] Error: Invalid output format from med_extruder: {output}")
+        else:
+            print(f"[VTK-EXTRUDER] med_extruder process failed: {result.stderr}")
+
+    except Exception as e:
+        print(f"[VTK-EXTRUDER] Subprocess Exception: {e}")
+    finally:
+        if geo_file and os.path.exists(geo_file):
+            os.remove(geo_file)
+
+    return {"status": "error", "message": "MED extrusion failed"}
+
+def med_extruder_pipeline(file_path, geometries=[], lod=False):
+    """
+    Alternative engine: shells extruded natively by MEDCoupling (skin of the extruded volume).
+    Returns the same structure as med_to_vtk_pipeline (NumPy points/offsets/connectivity).
+    Beams are not swept by this engine; their groups come back as base lines only.
+    """
+    if not os.path.exists(file_path):
+        return {"status": "error", "message": f"File not found: {file_path}"}
+
+    med_res = call_med_extruder(file_path, geometries)
+    if med_res.get("status") != "success":
+        return med_res
+
+    final_cells = {}
+    for g_name, g_data in med_res.get("cells", {}).items():
+        thickness = float(g_data.pop("thickness", 0.0))
+        g_data["offsets"] = np.asarray(g_data["offsets"], dtype=np.int64)
+        g_data["connectivity"] = np.asarray(g_data["connectivity"], dtype=np.int64)
+        if lod and thickness > 0:
+            group = g_name[:-len("_EXTRUSION")] if g_data.get("is_extruded") else g_name
+            tier = 2 if g_data.get("is_extruded") else 0
+            g_data["lod"] = {"group": group, "tier": tier, "section_size": thickness}
+        final_cells[g_name] = g_data
+
+    points = np.asarray(med_res.get("points", []), dtype=np.float64)
+    return {
+        "status": "success",
+        "points": points,
+        "cells": final_cells,
+        "num_points": len(points) // 3,
+        "num_groups": len(final_cells)
+    }
+
+def med_to_vtk_pipeline(file_path, geometries=[], lod=False, shell_mode=DEFAULT_SHELL_MODE):
     """
     THE PIPELINE: med_mesher -> vtk_extruder logic.
     1. Extracts 'clean' structured mesh data via med_mesher.
     2. Applies in-memory extrusion/visual processing.
+    3. (lod=True) Adds LOD tiers per group, tagged with cells[...]["lod"]:
+       tier 0 = original centerline/midsurface, tier 1 = beam sweep of the
+       simplified outline section, tier 2 = full triangulated section.
+    shell_mode selects the shell solidification ('welded' or legacy 'vtk').
     """
     try:
         if not os.path.exists(file_path):
@@ -305,7 +417,7 @@ def med_to_vtk_pipeline(file_path, geometries=[]):
         if not full_mesh:
              return {"status": "error", "message": "No valid mesh groups found"}
 
-        points = full_mesh.get("points", [])
+        points = np.asarray(full_mesh.get("points", []), dtype=np.float64)
         
         # Build lookup map for geometry configs
         geom_map = {}
@@ -314,14 +426,23 @@ def med_to_vtk_pipeline(file_path, geometries=[]):
             if group_name:
                 geom_map[str(group_name).strip().upper()] = g
 
-        final_points = list(points)
+        # Point blocks are concatenated once at the end; n_points tracks the running index base
+        point_blocks = [points]
+        n_points = len(points) // 3
         final_cells = {}
 
+        def append_extrusion(res):
+            nonlocal n_points
+            base_idx = n_points
+            point_blocks.append(res["points"])
+            n_points += len(res["points"]) // 3
+            return res["offsets"], res["connectivity"] + base_idx
+
         # 3. APPLY EXTRUSION LOGIC PER GROUP
         for g_name, g_data in mesh_groups.items():
             if g_name == "_FULL_MESH_": continue
 
-            connectivity = g_data.get("connectivity", [])
+            offsets, connectivity = cells_from_lists(g_data.get("connectivity", []))
             vtk_type = g_data.get("vtk_type", 0)
             
             # Map Config
@@ -329,7 +450,7 @@ def med_to_vtk_pipeline(file_path, geometries=[]):
             params = geom_config.get('section_params', {}) if geom_config else {}
             
             # Identify Category
-            cell_type_str = {3:'line', 5:'triangle', 9:'quad', 10:'tetra', 12:'hexa', 1:'vertex'}.get(vtk_type, 'unknown')
+            cell_type_str = {3:'line', 21:'line', 5:'triangle', 9:'quad', 10:'tetra', 12:'hexa', 1:'vertex'}.get(vtk_type, 'unknown')
             category = geom_config.get('_category') if geom_config else None
             
             print(f"[PIPELINE] Group: {g_name} | Type: {cell_type_str} | ConfigFound: {bool(geom_config)} | Category: {category}")
@@ -346,66 +467,98 @@ def med_to_vtk_pipeline(file_path, geometries=[]):
                 print(f"[PIPELINE] EXTRUDING BEAM: {g_name}")
                 section_mesh = geom_config.get('section_mesh') # Vertices / Triangles from state
                 
+                # Extremidades de cada elemento: os 2 primeiros nós (SEG3 traz o nó do meio em 3º)
+                starts = offsets[:-1]
                 beam_input = {
                     "points": points,
-                    "connectivity": connectivity
+                    "connectivity": np.stack([connectivity[starts], connectivity[starts + 1]], axis=1)
                 }
                 
                 res = extrude_beam_memory(beam_input, section_mesh, params)
                 
-                # Always keep the ORIGINAL 1D mesh
+                # Always keep the ORIGINAL 1D mesh (as SEG2 between the element ends: one cell per element)
                 final_cells[g_name] = {
                     "type": "line", 
                     "vtk_type": 3,
-                    "connectivity": connectivity, 
+                    "offsets": np.arange(0, 2 * len(starts) + 1, 2, dtype=np.int64),
+                    "connectivity": beam_input["connectivity"].ravel(), 
                     "is_extruded": False,
                     "is_base": True
                 }
 
                 if res.get("status") != "empty":
-                    base_idx = len(final_points) // 3
-                    final_points.extend(res["points"])
-                    translated_conn = [[idx + base_idx for idx in cell] for cell in res["connectivity"]]
+                    ext_offsets, ext_conn = append_extrusion(res)
+                    ext_type, ext_name = surface_cell_type(ext_offsets)
                     final_cells[f"{g_name}_EXTRUSION"] = {
-                        "type": "quad", 
-                        "vtk_type": 9, # VTK_QUAD
-                        "connectivity": translated_conn, 
+                        "type": ext_name, 
+                        "vtk_type": ext_type,
+                        "offsets": ext_offsets,
+                        "connectivity": ext_conn, 
                         "is_extruded": True,
-                        "is_base": False
+                        "is_base": False,
+                        "pick_map": res.get("pick_map")
                     }
 
+                if lod:
+                    size = section_size(section_mesh)
+                    final_cells[g_name]["lod"] = {"group": g_name, "tier": 0, "section_size": size}
+                    if f"{g_name}_EXTRUSION" in final_cells:
+                        final_cells[f"{g_name}_EXTRUSION"]["lod"] = {"group": g_name, "tier": 2, "section_size": size}
+
+                    coarse = extrude_beam_memory(beam_input, outline_section(section_mesh), params)
+                    if coarse.get("status") != "empty":
+                        lod_offsets, lod_conn = append_extrusion(coarse)
+                        lod_type, lod_name = surface_cell_type(lod_offsets)
+                        final_cells[f"{g_name}_EXTRUSION_LOD1"] = {
+                            "type": lod_name,
+                            "vtk_type": lod_type,
+                            "offsets": lod_offsets,
+                            "connectivity": lod_conn,
+                            "is_extruded": True,
+                            "is_base": False,
+                            "lod": {"group": g_name, "tier": 1, "section_size": size}
+                        }
+
             # --- PROCESS SHELLS ---
             elif category == '2D' and float(params.get('thickness', 0)) > 0:
                 print(f"[VTK-EXTRUDER] Processing Shell Extrusion: {g_name}")
                 
                 shell_input = {
                     "points": points,
-                    "connectivity": connectivity,
+                    "connectivity": connectivity.reshape(len(offsets) - 1, -1),
                     "vtk_type": vtk_type
                 }
                 
-                res = extrude_shell_memory(shell_input, params)
+                res = extrude_shell_memory(shell_input, params, mode=shell_mode)
                 
                 # Always keep the ORIGINAL 2D mesh
                 final_cells[g_name] = {
                     "type": cell_type_str, 
                     "vtk_type": vtk_type,
+                    "offsets": offsets,
                     "connectivity": connectivity, 
                     "is_extruded": False,
                     "is_base": True
                 }
 
                 if res.get("status") != "empty":
-                    base_idx = len(final_points) // 3
-                    final_points.extend(res["points"])
-                    translated_conn = [[idx + base_idx for idx in cell] for cell in res["connectivity"]]
+                    ext_offsets, ext_conn = append_extrusion(res)
+                    ext_type, ext_name = surface_cell_type(ext_offsets)
                     final_cells[f"{g_name}_EXTRUSION"] = {
-                        "type": "quad", 
-                        "vtk_type": 9, # VTK_QUAD
-                        "connectivity": translated_conn, 
+                        "type": ext_name, 
+                        "vtk_type": ext_type,
+                        "offsets": ext_offsets,
+                        "connectivity": ext_conn, 
                         "is_extruded": True,
                         "is_base": False
                     }
+
+                if lod:
+                    # Shells: no coarse section tier, the midsurface is already the cheap tier
+                    thickness = float(params.get('thickness', 0))
+                    final_cells[g_name]["lod"] = {"group": g_name, "tier": 0, "section_size": thickness}
+                    if f"{g_name}_EXTRUSION" in final_cells:
+                        final_cells[f"{g_name}_EXTRUSION"]["lod"] = {"group": g_name, "tier": 2, "section_size": thickness}
                     
             # --- PASS-THROUGH (Solid/Other) ---
             else:
@@ -413,16 +566,21 @@ def med_to_vtk_pipeline(file_path, geometries=[]):
                 final_cells[g_name] = {
                     "type": cell_type_str,
                     "vtk_type": vtk_type,
+                    "offsets": offsets,
                     "connectivity": connectivity,
                     "is_extruded": False,
                     "is_base": True
                 }
 
+        # Points/connectivity stay as NumPy arrays; callers choose the serialization
+        # (pack_typed_array for the viewer, cells_to_lists for legacy JSON).
+        final_points = np.concatenate(point_blocks) if len(point_blocks) > 1 else points
+
         return {
             "status": "success",
             "points": final_points,
             "cells": final_cells,
-            "num_points": len(final_points) // 3,
+            "num_points": n_points,
             "num_groups": len(final_cells)
         }
 
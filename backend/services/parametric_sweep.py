@@ -0,0 +1,387 @@
+"""
+Parametric Sweep - N design variants of one project, generated and solved in parallel
+Request: base project + parameters
+    {"path": "geometries[*].section_params.thickness", "values": [8, 10, 12]}
+    {"path": "loads[name=Wind].fz", "start": -1000, "stop": -3000, "steps": 5}
+combined as a grid (cartesian product, default) or zipped.
+Path syntax: dict keys separated by '.', list selectors [i], [*] (all items) or [key=value].
+Every variant gets its own directory <project>/sweeps/<sweep_id>/vNNN/ with the modified
+project.json and simulation_files/{calcul.comm, export.export} (generate_comm.py builders;
+meshes stay in the base project). Beam sections whose parameters changed are recomputed
+on the section worker pool. The variants are queued on the simulation scheduler (bounded by
+cores / memory) and the key outputs are collected into one table: max von Mises, max
+displacement, support reactions and mass.
+"""
+import os
+import re
+import copy
+import json
+import uuid
+import shutil
+import itertools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+
+from services.simulation_scheduler import ACTIVE_STATES, atomic_write
+from services.simulation_results import read_mass_properties, read_reactions
+from services.group_areas import AREAS_FILE
+from services.jinja.builders.solver_profile import build_solver_profile
+from services.jinja.generate_comm import write_study, export_meshes, render_export
+
+SWEEPS_DIR = "sweeps"
+SWEEP_FILE = "sweep.json"
+MAX_VARIANTS = 200
+# In-process generate_comm runs: Jinja rendering holds the GIL, threads only overlap the file
+# writes, so a few are enough (more would not add CPU)
+GENERATE_WORKERS = 4
+
+_TOKEN = re.compile(r"([^.\[\]]+)|\[([^\]]*)\]")
+
+
+# --- Parameter paths ---
+def parse_path(path: str) -> list:
+    """'geometries[name=P1].section_params.t' -> ['geometries', ('name', 'P1'), 'section_params', 't']"""
+    tokens = []
+    for key, selector in _TOKEN.findall(path):
+        if key:
+            tokens.append(key)
+        elif selector == "*":
+            tokens.append("*")
+        elif selector.lstrip("-").isdigit():
+            tokens.append(int(selector))
+        elif "=" in selector:
+            tokens.append(tuple(s.strip() for s in selector.split("=", 1)))
+        else:
+            raise ValueError(f"Invalid selector [{selector}] in '{path}'")
+    if not tokens:
+        raise ValueError(f"Empty parameter path '{path}'")
+    return tokens
+
+
+def _select(node, token):
+    """Children of a node matched by one path token."""
+    if isinstance(token, str) and token != "*":
+        return [node[token]] if isinstance(node, dict) and token in node else []
+    if not isinstance(node, list):
+        return []
+    if token == "*":
+        return node
+    if isinstance(token, int):
+        return [node[token]] if -len(node) <= token < len(node) else []
+    key, value = token
+    return [item for item in node if isinstance(item, dict) and str(item.get(key)) == value]
+
+
+def set_path(config: dict, path: str, value) -> int:
+    """
+    Assign value at every match of the path; returns how many were set (ValueError if none).
+    Only existing keys are replaced: geometries[*].section_params.thickness changes the sections
+    that have a thickness and leaves the others (I, T...) untouched instead of adding an unused key.
+    """
+    tokens = parse_path(path)
+    key = tokens[-1]
+    if not isinstance(key, str) or key == "*":
+        raise ValueError(f"Parameter path must end with a key: '{path}'")
+    parents = [config]
+    for token in tokens[:-1]:
+        parents = [child for node in parents for child in _select(node, token)]
+    parents = [p for p in parents if isinstance(p, dict) and key in p]
+    if not parents:
+        raise ValueError(f"Parameter path matches no existing value in the project: '{path}'")
+    for parent in parents:
+        parent[key] = value
+    return len(parents)
+
+
+def parameter_values(param: dict) -> list:
+    """Explicit 'values' or a linear range 'start' / 'stop' / 'steps' (inclusive)."""
+    if "values" in param:
+        values = list(param["values"])
+    elif {"start", "stop"} <= set(param):
+        steps = int(param.get("steps", 2))
+        if steps < 2:
+            raise ValueError(f"Range of '{param.get('path')}' needs at least 2 steps")
+        start, stop = float(param["start"]), float(param["stop"])
+        values = [start + (stop - start) * i / (steps - 1) for i in range(steps)]
+    else:
+        raise ValueError(f"Parameter '{param.get('path')}' needs 'values' or 'start'/'stop'")
+    if not values:
+        raise ValueError(f"Parameter '{param.get('path')}' has no values")
+    return values
+
+
+def expand_variants(parameters: list, mode: str = "grid") -> list:
+    """[{path: value}] for every variant (grid = cartesian product, zip = i-th value of each)."""
+    if not parameters:
+        raise ValueError("At least one sweep parameter is required")
+    paths = [p["path"] for p in parameters]
+    values = [parameter_values(p) for p in parameters]
+    if mode == "zip":
+        if len({len(v) for v in values}) != 1:
+            raise ValueError("Zipped parameters need the same number of values")
+        combos = list(zip(*values))
+    elif mode == "grid":
+        combos = list(itertools.product(*values))
+    else:
+        raise ValueError(f"Unknown sweep mode '{mode}' (grid or zip)")
+    if len(combos) > MAX_VARIANTS:
+        raise ValueError(f"{len(combos)} variants requested, the limit is {MAX_VARIANTS}")
+    return [dict(zip(paths, combo)) for combo in combos]
+
+
+# --- Variant generation ---
+def _changed_sections(base_config: dict, config: dict) -> list:
+    """Indices of beam geometries (section_properties from FEM) whose section_params changed."""
+    base_geoms = base_config.get("geometries", [])
+    changed = []
+    for i, g in enumerate(config.get("geometries", [])):
+        if not g.get("profile_type") or not g.get("section_properties"):
+            continue
+        if i >= len(base_geoms) or g.get("section_params") != base_geoms[i].get("section_params"):
+            changed.append(i)
+    return changed
+
+
+def resolve_variant_sections(base_config: dict, configs: list):
+    """Recompute the changed beam sections of all variants at once (deduplicated, section workers)."""
+    from services.section_batch import iter_section_batch
+
+    targets, sections = [], []
+    for config in configs:
+        for i in _changed_sections(base_config, config):
+            g = config["geometries"][i]
+            targets.append(g)
+            sections.append({"type": g["profile_type"], "params": g.get("section_params", {})})
+    if not sections:
+        return
+    print(f"[SWEEP] Recomputing {len(sections)} variant sections")
+    for result in iter_section_batch(sections):
+        if result.get("status") == "error":
+            raise ValueError(f"Section calculation failed: {result.get('message')}")
+        for index in result["indices"]:
+            targets[index]["section_properties"] = result["properties"]
+            targets[index]["section_mesh"] = result.get("viz_mesh") or result.get("mesh")
+
+
+def generate_variant(folder_path: str, variant: dict, config: dict):
+    """project.json + calcul.comm (generate_comm.py) + export.export in the variant directory."""
+    variant_dir = variant["dir"]
+    sim_dir = os.path.join(variant_dir, "simulation_files")
+    os.makedirs(sim_dir, exist_ok=True)
+    with open(os.path.join(variant_dir, "project.json"), "w", encoding="utf-8") as f:
+        json.dump(config, f, indent=4)
+    # Same meshes as the project: reuse its FORCE_COQUE group areas
+    areas_path = os.path.join(folder_path, "simulation_files", AREAS_FILE)
+    if os.path.exists(areas_path):
+        shutil.copyfile(areas_path, os.path.join(sim_dir, AREAS_FILE))
+
+    try:
+        # One run per variant (the variants already run in parallel): no load case shards, whose
+        # exports would also resolve the meshes in the variant directory
+        write_study(variant_dir, shards=1, project_config=config)
+    except Exception as e:
+        raise RuntimeError(f"generate_comm failed: {e}")
+
+    # Meshes from the base project, outputs in the variant's simulation_files
+    with open(os.path.join(sim_dir, "export.export"), "w", encoding="utf-8") as f:
+        f.write(render_export(sim_dir, os.path.join(sim_dir, "calcul.comm"),
+                              export_meshes(config.get("meshes", []), folder_path),
+                              build_solver_profile(config)["export"]))
+
+
+# --- Results ---
+def _max_value(fields: dict):
+    """{'VM_SUP_CASE1': 12.0, 'VM_INF_CASE1': 15.0} -> 15.0 (worst layer / load case)."""
+    return max(fields.values()) if fields else None
+
+
+def collect_outputs(sim_dir: str, summarize=None) -> dict:
+    """Key outputs of a solved variant: max_vm, max_displacement (resu.med), reactions, mass (CSV tables)."""
+    outputs = {"max_vm": None, "max_displacement": None, "reactions": read_reactions(sim_dir), "mass": None}
+    mass = read_mass_properties(sim_dir)
+    if mass:
+        outputs["mass"] = mass["mass"]
+    resu_path = os.path.join(sim_dir, "resu.med")
+    if summarize is not None and os.path.exists(resu_path):
+        summary = summarize(resu_path)
+        if summary.get("status") == "success":
+            data = summary["data"]
+            outputs["max_vm"] = _max_value(data.get("max_vm", {}))
+            outputs["max_displacement"] = _max_value(data.get("max_displacement", {}))
+            outputs["fields"] = data
+        else:
+            outputs["message"] = summary.get("message", "Result summary failed")
+    return outputs
+
+
+class ParametricSweep:
+    """
+    One sweep: variants generated in parallel, queued on the scheduler, outputs collected once
+    each run has finished. State persisted in <project>/sweeps/<id>/sweep.json.
+    """
+
+    def __init__(self, state: dict):
+        self.state = state
+        self._lock = threading.Lock()
+
+    @property
+    def sweep_dir(self):
+        return os.path.join(self.state["folder_path"], SWEEPS_DIR, self.state["id"])
+
+    def save(self):
+        with self._lock:
+            atomic_write(os.path.join(self.sweep_dir, SWEEP_FILE), json.dumps(self.state, indent=1).encode("utf-8"))
+
+    @classmethod
+    def create(cls, folder_path: str, parameters: list, mode: str = "grid", name: str = None):
+        with open(os.path.join(folder_path, "project.json"), "r", encoding="utf-8") as f:
+            base_config = json.load(f)
+        assignments = expand_variants(parameters, mode)
+        # Fail early on paths that match nothing
+        for path in assignments[0]:
+            set_path(copy.deepcopy(base_config), path, assignments[0][path])
+
+        sweep_id = f"{datetime.now().strftime('%Y%m%d_%H%M%S')}_{uuid.uuid4().hex[:6]}"
+        sweep = cls({
+            "id": sweep_id,
+            "name": name or sweep_id,
+            "folder_path": folder_path,
+            "mode": mode,
+            "parameters": parameters,
+            "created_at": datetime.now().isoformat(timespec="seconds"),
+            "status": "generating",
+            "message": None,
+            "variants": [
+                {"id": f"v{i + 1:03d}", "values": values, "status": "pending", "job_id": None,
+                 "message": None, "outputs": None}
+                for i, values in enumerate(assignments)
+            ]
+        })
+        for variant in sweep.state["variants"]:
+            variant["dir"] = os.path.join(sweep.sweep_dir, variant["id"])
+        sweep.base_config = base_config
+        sweep.save()
+        return sweep
+
+    def generate(self):
+        """Variant projects + .comm/.export; variants that fail are marked 'failed' with the reason."""
+        configs = []
+        for variant in self.state["variants"]:
+            config = copy.deepcopy(self.base_config)
+            for path, value in variant["values"].items():
+                set_path(config, path, value)
+            configs.append(config)
+        resolve_variant_sections(self.base_config, configs)
+
+        def run(item):
+            variant, config = item
+            try:
+                generate_variant(self.state["folder_path"], variant, config)
+                variant["status"] = "generated"
+            except Exception as e:
+                variant.update(status="failed", message=str(e))
+                print(f"[SWEEP] {self.state['id']}/{variant['id']} generation failed: {e}")
+
+        with ThreadPoolExecutor(max_workers=GENERATE_WORKERS, thread_name_prefix="sweep-generate") as pool:
+            list(pool.map(run, zip(self.state["variants"], configs)))
+        self.save()
+
+    def submit(self, scheduler, aster_bin: str):
+        for variant in self.state["variants"]:
+            if variant["status"] != "generated":
+                continue
+            export_path = os.path.join(variant["dir"], "simulation_files", "export.export")
+            job = scheduler.submit(variant["dir"], export_path, aster_bin)
+            variant.update(status="queued", job_id=job["id"])
+        self.save()
+
+    def start(self, scheduler, aster_bin: str = None):
+        """generate() + submit() in a background thread (aster_bin None = generate only)."""
+        def run():
+            try:
+                self.generate()
+                if aster_bin:
+                    self.submit(scheduler, aster_bin)
+                self.state["status"] = "running" if aster_bin else "generated"
+            except Exception as e:
+                print(f"[SWEEP] {self.state['id']} failed: {e}")
+                self.state.update(status="failed", message=str(e))
+            self.save()
+
+        threading.Thread(target=run, name=f"sweep-{self.state['id']}", daemon=True).start()
+
+    def refresh(self, scheduler, summarize=None) -> dict:
+        """Update variant states from the scheduler and collect the outputs of finished runs."""
+        changed = False
+        for variant in self.state["variants"]:
+            if not variant["job_id"] or variant["status"] in ("finished", "failed", "cancelled", "interrupted"):
+                continue
+            job = scheduler.get_job(variant["job_id"])
+            if job is None:
+                continue
+            status = job["status"]
+            if status in ACTIVE_STATES:
+                changed |= variant["status"] != status
+                variant["status"] = status
+                continue
+            if status == "finished":
+                variant["outputs"] = collect_outputs(os.path.join(variant["dir"], "simulation_files"), summarize)
+            variant.update(status=status, exit_code=job["exit_code"])
+            changed = True
+        if self.state["status"] == "running" and all(
+                v["status"] in ("finished", "failed", "cancelled", "interrupted") for v in self.state["variants"]):
+            self.state["status"] = "finished"
+            changed = True
+        if changed:
+            self.save()
+        return self.summary()
+
+    def cancel(self, scheduler):
+        for variant in self.state["variants"]:
+            if variant["job_id"] and variant["status"] in ACTIVE_STATES:
+                scheduler.cancel(variant["job_id"])
+        return self.refresh(scheduler)
+
+    def summary(self) -> dict:
+        """Sweep state + the comparison table (one row per variant)."""
+        table = []
+        for variant in self.state["variants"]:
+            outputs = variant.get("outputs") or {}
+            table.append({
+                "variant": variant["id"],
+                **variant["values"],
+                "status": variant["status"],
+                "max_vm": outputs.get("max_vm"),
+                "max_displacement": outputs.get("max_displacement"),
+                "mass": outputs.get("mass"),
+                "reactions": outputs.get("reactions")
+            })
+        counts = {}
+        for variant in self.state["variants"]:
+            counts[variant["status"]] = counts.get(variant["status"], 0) + 1
+        return {**self.state, "counts": counts, "table": table}
+
+
+_sweeps = {}
+_sweeps_lock = threading.Lock()
+
+
+def register_sweep(sweep: ParametricSweep):
+    with _sweeps_lock:
+        _sweeps[sweep.state["id"]] = sweep
+
+
+def find_sweep(sweep_id: str, folder_path: str = None):
+    """Sweep of this session, or reloaded from <folder_path>/sweeps/<id>/sweep.json."""
+    with _sweeps_lock:
+        sweep = _sweeps.get(sweep_id)
+    if sweep is not None or not folder_path:
+        return sweep
+    sweep_file = os.path.join(folder_path, SWEEPS_DIR, os.path.basename(sweep_id), SWEEP_FILE)
+    if not os.path.exists(sweep_file):
+        return None
+    with open(sweep_file, "r", encoding="utf-8") as f:
+        sweep = ParametricSweep(json.load(f))
+    register_sweep(sweep)
+    return sweep
@@ -0,0 +1,358 @@
+"""
+Section Analytic Service - Instant closed-form section properties
+Area, centroid, second moments, principal axes, radii, extents and elastic moduli come from
+Green's theorem line integrals over the (un-meshed) section polygon built by
+section_geometry.build_section_geometry, so they match the FEM values for the same
+polygon (rotation/offset already applied). Torsion, warping, shear areas and plastic moduli
+need the FEM analysis: they are returned as None and filled in by the background job.
+"""
+import math
+import numpy as np
+from shapely.affinity import affine_transform
+from shapely.geometry.polygon import orient
+from shapely.ops import clip_by_rect, unary_union
+
+from sectionproperties.pre.pre import DEFAULT_MATERIAL
+
+from services.section_geometry import build_section_geometry, reference_material, visual_mesh_data
+
+# Properties that only the FEM analysis (warping / plastic) provides
+FEM_ONLY_PROPERTIES = (
+    "Torsion J",
+    "Warping Iw",
+    "Shear Area Ay",
+    "Shear Area Az",
+    "Plastic Mod. Zy (Sxx)",
+    "Plastic Mod. Zz (Syy)",
+)
+
+
+def ring_integrals(coords):
+    """(A, ∫x, ∫y, ∫x², ∫y², ∫xy) of a closed ring (signed by orientation)."""
+    pts = np.asarray(coords, dtype=np.float64)
+    x0, y0 = pts[:-1, 0], pts[:-1, 1]
+    x1, y1 = pts[1:, 0], pts[1:, 1]
+    c = x0 * y1 - x1 * y0
+    return np.array([
+        c.sum() / 2.0,
+        ((x0 + x1) * c).sum() / 6.0,
+        ((y0 + y1) * c).sum() / 6.0,
+        ((x0 * x0 + x0 * x1 + x1 * x1) * c).sum() / 12.0,
+        ((y0 * y0 + y0 * y1 + y1 * y1) * c).sum() / 12.0,
+        ((x0 * y1 + 2 * x0 * y0 + 2 * x1 * y1 + x1 * y0) * c).sum() / 24.0,
+    ])
+
+
+def geometry_polygons(geometry):
+    """Shapely polygons of a sectionproperties Geometry / CompoundGeometry."""
+    if hasattr(geometry, "geoms"):
+        return [g.geom for g in geometry.geoms]
+    return [geometry.geom]
+
+
+def geometry_weights(geometry, attribute: str = "elastic_modulus"):
+    """
+    Per-polygon material ratios to the reference (stiffest) material of a composite geometry
+    (attribute: elastic_modulus for stiffness, yield_strength for plastic moduli); None if geometric.
+    """
+    geoms = geometry.geoms if hasattr(geometry, "geoms") else [geometry]
+    if not any(g.material.name != DEFAULT_MATERIAL.name for g in geoms):
+        return None
+    ref = getattr(reference_material(geometry), attribute)
+    return [getattr(g.material, attribute) / ref for g in geoms]
+
+
+def principal_axes(ixx_c, iyy_c, ixy_c):
+    """(I1, I2, angle in degrees) of the centroidal inertias (same convention as sectionproperties)."""
+    delta = (((ixx_c - iyy_c) / 2) ** 2 + ixy_c ** 2) ** 0.5
+    i11 = (ixx_c + iyy_c) / 2 + delta
+    i22 = (ixx_c + iyy_c) / 2 - delta
+    if abs(ixx_c - i11) < 1e-12 * i11:
+        phi = 0.0
+    else:
+        phi = math.atan2(ixx_c - i11, ixy_c) * 180 / math.pi
+    return i11, i22, phi
+
+
+def polygon_section_properties(polygons, weights=None) -> dict:
+    """
+    Closed-form properties of a set of polygons (holes included), same keys as the FEM calculator.
+    weights: E_i / E_ref per polygon for a composite section (transformed section, see geometry_weights).
+    """
+    totals = np.zeros(6)
+    for poly, weight in zip(polygons, weights or [1.0] * len(polygons)):
+        poly = orient(poly, sign=1.0)  # exterior CCW, holes CW -> holes subtract
+        totals += weight * ring_integrals(poly.exterior.coords)
+        for hole in poly.interiors:
+            totals += weight * ring_integrals(hole.coords)
+
+    area, qy, qx, iyy_g, ixx_g, ixy_g = totals
+    if area <= 0:
+        raise ValueError("Degenerate section (zero area)")
+
+    cx, cy = qy / area, qx / area
+    ixx_c = ixx_g - area * cy * cy
+    iyy_c = iyy_g - area * cx * cx
+    ixy_c = ixy_g - area * cx * cy
+
+    i11, i22, phi = principal_axes(ixx_c, iyy_c, ixy_c)
+
+    xmin = min(p.bounds[0] for p in polygons)
+    ymin = min(p.bounds[1] for p in polygons)
+    xmax = max(p.bounds[2] for p in polygons)
+    ymax = max(p.bounds[3] for p in polygons)
+
+    props = {
+        "Area (A)": area,
+        "Centroid Y (cy)": cy,
+        "Centroid Z (cx)": cx,
+        "Static Moment Qy (at 0,0)": qx,
+        "Static Moment Qz (at 0,0)": qy,
+
+        "Iyy (Local)": iyy_c,
+        "Izz (Local)": ixx_c,
+        "Iyz (Local)": ixy_c,
+        "I1 (Principal)": i11,
+        "I2 (Principal)": i22,
+        "Angle (deg)": phi,
+
+        "Iyy (Node 0,0)": iyy_g,
+        "Izz (Node 0,0)": ixx_g,
+        "Iyz (Node 0,0)": ixy_g,
+
+        "Elastic Mod. Wy (Zxx)": min(ixx_c / abs(ymax - cy), ixx_c / abs(ymin - cy)),
+        "Elastic Mod. Wz (Zyy)": min(iyy_c / abs(xmax - cx), iyy_c / abs(xmin - cx)),
+
+        "Radius Gyration ry": (iyy_c / area) ** 0.5,
+        "Radius Gyration rz": (ixx_c / area) ** 0.5,
+
+        "Min Y": ymin,
+        "Max Y": ymax,
+        "Min X": xmin,
+        "Max X": xmax,
+    }
+    props.update({key: None for key in FEM_ONLY_PROPERTIES})
+    return props
+
+
+def analytic_section_properties(section_type: str, params: dict) -> dict:
+    """
+    Instant result for the geometry tab: {status, properties, mesh: None, viz_mesh, complete: False}.
+    Uses the same geometry (parameter clamping, rotation, offset) as the FEM calculator; the
+    outline triangulation (viz_mesh) needs no FEM mesh, so the 3D view updates immediately.
+    """
+    geometry, _ = build_section_geometry(section_type, params)
+    return {
+        "status": "success",
+        "properties": polygon_section_properties(geometry_polygons(geometry), geometry_weights(geometry)),
+        "mesh": None,
+        "viz_mesh": visual_mesh_data(geometry),
+        "complete": False,
+        "pending": list(FEM_ONLY_PROPERTIES)
+    }
+
+
+def is_section_complete(props) -> bool:
+    """True when the FEM-only properties are present (not an analytic placeholder)."""
+    return bool(props) and all(props.get(key) is not None for key in FEM_ONLY_PROPERTIES)
+
+
+# ---------------------------------------------------------------------------
+# Rigid transforms (rotation about the centroid + offset) of intrinsic properties
+# ---------------------------------------------------------------------------
+
+# Parameters that only place the section (build_section_geometry steps B and C)
+POSE_PARAMS = ("rotation", "offset_y", "offset_z")
+# ... plus those the geometry never reads: none of them change the intrinsic analysis
+NON_SHAPE_PARAMS = POSE_PARAMS + ("fiber_y", "fiber_z")
+
+
+def shape_params(params: dict) -> dict:
+    """Intrinsic shape parameters (rotation 0, centroid at 0,0): the key of the FEM cache."""
+    return {k: v for k, v in (params or {}).items() if k not in NON_SHAPE_PARAMS}
+
+
+def section_pose(params: dict):
+    """(rotation [deg], offset_y, offset_z) of a parameter set (same parsing as build_section_geometry)."""
+    p = {k: float(v) for k, v in params.items() if k in POSE_PARAMS and v}
+    return p.get("rotation", 0.0), p.get("offset_y", 0.0), p.get("offset_z", 0.0)
+
+
+def transform_points(points, rotation: float, offset_y: float, offset_z: float) -> np.ndarray:
+    """Intrinsic (centroid at 0,0) section coordinates -> positioned: one rotation matrix multiply + shift."""
+    pts = np.asarray(points, dtype=np.float64).reshape(-1, 2)
+    a = math.radians(rotation)
+    rot = np.array([[math.cos(a), -math.sin(a)], [math.sin(a), math.cos(a)]])
+    return pts @ rot.T + np.array([offset_z, offset_y])
+
+
+def _plastic_modulus(shapes, weights, axis: int) -> float:
+    """
+    Plastic modulus about the equal-force axis normal to 'axis' (0: x -> Syy, 1: y -> Sxx).
+    weights: fy_i / fy_ref per shape (1 for a homogeneous section).
+    """
+    xmin = min(shape.bounds[0] for shape in shapes)
+    ymin = min(shape.bounds[1] for shape in shapes)
+    xmax = max(shape.bounds[2] for shape in shapes)
+    ymax = max(shape.bounds[3] for shape in shapes)
+    lo, hi = (ymin, ymax) if axis == 1 else (xmin, xmax)
+    half = sum(w * shape.area for shape, w in zip(shapes, weights)) / 2
+
+    def split(shape, cut):
+        if axis == 1:
+            return clip_by_rect(shape, xmin, ymin, xmax, cut), clip_by_rect(shape, xmin, cut, xmax, ymax)
+        return clip_by_rect(shape, xmin, ymin, cut, ymax), clip_by_rect(shape, cut, ymin, xmax, ymax)
+
+    # Bisection on the plastic neutral axis position
+    tol = 1e-12 * (hi - lo)
+    while hi - lo > tol:
+        mid = (lo + hi) / 2
+        if sum(w * split(shape, mid)[0].area for shape, w in zip(shapes, weights)) < half:
+            lo = mid
+        else:
+            hi = mid
+    pna = (lo + hi) / 2
+    modulus = 0.0
+    for shape, w in zip(shapes, weights):
+        for part in split(shape, pna):
+            if part.area > 0:
+                modulus += w * part.area * abs(part.centroid.coords[0][axis] - pna)
+    return modulus
+
+
+def plastic_moduli(polygons, weights=None):
+    """
+    (Sxx, Syy) plastic section moduli of a set of polygons (sectionproperties definition);
+    composites (weights = fy_i / fy_ref): plastic moments divided by the reference fy.
+    """
+    if weights is None:
+        shapes, weights = [unary_union(list(polygons))], [1.0]
+    else:
+        shapes = list(polygons)
+    return _plastic_modulus(shapes, weights, 1), _plastic_modulus(shapes, weights, 0)
+
+
+def transform_section_properties(base: dict, rotation: float, offset_y: float, offset_z: float,
+                                 outline, shear_xy: float = 0.0, polygons=None, plastic_weights=None) -> dict:
+    """
+    Properties of the positioned section from those of the intrinsic one (rotation 0, centroid at 0,0):
+      - A, J, Iw, I1, I2: invariant
+      - centroidal tensor rotated; nodal inertias / static moments by parallel axes (Steiner)
+      - shear flexibility tensor rotated (shear_xy: intrinsic cross term, see section_cache)
+      - extents and elastic moduli from the transformed outline points
+      - plastic moduli swapped for multiples of 90 deg, recomputed on the rotated polygons otherwise
+    """
+    area = base["Area (A)"]
+    a = math.radians(rotation)
+    c, s = math.cos(a), math.sin(a)
+
+    # Centroid: intrinsic centroid (0,0 by construction) rotated and shifted
+    cx0, cy0 = base["Centroid Z (cx)"], base["Centroid Y (cy)"]
+    cx = c * cx0 - s * cy0 + offset_z
+    cy = s * cx0 + c * cy0 + offset_y
+
+    # Centroidal second moments: iyy = int x^2, ixx = int y^2, ixy = int xy
+    iyy0, ixx0, ixy0 = base["Iyy (Local)"], base["Izz (Local)"], base["Iyz (Local)"]
+    iyy_c = c * c * iyy0 - 2 * s * c * ixy0 + s * s * ixx0
+    ixx_c = s * s * iyy0 + 2 * s * c * ixy0 + c * c * ixx0
+    ixy_c = s * c * (iyy0 - ixx0) + (c * c - s * s) * ixy0
+    i11, i22, phi = principal_axes(ixx_c, iyy_c, ixy_c)
+
+    pts = transform_points(outline, rotation, offset_y, offset_z)
+    xmin, ymin = pts.min(axis=0)
+    xmax, ymax = pts.max(axis=0)
+
+    # Shear areas: the flexibility tensor [[1/Ay, f],[f, 1/Az]] rotates like the inertia tensor
+    ay, az = base.get("Shear Area Ay"), base.get("Shear Area Az")
+    if ay and az:
+        rot = np.array([[c, -s], [s, c]])
+        flex = rot @ np.array([[1.0 / ay, shear_xy], [shear_xy, 1.0 / az]]) @ rot.T
+        ay, az = 1.0 / flex[0, 0], 1.0 / flex[1, 1]
+
+    # Plastic moduli
+    sxx, syy = base.get("Plastic Mod. Zy (Sxx)"), base.get("Plastic Mod. Zz (Syy)")
+    quarter = rotation / 90.0
+    if sxx is not None and abs(quarter - round(quarter)) < 1e-9:
+        if round(quarter) % 2:
+            sxx, syy = syy, sxx
+    elif sxx is not None and polygons is not None:
+        sxx, syy = plastic_moduli([affine_transform(poly, [c, -s, s, c, 0.0, 0.0]) for poly in polygons],
+                                  plastic_weights)
+    else:
+        sxx, syy = None, None
+
+    return {
+        "Area (A)": area,
+        "Centroid Y (cy)": cy,
+        "Centroid Z (cx)": cx,
+        "Static Moment Qy (at 0,0)": area * cy,
+        "Static Moment Qz (at 0,0)": area * cx,
+
+        "Iyy (Local)": iyy_c,
+        "Izz (Local)": ixx_c,
+        "Iyz (Local)": ixy_c,
+        "I1 (Principal)": i11,
+        "I2 (Principal)": i22,
+        "Angle (deg)": phi,
+
+        "Iyy (Node 0,0)": iyy_c + area * cx * cx,
+        "Izz (Node 0,0)": ixx_c + area * cy * cy,
+        "Iyz (Node 0,0)": ixy_c + area * cx * cy,
+
+        "Torsion J": base.get("Torsion J"),
+        "Warping Iw": base.get("Warping Iw"),
+        "Shear Area Ay": ay,
+        "Shear Area Az": az,
+
+        "Elastic Mod. Wy (Zxx)": min(ixx_c / abs(ymax - cy), ixx_c / abs(ymin - cy)),
+        "Elastic Mod. Wz (Zyy)": min(iyy_c / abs(xmax - cx), iyy_c / abs(xmin - cx)),
+        "Plastic Mod. Zy (Sxx)": sxx,
+        "Plastic Mod. Zz (Syy)": syy,
+
+        "Radius Gyration ry": (iyy_c / area) ** 0.5,
+        "Radius Gyration rz": (ixx_c / area) ** 0.5,
+
+        "Min Y": float(ymin),
+        "Max Y": float(ymax),
+        "Min X": float(xmin),
+        "Max X": float(xmax),
+    }
+
+
+def place_section(entry: dict, section_type: str, params: dict) -> dict:
+    """
+    Intrinsic result {properties, mesh, viz_mesh, shear_xy} -> result at the rotation/offset of
+    'params': properties by transform_section_properties, mesh vertices by one matrix multiply.
+    """
+    rotation, offset_y, offset_z = section_pose(params)
+
+    def placed(mesh):
+        if not mesh:
+            return mesh
+        return {
+            "vertices": transform_points(mesh["vertices"], rotation, offset_y, offset_z).tolist(),
+            "triangles": mesh["triangles"]
+        }
+
+    outline_mesh = entry.get("viz_mesh") or entry.get("mesh")
+    # Polygons only for the plastic moduli at rotations that are not multiples of 90 deg
+    quarter = rotation / 90.0
+    polygons, plastic_weights = None, None
+    if abs(quarter - round(quarter)) > 1e-9:
+        geometry, _ = build_section_geometry(section_type, shape_params(params))
+        polygons = geometry_polygons(geometry)
+        plastic_weights = geometry_weights(geometry, "yield_strength")
+
+    properties = entry["properties"]
+    if properties:
+        properties = transform_section_properties(
+            properties, rotation, offset_y, offset_z, outline_mesh["vertices"],
+            shear_xy=entry.get("shear_xy", 0.0), polygons=polygons, plastic_weights=plastic_weights
+        )
+    return {
+        "status": entry.get("status", "success"),
+        "properties": properties,
+        "mesh": placed(entry.get("mesh")),
+        "viz_mesh": placed(entry.get("viz_mesh")),
+        "mesh_info": entry.get("mesh_info")
+    }
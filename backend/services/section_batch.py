@@ -0,0 +1,170 @@
+"""
+Section Batch Service - Many sections at once on the section worker pool
+1. Deduplicates the definitions by the canonical (type, params) hash.
+2. Serves standard profiles (section_catalogue) and cache hits (section_cache) immediately.
+3. Runs the misses on isolated worker processes (section_workers: FEM warping is CPU bound,
+   holds the GIL and may hang on degenerate input -> timeouts, memory limits, recycling),
+   one job per intrinsic shape (placements share it), and yields results as they finish.
+Also hosts the background FEM jobs that complete the instant analytic results (section_analytic).
+"""
+import atexit
+import threading
+from concurrent.futures import as_completed
+
+from services.section_cache import (
+    cached_section_properties, load_section, load_section_image, section_image,
+    section_param_hash, section_shape_hash
+)
+from services.section_catalogue import catalogue_section_properties
+from services.section_workers import SECTION_POOL_WORKERS, SectionWorkerPool
+
+_pool = None
+_pool_lock = threading.Lock()
+
+# Background FEM jobs by shape hash (Future); finished entries live in the disk cache
+_jobs = {}
+_jobs_lock = threading.Lock()
+
+
+def get_section_pool() -> SectionWorkerPool:
+    """Lazily created, process-wide pool (workers stay warm with sectionproperties imported)."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = SectionWorkerPool(workers=SECTION_POOL_WORKERS)
+            atexit.register(_pool.shutdown)
+        return _pool
+
+
+def _cached_entry(param_hash: str, section_type: str, params: dict, with_image: bool):
+    """Placed result if the shape is in the disk cache (and the image too, when requested)."""
+    if load_section(section_shape_hash(section_type, params)) is None:
+        return None
+    if with_image and load_section_image(param_hash) is None:
+        return None  # properties cached, image still to render: let a worker do it
+    return cached_section_properties(param_hash, section_type, params, with_image=with_image)
+
+
+def iter_section_batch(sections: list, with_image: bool = False):
+    """
+    Yields one dict per distinct section: {hash, indices, type, status, properties, mesh, viz_mesh, image}
+    ('indices' = positions in the request list sharing that definition). Cache hits come first.
+    """
+    unique = {}
+    for index, sec in enumerate(sections):
+        section_type = sec.get('type')
+        params = sec.get('params', {})
+        if not section_type:
+            yield {"indices": [index], "status": "error", "message": "Section type required"}
+            continue
+        try:
+            param_hash = section_param_hash(section_type, params)
+        except ValueError as e:  # invalid POLYGON outline
+            yield {"indices": [index], "status": "error", "message": str(e)}
+            continue
+        if param_hash not in unique:
+            unique[param_hash] = {"type": section_type, "params": params, "indices": []}
+        unique[param_hash]["indices"].append(index)
+
+    pending = {}
+    for param_hash, item in unique.items():
+        profile = catalogue_section_properties(item["type"], item["params"])
+        if profile is not None:
+            profile["image"] = section_image(param_hash, item["type"], item["params"]) if with_image else None
+            yield {"hash": param_hash, "indices": item["indices"], "type": item["type"], "cached": True, **profile}
+            continue
+        entry = _cached_entry(param_hash, item["type"], item["params"], with_image)
+        if entry is not None:
+            yield {"hash": param_hash, "indices": item["indices"], "type": item["type"], "cached": True, **entry}
+        else:
+            pending[param_hash] = item
+
+    if not pending:
+        return
+
+    # One FEM run per intrinsic shape; the other placements are transformed from its cache entry
+    shapes = {}
+    for param_hash, item in pending.items():
+        shapes.setdefault(section_shape_hash(item["type"], item["params"]), []).append(param_hash)
+
+    print(f"[SECTION-BATCH] {len(unique)} distinct sections, {len(shapes)} shapes to compute on {SECTION_POOL_WORKERS} workers")
+    pool = get_section_pool()
+    futures = {}
+    for shape_hash, hashes in shapes.items():
+        first = pending[hashes[0]]
+        futures[pool.submit(first["type"], first["params"], with_image)] = hashes
+    for future in as_completed(futures):
+        hashes = futures[future]
+        for i, param_hash in enumerate(hashes):
+            item = pending[param_hash]
+            try:
+                if i == 0:
+                    result = future.result()
+                else:
+                    result = cached_section_properties(param_hash, item["type"], item["params"], with_image=with_image)
+                yield {"hash": param_hash, "indices": item["indices"], "type": item["type"], "cached": False, **result}
+            except Exception as e:
+                print(f"[SECTION-BATCH] {item['type']} {param_hash[:12]} failed: {e}")
+                yield {"hash": param_hash, "indices": item["indices"], "type": item["type"],
+                       "status": "error", "message": str(e)}
+
+
+def submit_section_job(section_type: str, params: dict):
+    """Start (once per intrinsic shape) the FEM analysis of a section in the background; the worker fills the disk cache."""
+    shape_hash = section_shape_hash(section_type, params)
+    with _jobs_lock:
+        job = _jobs.get(shape_hash)
+        if job is not None and not (job.done() and job.exception() is not None):
+            return job
+        print(f"[SECTION-BATCH] Background FEM job {section_type} {shape_hash[:12]}")
+        job = get_section_pool().submit(section_type, params)
+        _jobs[shape_hash] = job
+        return job
+
+
+def section_job_state(section_type: str, params: dict) -> dict:
+    """{status: success|pending|error|missing} of the FEM result for a section."""
+    shape_hash = section_shape_hash(section_type, params)
+    if load_section(shape_hash) is not None:
+        return {"status": "success"}
+    with _jobs_lock:
+        job = _jobs.get(shape_hash)
+    if job is None:
+        return {"status": "missing"}
+    if not job.done():
+        return {"status": "pending"}
+    if job.exception() is not None:
+        return {"status": "error", "message": str(job.exception())}
+    return {"status": "success"}
+
+
+def wait_section_result(section_type: str, params: dict) -> dict:
+    """
+    Full FEM result (with_image=False): disk cache, else the worker job (started if needed) is awaited.
+    Raises the job error (SectionWorkerError / SectionTimeoutError): never recomputed in this thread.
+    """
+    if load_section(section_shape_hash(section_type, params)) is None:
+        submit_section_job(section_type, params).result()
+    return cached_section_properties(section_param_hash(section_type, params), section_type, params, with_image=False)
+
+
+def resolve_pending_sections(geometries: list) -> int:
+    """
+    Replace analytic placeholders (FEM-only properties still None) in a geometry list with the
+    full FEM values, so build_geometry / the .comm always receive J, Iw and shear areas.
+    Returns how many geometries were completed.
+    """
+    from services.section_analytic import is_section_complete
+
+    resolved = 0
+    for g in geometries or []:
+        props = g.get("section_properties")
+        section_type = g.get("profile_type")
+        if not props or is_section_complete(props) or not section_type:
+            continue
+        params = g.get("section_params", {})
+        result = wait_section_result(section_type, params)
+        g["section_properties"] = result["properties"]
+        g["section_mesh"] = result.get("viz_mesh") or result["mesh"]
+        resolved += 1
+    return resolved
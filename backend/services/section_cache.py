@@ -0,0 +1,229 @@
+"""
+Section Cache Service - Persistent on-disk cache of section properties
+Shared by every project on the machine (one cache per installation / user override).
+
+Layout:
+    <CACHE_DIR>/<engine version>/<shape_hash>.json   -> {status, properties, mesh, viz_mesh, shear_xy, mesh_info}
+    <CACHE_DIR>/<engine version>/<param_hash>.png    -> image, rendered lazily on first request
+The FEM entries are keyed by the intrinsic shape only (rotation / offsets removed, see
+section_analytic.shape_params): every placement of a shape reuses one analysis, transformed
+analytically (place_section). Images show the placed section and keep the full parameter hash.
+The version directory combines the sectionproperties version with CALC_REVISION, so a
+library upgrade or a change in section_calculator never serves stale properties.
+"""
+import os
+import json
+import base64
+import hashlib
+import tempfile
+import threading
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Same location as the legacy backend/.cache/sections files (override with PROSOLVE_SECTION_CACHE)
+CACHE_DIR = os.environ.get("PROSOLVE_SECTION_CACHE", os.path.join(BACKEND_DIR, ".cache", "sections"))
+# Size bound for the whole cache (all versions); oldest-used entries are evicted first
+MAX_CACHE_BYTES = int(os.environ.get("PROSOLVE_SECTION_CACHE_MB", "256")) * 1024 * 1024
+# Eviction trims down to this fraction of the bound to avoid evicting on every write
+EVICT_TARGET = 0.9
+
+# Bump when section_calculator changes its results (meshing rules, property definitions...)
+CALC_REVISION = 4
+
+PNG_PREFIX = "data:image/png;base64,"
+
+_evict_lock = threading.Lock()
+
+
+def engine_version() -> str:
+    """sectionproperties version + calculator revision (part of every cache key)."""
+    try:
+        from importlib.metadata import version
+        lib_version = version("sectionproperties")
+    except Exception:
+        lib_version = "unknown"
+    return f"sp{lib_version}-r{CALC_REVISION}"
+
+
+ENGINE_VERSION = engine_version()
+
+
+def section_param_hash(section_type: str, params: dict) -> str:
+    """
+    Canonical (type, params) hash shared by /calculate_section, /calculate_sections and the disk cache.
+    POLYGON outlines are normalised first (orientation, start vertex, translation: see
+    section_geometry.canonical_section_params), so equivalent outlines share one entry.
+    """
+    from services.section_geometry import canonical_section_params
+    params = canonical_section_params(section_type, params)
+    param_str = json.dumps({"type": section_type, "params": params}, sort_keys=True)
+    return hashlib.sha256(param_str.encode()).hexdigest()
+
+
+def section_shape_hash(section_type: str, params: dict) -> str:
+    """Hash of the intrinsic shape: all placements of a section share it (FEM cache key)."""
+    from services.section_analytic import shape_params
+    return section_param_hash(section_type, shape_params(params))
+
+
+def _entry_path(param_hash: str, ext: str) -> str:
+    return os.path.join(CACHE_DIR, ENGINE_VERSION, f"{param_hash}.{ext}")
+
+
+def _atomic_write(path: str, data: bytes):
+    """Write through a temp file + os.replace so concurrent readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _touch(path: str):
+    """Mark an entry as recently used (eviction is by mtime)."""
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+
+
+def load_section(shape_hash: str):
+    """Cached intrinsic {status, properties, mesh, viz_mesh, shear_xy, mesh_info} or None."""
+    path = _entry_path(shape_hash, "json")
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    _touch(path)
+    return entry
+
+
+def store_section(shape_hash: str, result: dict):
+    """Persist intrinsic properties + meshes (the image is stored separately by store_section_image)."""
+    entry = {
+        "status": result.get("status", "success"),
+        "properties": result.get("properties"),
+        "mesh": result.get("mesh"),
+        "viz_mesh": result.get("viz_mesh"),
+        "shear_xy": result.get("shear_xy", 0.0),
+        "mesh_info": result.get("mesh_info")
+    }
+    try:
+        _atomic_write(_entry_path(shape_hash, "json"), json.dumps(entry).encode("utf-8"))
+        evict_if_needed()
+    except Exception as e:
+        print(f"[SECTION-CACHE] Write failed for {shape_hash[:12]}: {e}")
+
+
+def load_section_image(param_hash: str):
+    """Cached PNG as a data URI, or None if it was never rendered."""
+    path = _entry_path(param_hash, "png")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return None
+    _touch(path)
+    return PNG_PREFIX + base64.b64encode(data).decode("utf-8")
+
+
+def store_section_image(param_hash: str, image: str):
+    if not image or not image.startswith(PNG_PREFIX):
+        return
+    try:
+        _atomic_write(_entry_path(param_hash, "png"), base64.b64decode(image[len(PNG_PREFIX):]))
+        evict_if_needed()
+    except Exception as e:
+        print(f"[SECTION-CACHE] Image write failed for {param_hash[:12]}: {e}")
+
+
+def evict_if_needed(max_bytes: int = None):
+    """Size-bounded eviction across all version directories, least recently used first."""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    with _evict_lock:
+        files = []
+        total = 0
+        for root, _, names in os.walk(CACHE_DIR):
+            for name in names:
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except OSError:
+                    continue
+                files.append((st.st_mtime, st.st_size, path))
+                total += st.st_size
+
+        if total <= max_bytes:
+            return
+
+        target = max_bytes * EVICT_TARGET
+        removed = 0
+        for _, size, path in sorted(files):
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+                total -= size
+                removed += 1
+            except OSError:
+                pass
+        print(f"[SECTION-CACHE] Evicted {removed} files (cache now {total / 1e6:.1f} MB)")
+
+
+def section_image(param_hash: str, section_type: str, params: dict) -> str:
+    """
+    Cached image, or rendered from the geometry and stored on first need.
+    Markers/extents come from the closed-form properties (no FEM, identical to the FEM values).
+    """
+    image = load_section_image(param_hash)
+    if image is None:
+        from services.section_geometry import build_section_geometry
+        from services.section_calculator import render_section_image
+        from services.section_analytic import geometry_polygons, geometry_weights, polygon_section_properties
+
+        geometry, _ = build_section_geometry(section_type, params)
+        props = polygon_section_properties(geometry_polygons(geometry), geometry_weights(geometry))
+        image = render_section_image(geometry, props)
+        store_section_image(param_hash, image)
+    return image
+
+
+def section_image_png(param_hash: str, section_type: str, params: dict) -> bytes:
+    """Raw PNG bytes of section_image (for the cacheable GET endpoint)."""
+    return base64.b64decode(section_image(param_hash, section_type, params)[len(PNG_PREFIX):])
+
+
+def intrinsic_section(section_type: str, params: dict) -> dict:
+    """FEM result of the intrinsic shape (rotation 0, centroid at 0,0): disk cache, else computed and stored."""
+    from services.section_analytic import shape_params
+    from services.section_calculator import calculate_section_properties
+
+    shape_hash = section_shape_hash(section_type, params)
+    entry = load_section(shape_hash)
+    if entry is None:
+        print(f"[SECTION-CACHE] MISS {section_type} {shape_hash[:12]}")
+        result = calculate_section_properties(section_type, shape_params(params))
+        store_section(shape_hash, result)
+        entry = {"status": result["status"], "properties": result["properties"], "mesh": result["mesh"],
+                 "viz_mesh": result.get("viz_mesh"), "shear_xy": result.get("shear_xy", 0.0),
+                 "mesh_info": result.get("mesh_info")}
+    return entry
+
+
+def cached_section_properties(param_hash: str, section_type: str, params: dict, with_image: bool = False) -> dict:
+    """
+    Disk-backed calculate_section_properties.
+    FEM once per intrinsic shape, placed (rotation/offset) analytically. Image: rendered lazily by section_image.
+    """
+    from services.section_analytic import place_section
+
+    entry = place_section(intrinsic_section(section_type, params), section_type, params)
+    entry["complete"] = True
+    entry["image"] = section_image(param_hash, section_type, params) if with_image else None
+    return entry
@@ -1,161 +1,228 @@
 """
 Section Calculator Service - sectionproperties Integration
 Migrated from main.pyw lines 389-589
-CRITICAL: Preserves exact offset/rotation logic
+CRITICAL: Preserves exact offset/rotation logic (see section_geometry.build_section_geometry)
 """
 import io
 import base64
-from sectionproperties.pre.library import (
-    rectangular_section,
-    rectangular_hollow_section,
-    circular_section,
-    circular_hollow_section,
-    mono_i_section
-)
+import numpy as np
 from sectionproperties.analysis import Section
-import matplotlib
-matplotlib.use('Agg')  # Non-interactive backend
-import matplotlib.pyplot as plt
+from services.section_geometry import (
+    build_section_geometry, mesh_section, visual_mesh_data, fem_mesh_data, reference_material
+)
+
+# Adaptive sizing (params 'mesh_tol' > 0): coarse start, refined until J, Iw, Ay, Az settle.
+# sectionproperties mesh sizes are maximum element AREAS.
+ADAPTIVE_START_ELEMENTS = 40   # first mesh: section area / 40 per element
+ADAPTIVE_REFINE = 0.4          # element area ratio between two meshing passes
+ADAPTIVE_MIN_GROWTH = 1.5      # element count growth for a pass to be analysed (thin parts are
+                               # sized by the mesh quality, not by the area constraint)
+ADAPTIVE_MAX_STEPS = 8         # FEM analyses
+ADAPTIVE_MAX_ELEMENTS = 60000
 
 
-def calculate_section_properties(section_type: str, params: dict) -> dict:
+def mesh_tolerance(params: dict) -> float:
+    """Relative convergence tolerance requested in the params (0 -> fixed heuristic mesh)."""
+    try:
+        return max(float(params.get('mesh_tol') or 0.0), 0.0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _convergence_values(sec) -> dict:
+    # section_props: geometric values, modulus-weighted for composites (same ratios either way)
+    sp = sec.section_props
+    return {
+        "J": sp.j, "Iw": sp.gamma, "Ay": sp.a_sx, "Az": sp.a_sy,
+        # Iw of closed / point-symmetric shapes is ~0: compare against the polar scale instead
+        "_iw_floor": (sp.ixx_c + sp.iyy_c) ** 2 / sp.ea
+    }
+
+
+def section_scales(sec):
     """
-    Calculate section properties using sectionproperties library.
+    (E_ref, fy_ref) dividing the section_props values: 1 for a geometric section, the stiffest
+    material for a composite one (transformed section: A, I, J... in that material).
+    """
+    if not sec.is_composite():
+        return 1.0, 1.0
+    ref = reference_material(sec.geometry)
+    return ref.elastic_modulus, ref.yield_strength
+
+
+def _relative_change(previous: dict, current: dict) -> float:
+    change = 0.0
+    for key in ("J", "Iw", "Ay", "Az"):
+        scale = abs(current[key])
+        if key == "Iw":
+            scale = max(scale, 1e-6 * current["_iw_floor"])
+        change = max(change, abs(current[key] - previous[key]) / scale if scale else 0.0)
+    return float(change)
+
+
+def adaptive_section_analysis(geometry, tol: float):
+    """
+    Geometric + warping analysis on successively finer meshes until J, Iw and the shear areas
+    change by less than 'tol' between two steps. Returns (Section, mesh_info).
+    """
+    mesh_size = geometry.calculate_area() / ADAPTIVE_START_ELEMENTS
+    previous, history = None, []
+    for _ in range(4 * ADAPTIVE_MAX_STEPS):
+        geometry.create_mesh(mesh_sizes=[mesh_size])
+        elements = len(geometry.mesh["triangles"])
+        if history and elements < ADAPTIVE_MIN_GROWTH * history[-1]["elements"]:
+            mesh_size *= ADAPTIVE_REFINE
+            continue
+
+        sec = Section(geometry)
+        sec.calculate_geometric_properties()
+        sec.calculate_warping_properties()
+
+        values = _convergence_values(sec)
+        change = _relative_change(previous, values) if previous else None
+        history.append({"mesh_size": float(mesh_size), "elements": elements, "change": change})
+        if (change is not None and change < tol) or len(history) >= ADAPTIVE_MAX_STEPS \
+                or elements >= ADAPTIVE_MAX_ELEMENTS:
+            break
+        previous = values
+        mesh_size *= ADAPTIVE_REFINE
+
+    if mesh_size != history[-1]["mesh_size"] and elements != history[-1]["elements"]:
+        # Ran out of passes on a skipped mesh: restore the analysed one (exported as 'mesh')
+        geometry.create_mesh(mesh_sizes=[history[-1]["mesh_size"]])
+
+    converged = history[-1]["change"] is not None and history[-1]["change"] < tol
+    print(f"[SECTION] Adaptive mesh: {len(history)} steps, {history[-1]['elements']} elements, "
+          f"change {history[-1]['change']}, converged={converged}")
+    return sec, {
+        "mode": "adaptive",
+        "tolerance": tol,
+        "mesh_size": history[-1]["mesh_size"],
+        "elements": history[-1]["elements"],
+        "converged": converged,
+        "history": history
+    }
+
+
+def render_section_image(geometry, props: dict) -> str:
+    """Plot the positioned geometry with centroid/node markers. Returns a PNG data URI."""
+    # Lazy import: only image requests pay for matplotlib
+    import matplotlib
+    matplotlib.use('Agg')  # Non-interactive backend
+    import matplotlib.pyplot as plt
+
+    cx, cy = props["Centroid Z (cx)"], props["Centroid Y (cy)"]
+    xmin, xmax = props["Min X"], props["Max X"]
+    ymin, ymax = props["Min Y"], props["Max Y"]
+
+    plt.style.use('default')
+    fig, ax = plt.subplots(figsize=(6, 6))
     
-    CRITICAL 3-STEP TRANSFORM:
-    1. RESET: align_center(0,0) - Normalize centroid
-    2. ROTATE: rotate_section(angle, rot_point=(0,0)) - Rotate around centroid
-    3. SHIFT: shift_section(x_offset=off_z, y_offset=off_y) - Move to final position
+    geometry.plot_geometry(ax=ax, cp=False, legend=False, title='')
+    
+    fig.patch.set_facecolor('white')
+    ax.set_facecolor('white')
+    ax.axis('on')
+    ax.grid(True, color='#e2e8f0', linestyle='--', linewidth=0.5)
+    ax.set_aspect('equal', adjustable='box')
+    
+    ax.plot(cx, cy, 'r+', markersize=15, markeredgewidth=2, label='Centroid')
+    ax.plot(0, 0, 'bx', markersize=12, markeredgewidth=2, label='Node (0,0)')
+    
+    if abs(cx) > 1e-4 or abs(cy) > 1e-4:
+        ax.plot([0, cx], [0, cy], color='red', linestyle=':', linewidth=1.5, label='Offset')
+    
+    ax.axhline(y=cy, color='#94a3b8', linestyle='-.', linewidth=1)
+    ax.axvline(x=cx, color='#94a3b8', linestyle='-.', linewidth=1)
+    ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8, alpha=0.3)
+    ax.axvline(x=0, color='black', linestyle='-', linewidth=0.8, alpha=0.3)
+    
+    x_data = [0, cx, xmin, xmax]
+    y_data = [0, cy, ymin, ymax]
+    margin = max(xmax-xmin, ymax-ymin) * 0.2
+    if margin == 0:
+        margin = 10
+    ax.set_xlim(min(x_data)-margin, max(x_data)+margin)
+    ax.set_ylim(min(y_data)-margin, max(y_data)+margin)
+    
+    buf = io.BytesIO()
+    plt.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.05, dpi=120)
+    buf.seek(0)
+    img_str = base64.b64encode(buf.read()).decode('utf-8')
+    plt.close(fig)
+    return f"data:image/png;base64,{img_str}"
+
+
+def calculate_section_properties(section_type: str, params: dict, with_image: bool = False) -> dict:
+    """
+    Calculate section properties using sectionproperties library.
+    Geometry/transform rules live in build_section_geometry.
     
-    Args:
-        section_type: Type of section (RECTANGLE, BOX, CIRCLE, TUBE, I_SECTION)
-        params: Dictionary of section parameters
-        
     Returns:
-        Dictionary with 'properties' and 'image' (base64)
+        Dictionary with 'properties', 'mesh' (FEM, linear corners), 'viz_mesh' (outline
+        triangulation for the 3D view), 'mesh_info' (sizing mode, element area reached,
+        element count) and 'image' (base64 only when with_image=True; otherwise use the
+        /section_image endpoint)
+    
+    params['mesh_tol'] > 0 switches to adaptive sizing with that relative tolerance.
     """
     try:
-        # 1. PARSE PARAMETERS
-        p = {k: float(v) for k, v in params.items() if v}
-        
-        # Position parameters (CRITICAL!)
-        off_y = p.get('offset_y', 0.0)
-        off_z = p.get('offset_z', 0.0)
-        rotation = p.get('rotation', 0.0)  # Degrees
-        
-        geometry = None
-        mesh_size = 10.0
-        
-        # 2. CREATE BASE GEOMETRY
-        if section_type == 'RECTANGLE':
-            d, b = p.get('hy', 100), p.get('hz', 50)
-            geometry = rectangular_section(d=d, b=b)
-            mesh_size = min(d, b) / 5.0
-            
-        elif section_type == 'BOX':
-            d, b, t = p.get('hy', 100), p.get('hz', 50), p.get('t', 5)
-            if t*2 >= d or t*2 >= b:
-                t = min(d, b)/2 - 0.1
-            geometry = rectangular_hollow_section(d=d, b=b, t=t, r_out=0, n_r=1)
-            mesh_size = t / 1.5
-            
-        elif section_type == 'CIRCLE':
-            d = 2 * p.get('r', 50)
-            geometry = circular_section(d=d, n=64)
-            mesh_size = d / 10.0
+        # 4. MESH AND CALCULATION
+        tol = mesh_tolerance(params)
+        if tol > 0:
+            # Adaptive: refine until J / Iw / shear areas converge (mesh size reached -> mesh_info)
+            geometry, _ = build_section_geometry(section_type, params)
+            viz_mesh = visual_mesh_data(geometry)
+            sec, mesh_info = adaptive_section_analysis(geometry, tol)
+            fem_mesh = fem_mesh_data(geometry)
+        else:
+            # Single meshing pass at final position (rotated and shifted): FEM mesh + visual triangulation
+            geometry, fem_mesh, viz_mesh, mesh_size = mesh_section(section_type, params)
             
-        elif section_type == 'TUBE':
-            d, t = 2 * p.get('r', 50), p.get('t', 5)
-            if t*2 >= d:
-                t = d/2 - 0.1
-            geometry = circular_hollow_section(d=d, t=t, n=64)
-            mesh_size = t / 1.5
+            sec = Section(geometry)
             
-        elif section_type == 'I_SECTION':
-            h = p.get('h', 200)
-            bf_t, bf_b = p.get('bf_top', 100), p.get('bf_bot', 100)
-            tf_t, tf_b, tw = p.get('tf_top', 10), p.get('tf_bot', 10), p.get('tw', 6)
-            if tw >= bf_t:
-                tw = bf_t - 2
-            if (tf_t + tf_b) >= h:
-                h = tf_t + tf_b + 10
-            geometry = mono_i_section(
-                d=h, b_t=bf_t, b_b=bf_b, 
-                t_ft=tf_t, t_fb=tf_b, t_w=tw, 
-                r=p.get('r', 0), n_r=8
-            )
-            mesh_size = min(tw, tf_t, tf_b) / 1.5
-        
-        if not geometry:
-            raise ValueError(f"Unknown section type: {section_type}")
-        
-        # 3. GEOMETRIC MANIPULATION (3-STEP CRITICAL FLOW)
+            # Execute FEM integrals
+            sec.calculate_geometric_properties()
+            sec.calculate_warping_properties()
+            mesh_info = {"mode": "fixed", "mesh_size": mesh_size, "elements": len(sec.elements)}
         
-        # STEP A: RESET (Normalization)
-        # Centroid goes to (0,0)
-        geometry = geometry.align_center(align_to=(0, 0))
-        
-        # STEP B: ROTATION (Local)
-        # Rotate around centroid (now at 0,0)
-        if abs(rotation) > 1e-9:
-            # rot_point=(0,0) ensures rotation around own axis
-            geometry = geometry.rotate_section(angle=rotation, rot_point=(0, 0))
-        
-        # STEP C: SHIFT (Global Positioning)
-        # Move from (0,0) to final offset
-        if abs(off_y) > 1e-9 or abs(off_z) > 1e-9:
-            geometry = geometry.shift_section(x_offset=off_z, y_offset=off_y)
-        
-        # 4. MESH AND CALCULATION
-        # Mesh is created at final position (rotated and shifted)
-        mesh_size = max(mesh_size, 2.0)
-        geometry.create_mesh(mesh_sizes=[mesh_size])
-        
-        sec = Section(geometry)
-        
-        # Execute FEM integrals
-        sec.calculate_geometric_properties()
-        sec.calculate_warping_properties()
         sec.calculate_plastic_properties()
         
         # 5. DIRECT EXTRACTION (GLOBAL ATTRIBUTES)
         # Since mesh is at final position, global integral IS nodal property (Steiner included)
+        # Composite sections (POLYGON parts with materials): transformed section in the reference material
+        sp = sec.section_props
+        e_ref, fy_ref = section_scales(sec)
         
-        area = sec.section_props.area
-        (cx, cy) = sec.get_c()  # Final centroid
+        area = sp.ea / e_ref
+        (cx, cy) = sec.get_c()  # Final (elastic) centroid
         
         # Local inertias (Centroidal - already reflect piece rotation!)
-        (ixx_c, iyy_c, ixy_c) = sec.get_ic()
+        (ixx_c, iyy_c, ixy_c) = (sp.ixx_c / e_ref, sp.iyy_c / e_ref, sp.ixy_c / e_ref)
         
         # Nodal inertias (Global at 0,0)
-        ixx_frame = sec.section_props.ixx_g
-        iyy_frame = sec.section_props.iyy_g
-        ixy_frame = sec.section_props.ixy_g
+        ixx_frame = sp.ixx_g / e_ref
+        iyy_frame = sp.iyy_g / e_ref
+        ixy_frame = sp.ixy_g / e_ref
         
-        qx_frame = sec.section_props.qx
-        qy_frame = sec.section_props.qy
+        qx_frame = sp.qx / e_ref
+        qy_frame = sp.qy / e_ref
         
         # Others
-        try:
-            (i1, i2) = sec.get_ip()
-            theta = sec.get_phi()
-        except:
-            (i1, i2, theta) = sec.get_ip()
-            
+        (i1, i2, theta) = (sp.i11_c / e_ref, sp.i22_c / e_ref, sp.phi)
         (rx, ry) = sec.get_rc()
-        j = sec.get_j()
-        gamma = sec.get_gamma()
-        (asx, asy) = sec.get_as()
+        j = sp.j / e_ref
+        gamma = sp.gamma / e_ref
+        (asx, asy) = (sp.a_sx / e_ref, sp.a_sy / e_ref)
+        # Cross term of the shear flexibility tensor (1/A_sxy), needed to rotate Ay/Az analytically
+        a_sxy = sp.a_sxy
+        shear_xy = e_ref / a_sxy if a_sxy and np.isfinite(a_sxy) else 0.0
         
-        z_vals = sec.get_z()
-        if len(z_vals) == 4:
-            zxx_eff = min(z_vals[0], z_vals[1])
-            zyy_eff = min(z_vals[2], z_vals[3])
-        else:
-            zxx_eff, zyy_eff = z_vals[:2]
+        zxx_eff = min(sp.zxx_plus, sp.zxx_minus) / e_ref
+        zyy_eff = min(sp.zyy_plus, sp.zyy_minus) / e_ref
         
-        s_vals = sec.get_s()
-        sxx, syy = s_vals[:2]
+        # Plastic moments of a composite -> modulus of the reference material
+        sxx, syy = sp.sxx / fy_ref, sp.syy / fy_ref
         
         # 6. CALCULATE EXTENTS AND PREPARE PROPERTIES
         (xmin, xmax, ymin, ymax) = geometry.calculate_extents()
@@ -200,64 +267,17 @@ def calculate_section_properties(section_type: str, params: dict) -> dict:
             "Max X": xmax,
         }
         
-        # 7. GENERATE IMAGE
-        plt.style.use('default')
-        fig, ax = plt.subplots(figsize=(6, 6))
-        
-        geometry.plot_geometry(ax=ax, cp=False, legend=False, title='')
-        
-        fig.patch.set_facecolor('white')
-        ax.set_facecolor('white')
-        ax.axis('on')
-        ax.grid(True, color='#e2e8f0', linestyle='--', linewidth=0.5)
-        ax.set_aspect('equal', adjustable='box')
-        
-        ax.plot(cx, cy, 'r+', markersize=15, markeredgewidth=2, label='Centroid')
-        ax.plot(0, 0, 'bx', markersize=12, markeredgewidth=2, label='Node (0,0)')
-        
-        if abs(cx) > 1e-4 or abs(cy) > 1e-4:
-            ax.plot([0, cx], [0, cy], color='red', linestyle=':', linewidth=1.5, label='Offset')
-        
-        ax.axhline(y=cy, color='#94a3b8', linestyle='-.', linewidth=1)
-        ax.axvline(x=cx, color='#94a3b8', linestyle='-.', linewidth=1)
-        ax.axhline(y=0, color='black', linestyle='-', linewidth=0.8, alpha=0.3)
-        ax.axvline(x=0, color='black', linestyle='-', linewidth=0.8, alpha=0.3)
-        
-        x_data = [0, cx, xmin, xmax]
-        y_data = [0, cy, ymin, ymax]
-        margin = max(xmax-xmin, ymax-ymin) * 0.2
-        if margin == 0:
-            margin = 10
-        ax.set_xlim(min(x_data)-margin, max(x_data)+margin)
-        ax.set_ylim(min(y_data)-margin, max(y_data)+margin)
-        
-        buf = io.BytesIO()
-        plt.savefig(buf, format='png', bbox_inches='tight', pad_inches=0.05, dpi=120)
-        buf.seek(0)
-        img_str = base64.b64encode(buf.read()).decode('utf-8')
-        plt.close(fig)
-        
-        # 8. EXTRACT MESH DATA
-        try:
-            sp_mesh = geometry.mesh
-            vertices = sp_mesh.get('vertices')
-            triangles = sp_mesh.get('triangles')
-            # Handle quadratic triangles (6 nodes) -> Linear (3 nodes)
-            if triangles is not None and len(triangles) > 0 and len(triangles[0]) == 6:
-                triangles = triangles[:, :3]
-            
-            mesh_data = {
-                "vertices": vertices.tolist() if vertices is not None else [],
-                "triangles": triangles.tolist() if triangles is not None else []
-            }
-        except:
-            mesh_data = None
+        # 7. GENERATE IMAGE (optional: normally served by /section_image)
+        image = render_section_image(geometry, props) if with_image else None
         
         return {
             "status": "success",
             "properties": props,
-            "mesh": mesh_data,
-            "image": f"data:image/png;base64,{img_str}"
+            "mesh": fem_mesh,
+            "viz_mesh": viz_mesh,
+            "shear_xy": float(shear_xy),
+            "mesh_info": mesh_info,
+            "image": image
         }
         
     except Exception as e:
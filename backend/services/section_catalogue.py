@@ -0,0 +1,250 @@
+"""
+Section Catalogue Service - Standard steel profiles (IPE, HEA, HEB, UPN, CHS, RHS)
+Properties are precomputed once with section_calculator (FEM, rotation 0 / centroid at 0,0) and
+shipped in data/steel_profiles.json, in the same 'props' keys build_geometry reads.
+Rotation / offset of a catalogue member are applied analytically (section_analytic), so a
+standard member never needs a FEM run.
+
+Regenerate the data file after changing the tables or section_calculator:
+    python -m services.section_catalogue
+"""
+import os
+import re
+import json
+from functools import lru_cache
+
+from services.section_analytic import NON_SHAPE_PARAMS
+from services.section_cache import ENGINE_VERSION
+
+CATALOGUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "steel_profiles.json")
+
+# Dimension tables [mm] (EN 10365 / EN 10210-2)
+# IPE / HEA / HEB: h, b, tw, tf, r
+IPE = {
+    80: (80, 46, 3.8, 5.2, 5), 100: (100, 55, 4.1, 5.7, 7), 120: (120, 64, 4.4, 6.3, 7),
+    140: (140, 73, 4.7, 6.9, 7), 160: (160, 82, 5.0, 7.4, 9), 180: (180, 91, 5.3, 8.0, 9),
+    200: (200, 100, 5.6, 8.5, 12), 220: (220, 110, 5.9, 9.2, 12), 240: (240, 120, 6.2, 9.8, 15),
+    270: (270, 135, 6.6, 10.2, 15), 300: (300, 150, 7.1, 10.7, 15), 330: (330, 160, 7.5, 11.5, 18),
+    360: (360, 170, 8.0, 12.7, 18), 400: (400, 180, 8.6, 13.5, 21), 450: (450, 190, 9.4, 14.6, 21),
+    500: (500, 200, 10.2, 16.0, 21), 550: (550, 210, 11.1, 17.2, 24), 600: (600, 220, 12.0, 19.0, 24),
+}
+HEA = {
+    100: (96, 100, 5.0, 8.0, 12), 120: (114, 120, 5.0, 8.0, 12), 140: (133, 140, 5.5, 8.5, 12),
+    160: (152, 160, 6.0, 9.0, 15), 180: (171, 180, 6.0, 9.5, 15), 200: (190, 200, 6.5, 10.0, 18),
+    220: (210, 220, 7.0, 11.0, 18), 240: (230, 240, 7.5, 12.0, 21), 260: (250, 260, 7.5, 12.5, 24),
+    280: (270, 280, 8.0, 13.0, 24), 300: (290, 300, 8.5, 14.0, 27), 320: (310, 300, 9.0, 15.5, 27),
+    340: (330, 300, 9.5, 16.5, 27), 360: (350, 300, 10.0, 17.5, 27), 400: (390, 300, 11.0, 19.0, 27),
+    450: (440, 300, 11.5, 21.0, 27), 500: (490, 300, 12.0, 23.0, 27), 550: (540, 300, 12.5, 24.0, 27),
+    600: (590, 300, 13.0, 25.0, 27),
+}
+HEB = {
+    100: (100, 100, 6.0, 10.0, 12), 120: (120, 120, 6.5, 11.0, 12), 140: (140, 140, 7.0, 12.0, 12),
+    160: (160, 160, 8.0, 13.0, 15), 180: (180, 180, 8.5, 14.0, 15), 200: (200, 200, 9.0, 15.0, 18),
+    220: (220, 220, 9.5, 16.0, 18), 240: (240, 240, 10.0, 17.0, 21), 260: (260, 260, 10.0, 17.5, 24),
+    280: (280, 280, 10.5, 18.0, 24), 300: (300, 300, 11.0, 19.0, 27), 320: (320, 300, 11.5, 20.5, 27),
+    340: (340, 300, 12.0, 21.5, 27), 360: (360, 300, 12.5, 22.5, 27), 400: (400, 300, 13.5, 24.0, 27),
+    450: (450, 300, 14.0, 26.0, 27), 500: (500, 300, 14.5, 28.0, 27), 550: (550, 300, 15.0, 29.0, 27),
+    600: (600, 300, 15.5, 30.0, 27),
+}
+# UPN: h, b, tw, tf, r (8% flange slope, toe radius r/2)
+UPN = {
+    80: (80, 45, 6.0, 8.0, 8.0), 100: (100, 50, 6.0, 8.5, 8.5), 120: (120, 55, 7.0, 9.0, 9.0),
+    140: (140, 60, 7.0, 10.0, 10.0), 160: (160, 65, 7.5, 10.5, 10.5), 180: (180, 70, 8.0, 11.0, 11.0),
+    200: (200, 75, 8.5, 11.5, 11.5), 220: (220, 80, 9.0, 12.5, 12.5), 240: (240, 85, 9.5, 13.0, 13.0),
+    260: (260, 90, 10.0, 14.0, 14.0), 280: (280, 95, 10.0, 15.0, 15.0), 300: (300, 100, 10.0, 16.0, 16.0),
+}
+UPN_SLOPE = 8.0
+# CHS: d x t
+CHS = [
+    (33.7, 3.2), (42.4, 3.2), (48.3, 3.2), (48.3, 4.0), (60.3, 3.2), (60.3, 4.0), (76.1, 3.2),
+    (76.1, 4.0), (88.9, 3.2), (88.9, 4.0), (88.9, 5.0), (114.3, 3.6), (114.3, 5.0), (139.7, 4.0),
+    (139.7, 5.0), (139.7, 6.3), (168.3, 5.0), (168.3, 6.3), (168.3, 8.0), (219.1, 6.3), (219.1, 8.0),
+    (219.1, 10.0), (273.0, 6.3), (273.0, 8.0), (273.0, 10.0), (323.9, 8.0), (323.9, 10.0),
+    (355.6, 10.0), (406.4, 10.0), (457.0, 10.0), (508.0, 12.5),
+]
+# RHS / SHS (hot finished, outer corner radius 1.5 t): h x b x t
+RHS = [
+    (40, 40, 3.0), (50, 50, 4.0), (60, 60, 4.0), (80, 80, 5.0), (100, 100, 6.3), (120, 120, 8.0),
+    (150, 150, 8.0), (200, 200, 10.0), (250, 250, 10.0), (300, 300, 12.5),
+    (50, 30, 3.2), (60, 40, 4.0), (80, 40, 4.0), (100, 50, 5.0), (100, 60, 5.0), (120, 60, 5.0),
+    (120, 80, 6.3), (150, 100, 6.3), (160, 80, 6.3), (200, 100, 8.0), (200, 120, 8.0),
+    (250, 150, 10.0), (300, 200, 10.0),
+]
+
+FAMILIES = ("IPE", "HEA", "HEB", "UPN", "CHS", "RHS")
+
+
+
+def _fmt(value) -> str:
+    return f"{value:g}"
+
+
+def _round(value: float) -> float:
+    """10 significant digits in the data file (FEM discretisation error is far larger)."""
+    return float(f"{value:.10g}")
+
+
+def standard_profiles():
+    """(name, family, section_type, intrinsic params) of every catalogue profile."""
+    profiles = []
+    for family, table in (("IPE", IPE), ("HEA", HEA), ("HEB", HEB)):
+        for size, (h, b, tw, tf, r) in table.items():
+            profiles.append((f"{family} {size}", family, "I_SECTION", {
+                "h": h, "bf_top": b, "bf_bot": b, "tf_top": tf, "tf_bot": tf, "tw": tw, "r": r
+            }))
+    for size, (h, b, tw, tf, r) in UPN.items():
+        profiles.append((f"UPN {size}", "UPN", "CHANNEL", {
+            "h": h, "b": b, "tw": tw, "tf": tf, "r": r, "slope": UPN_SLOPE
+        }))
+    for d, t in CHS:
+        profiles.append((f"CHS {_fmt(d)}x{_fmt(t)}", "CHS", "TUBE", {"r": d / 2, "t": t}))
+    for h, b, t in RHS:
+        profiles.append((f"RHS {_fmt(h)}x{_fmt(b)}x{_fmt(t)}", "RHS", "BOX", {
+            "hy": h, "hz": b, "t": t, "r_out": 1.5 * t
+        }))
+    return profiles
+
+
+def normalize_name(name: str) -> str:
+    """'ipe200', 'IPE-200', 'chs 88.9 x 4' -> 'IPE 200', 'CHS 88.9x4'."""
+    m = re.match(r"^\s*([A-Za-z]+)[\s\-_]*(.*?)\s*$", name or "")
+    if not m:
+        return ""
+    dims = re.sub(r"\s*[xX*]\s*", "x", m.group(2))
+    dims = "x".join(_fmt(float(d)) if re.match(r"^\d+(\.\d+)?$", d) else d for d in dims.split("x"))
+    return f"{m.group(1).upper()} {dims}".strip()
+
+
+def shape_key(section_type: str, params: dict):
+    """Dimension index key: type + shape parameters (placement/fiber parameters ignored)."""
+    shape = {}
+    for k, v in (params or {}).items():
+        if k in NON_SHAPE_PARAMS:
+            continue
+        try:
+            value = float(v)
+        except (TypeError, ValueError):
+            return None
+        if value:  # build_section_geometry ignores empty / zero values too
+            shape[k] = round(value, 6)
+    return (section_type, tuple(sorted(shape.items())))
+
+
+@lru_cache(maxsize=1)
+def load_catalogue():
+    """
+    {'profiles': {name: entry}, 'by_shape': {shape_key: name}} from the data file.
+    entry: {name, family, type, params, properties, shear_xy}
+    """
+    with open(CATALOGUE_FILE, "r", encoding="utf-8") as f:
+        data = json.load(f)
+
+    keys = data["keys"]
+    profiles, by_shape = {}, {}
+    for name, family, section_type, params, values, shear_xy in data["profiles"]:
+        profiles[name] = {
+            "name": name,
+            "family": family,
+            "type": section_type,
+            "params": params,
+            "properties": dict(zip(keys, values)),
+            "shear_xy": shear_xy
+        }
+        by_shape[shape_key(section_type, params)] = name
+    print(f"[CATALOGUE] {len(profiles)} profiles loaded ({data.get('engine')})")
+    if data.get("engine") != ENGINE_VERSION:
+        # Still served: the tables only go stale when section_calculator results changed
+        print(f"[CATALOGUE] WARNING: data file built with {data.get('engine')}, current engine is "
+              f"{ENGINE_VERSION} - regenerate it (python -m services.section_catalogue)")
+    return {"profiles": profiles, "by_shape": by_shape}
+
+
+def find_profile(name: str):
+    """Catalogue entry by designation (case/spacing insensitive) or None."""
+    return load_catalogue()["profiles"].get(normalize_name(name))
+
+
+def match_profile(section_type: str, params: dict):
+    """Catalogue entry whose dimensions equal these parameters (any rotation/offset) or None."""
+    key = shape_key(section_type, params)
+    name = load_catalogue()["by_shape"].get(key) if key else None
+    return load_catalogue()["profiles"][name] if name else None
+
+
+def search_profiles(family: str = None, query: str = None) -> list:
+    """Catalogue listing (no properties), optionally filtered by family / designation prefix."""
+    query = normalize_name(query) if query else None
+    result = []
+    for entry in load_catalogue()["profiles"].values():
+        if family and entry["family"] != family.upper():
+            continue
+        if query and not entry["name"].startswith(query):
+            continue
+        result.append({k: entry[k] for k in ("name", "family", "type", "params")})
+    return result
+
+
+@lru_cache(maxsize=256)
+def _profile_viz_mesh(name: str):
+    """Intrinsic outline triangulation of a profile (geometry only, no FEM)."""
+    from services.section_geometry import build_section_geometry, visual_mesh_data
+
+    entry = load_catalogue()["profiles"][name]
+    geometry, _ = build_section_geometry(entry["type"], entry["params"])
+    return visual_mesh_data(geometry)
+
+
+def profile_section_properties(entry: dict, params: dict = None) -> dict:
+    """
+    Complete result (same shape as calculate_section_properties) of a catalogue profile placed
+    with the rotation/offset of 'params' - analytic transforms only.
+    """
+    from services.section_analytic import place_section
+
+    intrinsic = {
+        "properties": entry["properties"],
+        "mesh": None,
+        "viz_mesh": _profile_viz_mesh(entry["name"]),
+        "shear_xy": entry["shear_xy"]
+    }
+    result = place_section(intrinsic, entry["type"], {**entry["params"], **(params or {})})
+    result["complete"] = True
+    result["profile"] = entry["name"]
+    return result
+
+
+def catalogue_section_properties(section_type: str, params: dict):
+    """Catalogue result when (type, params) is a standard profile, else None."""
+    try:
+        entry = match_profile(section_type, params)
+    except OSError as e:
+        print(f"[CATALOGUE] Data file unavailable: {e}")
+        return None
+    return profile_section_properties(entry, params) if entry else None
+
+
+def build_catalogue(path: str = CATALOGUE_FILE):
+    """Run the FEM analysis of every standard profile and write the compact data file."""
+    from services.section_calculator import calculate_section_properties
+
+    keys, rows = None, []
+    for name, family, section_type, params in standard_profiles():
+        result = calculate_section_properties(section_type, params)
+        if result["status"] != "success":
+            raise RuntimeError(f"{name}: {result.get('message')}")
+
+        props = result["properties"]
+        keys = keys or list(props.keys())
+        rows.append([name, family, section_type, params, [_round(props[k]) for k in keys], _round(result["shear_xy"])])
+        print(f"[CATALOGUE] {name:<18} A={props['Area (A)']:.1f} J={props['Torsion J']:.4g}")
+
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"engine": %s, "keys": %s, "profiles": [\n' % (json.dumps(ENGINE_VERSION), json.dumps(keys)))
+        f.write(",\n".join(json.dumps(row) for row in rows))
+        f.write("\n]}\n")
+    print(f"[CATALOGUE] {len(rows)} profiles written to {path}")
+
+
+if __name__ == "__main__":
+    build_catalogue()
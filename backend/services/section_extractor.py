@@ -3,6 +3,12 @@
 """
 Section Extractor - Independent Process for SectionProperties
 FIX: Added robust path resolution to find the 'services' package.
+
+Two modes:
+    python section_extractor.py              one job: JSON on stdin -> result JSON on stdout
+    python section_extractor.py --serve [MB] persistent worker (section_workers): one JSON job per
+                                             line in, one JSON line out; optional address-space
+                                             limit in MB (POSIX only)
 """
 import sys
 import os
@@ -16,34 +22,113 @@ backend_root = os.path.dirname(current_dir)
 if backend_root not in sys.path:
     sys.path.insert(0, backend_root)
 
+
+def protocol_stdout():
+    """Real stdout for the JSON replies; the services' [TAG] prints go to stderr instead."""
+    out = sys.stdout
+    sys.stdout = sys.stderr
+    return out
+
+
+def limit_memory(memory_mb: int):
+    """Address-space limit of this process: runaway meshes fail with MemoryError instead of swapping."""
+    try:
+        import resource
+    except ImportError:
+        return False  # Windows: the pool recycles workers by job count / timeout only
+    limit = memory_mb * 1024 * 1024
+    resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    return True
+
+
+def peak_memory_mb() -> float:
+    """Peak resident memory of this process (0 where not available)."""
+    try:
+        import resource
+    except ImportError:
+        return 0.0
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def run_job(job: dict) -> dict:
+    """{type, params, with_image} -> cached_section_properties result (the worker fills the disk cache)."""
+    from services.section_cache import cached_section_properties, section_param_hash
+
+    section_type = job.get('type')
+    params = job.get('params', {})
+    return cached_section_properties(
+        section_param_hash(section_type, params), section_type, params, with_image=job.get('with_image', False)
+    )
+
+
+def serve(memory_mb: int = 0):
+    if sys.stdin is None or sys.stdout is None:
+        # Windowed frozen build (console=False): no sys streams, the pipes are still fds 0 / 1
+        sys.stdin = open(0, "r", encoding="utf-8", closefd=False)
+        sys.stdout = open(1, "w", encoding="utf-8", closefd=False)
+    if sys.stderr is None:
+        sys.stderr = open(os.devnull, "w")
+    out = protocol_stdout()
+    if memory_mb:
+        limit_memory(memory_mb)
+
+    # Import once: the worker stays warm between jobs
+    from services.section_cache import cached_section_properties  # noqa: F401
+
+    # Ready: the pool starts the job timeouts from here, not from the process start
+    out.write(json.dumps({"ready": True}) + "\n")
+    out.flush()
+
+    for line in sys.stdin:
+        if not line.strip():
+            continue
+        job_id = None
+        try:
+            job = json.loads(line)
+            job_id = job.get('id')
+            reply = {"id": job_id, "status": "success", "result": run_job(job)}
+        except MemoryError:
+            reply = {"id": job_id, "status": "error", "message": "Section worker out of memory (mesh too fine?)"}
+        except Exception as e:
+            reply = {"id": job_id, "status": "error", "message": str(e), "traceback": traceback.format_exc()}
+        reply["peak_mb"] = peak_memory_mb()
+        out.write(json.dumps(reply) + "\n")
+        out.flush()
+
+
 def main():
+    out = protocol_stdout()
     try:
         # 1. Read input from StdIn
         input_data = sys.stdin.read()
         if not input_data:
-            print(json.dumps({"status": "error", "message": "No input received"}))
+            out.write(json.dumps({"status": "error", "message": "No input received"}) + "\n")
             return
-            
+
         params_bundle = json.loads(input_data)
         section_type = params_bundle.get('type')
         params = params_bundle.get('params', {})
-        
+
         # 2. Lazy Import (Now safe after path bootstrap)
         from services.section_calculator import calculate_section_properties
-        
+
         # 3. Calculate
-        result = calculate_section_properties(section_type, params)
-        
+        result = calculate_section_properties(section_type, params, with_image=params_bundle.get('with_image', True))
+
         # 4. Output result
-        print(json.dumps(result))
-        
+        out.write(json.dumps(result) + "\n")
+
     except Exception as e:
         error_info = {
             "status": "error",
             "message": str(e),
             "traceback": traceback.format_exc()
         }
-        print(json.dumps(error_info))
+        out.write(json.dumps(error_info) + "\n")
 
 if __name__ == "__main__":
-    main()
+    if len(sys.argv) > 1 and sys.argv[1] == "--serve":
+        serve(int(sys.argv[2]) if len(sys.argv) > 2 else 0)
+    else:
+        main()
@@ -0,0 +1,307 @@
+"""
+Section Geometry Service - one geometry / one FEM meshing pass per (type, params)
+Builds the positioned sectionproperties geometry, meshes it once and derives:
+  - the FEM mesh (analysis + linear corner triangles for export)
+  - a visualization triangulation of the section outline (no interior nodes), used by
+    the 3D extrusion instead of the dense FEM mesh
+Both are cached with the section properties under the same key (section_cache).
+
+POLYGON sections take user outlines instead of dimensions:
+    {"outer": [[z, y], ...], "holes": [[[z, y], ...], ...]}                  single part
+    {"parts": [{"outer": ..., "holes": ..., "material": {...}}, ...]}        built-up / composite
+Points are [z, y] (section x = local Z). Outlines are centred like the other types (position
+them with offset_y / offset_z). material: {"name", "E", "nu", "fy", "density"}; with materials the
+properties are those of the transformed section in the stiffest material (reference_material).
+"""
+import math
+import cytriangle
+from shapely.geometry import Polygon
+from shapely.geometry.polygon import orient
+from shapely.ops import unary_union
+from sectionproperties.pre.geometry import Geometry, CompoundGeometry
+from sectionproperties.pre.pre import Material
+from sectionproperties.pre.library import (
+    rectangular_section,
+    rectangular_hollow_section,
+    circular_section,
+    circular_hollow_section,
+    mono_i_section,
+    tapered_flange_channel
+)
+
+
+def build_section_geometry(section_type: str, params: dict):
+    """
+    Build the positioned (rotated + shifted) sectionproperties geometry, without meshing.
+    
+    CRITICAL 3-STEP TRANSFORM:
+    1. RESET: align_center(0,0) - Normalize centroid
+    2. ROTATE: rotate_section(angle, rot_point=(0,0)) - Rotate around centroid
+    3. SHIFT: shift_section(x_offset=off_z, y_offset=off_y) - Move to final position
+    
+    Args:
+        section_type: Type of section (RECTANGLE, BOX, CIRCLE, TUBE, I_SECTION, CHANNEL, POLYGON)
+        params: Dictionary of section parameters
+        
+    Returns:
+        (geometry, mesh_size)
+    """
+    # 1. PARSE PARAMETERS (outlines of POLYGON sections are lists, not numbers)
+    p = {k: float(v) for k, v in params.items() if v and not isinstance(v, (list, dict))}
+    
+    # Position parameters (CRITICAL!)
+    off_y = p.get('offset_y', 0.0)
+    off_z = p.get('offset_z', 0.0)
+    rotation = p.get('rotation', 0.0)  # Degrees
+    
+    geometry = None
+    mesh_size = 10.0
+    
+    # 2. CREATE BASE GEOMETRY
+    if section_type == 'RECTANGLE':
+        d, b = p.get('hy', 100), p.get('hz', 50)
+        geometry = rectangular_section(d=d, b=b)
+        mesh_size = min(d, b) / 5.0
+        
+    elif section_type == 'BOX':
+        d, b, t = p.get('hy', 100), p.get('hz', 50), p.get('t', 5)
+        if t*2 >= d or t*2 >= b:
+            t = min(d, b)/2 - 0.1
+        r_out = min(p.get('r_out', 0.0), min(d, b) / 2)  # Hot-finished RHS corners (catalogue)
+        geometry = rectangular_hollow_section(
+            d=d, b=b, t=t, r_out=r_out, n_r=8 if r_out > 0 else 1, r_in=max(r_out - t, 0.0)
+        )
+        mesh_size = t / 1.5
+        
+    elif section_type == 'CIRCLE':
+        d = 2 * p.get('r', 50)
+        geometry = circular_section(d=d, n=64)
+        mesh_size = d / 10.0
+        
+    elif section_type == 'TUBE':
+        d, t = 2 * p.get('r', 50), p.get('t', 5)
+        if t*2 >= d:
+            t = d/2 - 0.1
+        geometry = circular_hollow_section(d=d, t=t, n=64)
+        mesh_size = t / 1.5
+        
+    elif section_type == 'I_SECTION':
+        h = p.get('h', 200)
+        bf_t, bf_b = p.get('bf_top', 100), p.get('bf_bot', 100)
+        tf_t, tf_b, tw = p.get('tf_top', 10), p.get('tf_bot', 10), p.get('tw', 6)
+        if tw >= bf_t:
+            tw = bf_t - 2
+        if (tf_t + tf_b) >= h:
+            h = tf_t + tf_b + 10
+        geometry = mono_i_section(
+            d=h, b_t=bf_t, b_b=bf_b, 
+            t_ft=tf_t, t_fb=tf_b, t_w=tw, 
+            r=p.get('r', 0), n_r=8
+        )
+        mesh_size = min(tw, tf_t, tf_b) / 1.5
+        
+    elif section_type == 'CHANNEL':
+        # UPN: flange slope in % (8 for UPN), toe radius = r/2; slope 0 -> parallel flanges
+        h, b = p.get('h', 200), p.get('b', 75)
+        tf, tw, r = p.get('tf', 11.5), p.get('tw', 8.5), p.get('r', 0)
+        slope = p.get('slope', 0.0)
+        if tw >= b:
+            tw = b - 2
+        if 2 * tf >= h:
+            h = 2 * tf + 10
+        geometry = tapered_flange_channel(
+            d=h, b=b, t_f=tf, t_w=tw,
+            r_r=r, r_f=r / 2 if slope > 0 else 0, alpha=math.degrees(math.atan(slope / 100.0)),
+            n_r=8 if r > 0 else 1
+        )
+        mesh_size = min(tw, tf) / 1.5
+        
+    elif section_type == 'POLYGON':
+        geometry, mesh_size = polygon_geometry(params)
+    
+    if not geometry:
+        raise ValueError(f"Unknown section type: {section_type}")
+    
+    # 3. GEOMETRIC MANIPULATION (3-STEP CRITICAL FLOW)
+    
+    # STEP A: RESET (Normalization)
+    # Centroid goes to (0,0)
+    geometry = geometry.align_center(align_to=(0, 0))
+    
+    # STEP B: ROTATION (Local)
+    # Rotate around centroid (now at 0,0)
+    if abs(rotation) > 1e-9:
+        # rot_point=(0,0) ensures rotation around own axis
+        geometry = geometry.rotate_section(angle=rotation, rot_point=(0, 0))
+    
+    # STEP C: SHIFT (Global Positioning)
+    # Move from (0,0) to final offset
+    if abs(off_y) > 1e-9 or abs(off_z) > 1e-9:
+        geometry = geometry.shift_section(x_offset=off_z, y_offset=off_y)
+    
+    return geometry, max(mesh_size, 2.0)
+
+
+def _clean_ring(coords) -> list:
+    """[[x, y], ...] without the closing point and consecutive duplicates."""
+    ring = []
+    for point in coords or []:
+        x, y = float(point[0]), float(point[1])
+        if not ring or (x, y) != ring[-1]:
+            ring.append((x, y))
+    if len(ring) > 1 and ring[0] == ring[-1]:
+        ring.pop()
+    if len(ring) < 3:
+        raise ValueError("Polygon outline needs at least 3 distinct points")
+    return ring
+
+
+def polygon_parts(params: dict) -> list:
+    """[(shapely Polygon, material dict or None), ...] of a POLYGON section, validated."""
+    parts = params.get('parts')
+    if not parts:
+        parts = [{"outer": params.get('outer'), "holes": params.get('holes') or []}]
+
+    result = []
+    for index, part in enumerate(parts):
+        poly = Polygon(_clean_ring(part.get('outer')), [_clean_ring(h) for h in part.get('holes') or []])
+        if not poly.is_valid or poly.area <= 0:
+            raise ValueError(f"Invalid polygon outline (part {index + 1}): self-intersecting or zero area")
+        result.append((orient(poly, sign=1.0), part.get('material')))
+
+    # Parts may touch (shared edges) but not overlap
+    overlap = sum(p.area for p, _ in result) - unary_union([p for p, _ in result]).area
+    if overlap > 1e-9 * sum(p.area for p, _ in result):
+        raise ValueError("Polygon parts overlap")
+    return result
+
+
+def section_material(material: dict):
+    """sectionproperties Material of a part (None -> geometric analysis)."""
+    if not material:
+        return None
+    return Material(
+        name=str(material.get('name', 'material')),
+        elastic_modulus=float(material.get('E', 1.0)),
+        poissons_ratio=float(material.get('nu', 0.0)),
+        yield_strength=float(material.get('fy', 1.0)),
+        density=float(material.get('density', 1.0)),
+        color=str(material.get('color', 'lightgrey'))
+    )
+
+
+def polygon_geometry(params: dict):
+    """Geometry / CompoundGeometry of a POLYGON section + heuristic mesh size."""
+    geoms, mesh_size = [], None
+    for poly, material in polygon_parts(params):
+        mat = section_material(material)
+        geoms.append(Geometry(poly, material=mat) if mat else Geometry(poly))
+        # Characteristic wall thickness 2A/P, same scale as the fixed shapes (tw / 1.5)
+        thickness = 2 * poly.area / poly.length
+        mesh_size = thickness / 1.5 if mesh_size is None else min(mesh_size, thickness / 1.5)
+    geometry = geoms[0] if len(geoms) == 1 else CompoundGeometry(geoms)
+    return geometry, mesh_size
+
+
+def reference_material(geometry):
+    """Stiffest material of a composite geometry (reference of the transformed section)."""
+    geoms = geometry.geoms if hasattr(geometry, 'geoms') else [geometry]
+    return max((g.material for g in geoms), key=lambda m: (m.elastic_modulus, m.yield_strength))
+
+
+def _canonical_ring(ring, dx: float, dy: float, digits: int = 6) -> list:
+    """Shifted, rounded ring starting at its lowest-leftmost vertex (orientation already fixed)."""
+    pts = [[round(x - dx, digits) + 0.0, round(y - dy, digits) + 0.0] for x, y in ring]
+    start = min(range(len(pts)), key=lambda i: (pts[i][1], pts[i][0]))
+    return pts[start:] + pts[:start]
+
+
+def canonical_section_params(section_type: str, params: dict) -> dict:
+    """
+    Cache-key form of the parameters. POLYGON outlines are oriented (outer CCW, holes CW), freed
+    of duplicate points, moved so the geometric centroid is at 0,0 (build_section_geometry
+    centres every section anyway), rounded and sorted: equivalent inputs share one cache entry.
+    """
+    if section_type != 'POLYGON':
+        return params
+
+    parts = polygon_parts(params)
+    centroid = unary_union([poly for poly, _ in parts]).centroid
+    canonical = []
+    for poly, material in parts:
+        part = {
+            "outer": _canonical_ring(poly.exterior.coords[:-1], centroid.x, centroid.y),
+            "holes": sorted(_canonical_ring(h.coords[:-1], centroid.x, centroid.y) for h in poly.interiors)
+        }
+        if material:
+            part["material"] = {k: (float(v) if k != 'name' and k != 'color' else v) for k, v in material.items()}
+        canonical.append(part)
+    canonical.sort(key=lambda part: (part["outer"][0], len(part["outer"]), part["outer"]))
+
+    result = {k: v for k, v in params.items() if k not in ('outer', 'holes', 'parts')}
+    result["parts"] = canonical
+    return result
+
+
+def fem_mesh_data(geometry) -> dict:
+    """Linear (corner) triangles of the FEM mesh already created on the geometry."""
+    try:
+        sp_mesh = geometry.mesh
+        vertices = sp_mesh.get('vertices')
+        triangles = sp_mesh.get('triangles')
+        # Handle quadratic triangles (6 nodes) -> Linear (3 nodes)
+        if triangles is not None and len(triangles) > 0 and len(triangles[0]) == 6:
+            triangles = triangles[:, :3]
+        
+        return {
+            "vertices": vertices.tolist() if vertices is not None else [],
+            "triangles": triangles.tolist() if triangles is not None else []
+        }
+    except:
+        return None
+
+
+def visual_mesh_data(geometry) -> dict:
+    """
+    Constrained triangulation of the section outline (same points/facets/holes the FEM
+    mesher receives, without area/quality refinement): the decimated mesh for the 3D view.
+    """
+    try:
+        tri = {"vertices": geometry.points, "segments": geometry.facets}
+        if geometry.holes:
+            tri["holes"] = geometry.holes
+        mesh = cytriangle.triangulate(tri, "p")
+        return {
+            "vertices": [[float(x), float(y)] for x, y in mesh["vertices"]],
+            "triangles": [[int(i) for i in t] for t in mesh["triangles"]]
+        }
+    except Exception as e:
+        print(f"[SECTION-GEOMETRY] Visual triangulation failed: {e}")
+        return None
+
+
+def mesh_section(section_type: str, params: dict):
+    """
+    The FEM meshing pass of a section edit (heuristic element size), plus the outline
+    triangulation for the 3D view. Returns (meshed geometry, fem_mesh, viz_mesh, mesh_size).
+    """
+    geometry, mesh_size = build_section_geometry(section_type, params)
+    viz_mesh = visual_mesh_data(geometry)
+    geometry.create_mesh(mesh_sizes=[mesh_size])
+    return geometry, fem_mesh_data(geometry), viz_mesh, mesh_size
+
+
+def section_meshes(param_hash: str, section_type: str, params: dict) -> dict:
+    """
+    {mesh, viz_mesh} for the 3D view: the cached meshes when the shape was already analysed,
+    else only the geometry + its outline triangulation (mesh None). Never runs the FEM: the
+    properties come from the cache or the section worker pool.
+    """
+    from services.section_cache import cached_section_properties, load_section, section_shape_hash
+
+    if load_section(section_shape_hash(section_type, params)) is not None:
+        entry = cached_section_properties(param_hash, section_type, params)
+        return {"mesh": entry.get("mesh"), "viz_mesh": entry.get("viz_mesh")}
+
+    geometry, _ = build_section_geometry(section_type, params)
+    return {"mesh": None, "viz_mesh": visual_mesh_data(geometry)}
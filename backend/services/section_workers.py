@@ -0,0 +1,213 @@
+"""
+Section Workers - managed pool of section_extractor.py processes
+sectionproperties can hang or run for minutes on degenerate input (BOX with t ~ b/2, very fine
+mesh...). Every FEM section job runs in a separate worker process, so a bad section never
+blocks Flask threads or the other jobs:
+  - per-job wall-clock timeout: the worker is killed, the job fails with SectionTimeoutError
+  - memory limit per worker (address space, POSIX) + recycling when the peak RSS exceeds it
+  - recycling after WORKER_MAX_JOBS jobs (sectionproperties / matplotlib leak slowly)
+  - crashed workers are replaced on the next job
+Workers are persistent (sectionproperties imported once) and speak one JSON line per job
+(section_extractor.serve), after a ready line once the imports are done. In the frozen build the
+worker is ProSolve.exe itself (app.py dispatches --section-worker); if no worker can start, jobs
+run in-process (no timeout / memory limit). submit() returns a concurrent.futures.Future.
+"""
+import os
+import sys
+import json
+import time
+import queue
+import itertools
+import subprocess
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+EXTRACTOR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "section_extractor.py")
+
+# Leave one core for Flask / the UI
+SECTION_POOL_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Worker startup limit (interpreter + sectionproperties imports) before its ready line [s]
+WORKER_START_TIMEOUT = float(os.environ.get("PROSOLVE_SECTION_START_TIMEOUT", "60"))
+# Wall-clock limit of one section job [s], counted once the worker is ready
+SECTION_JOB_TIMEOUT = float(os.environ.get("PROSOLVE_SECTION_TIMEOUT", "120"))
+# Memory limit of one worker [MB] (0 = none)
+WORKER_MEMORY_MB = int(os.environ.get("PROSOLVE_SECTION_WORKER_MB", "4096"))
+# Jobs before a worker is replaced by a fresh process
+WORKER_MAX_JOBS = 50
+
+
+class SectionWorkerError(Exception):
+    """Section job failed inside a worker (bad geometry, crash, out of memory...)."""
+
+
+class SectionTimeoutError(SectionWorkerError):
+    """Section job exceeded its wall-clock limit; the worker was killed."""
+
+
+class SectionWorkerStartError(SectionWorkerError):
+    """No worker process could be started (or it never became ready)."""
+
+
+def worker_command(memory_mb: int) -> list:
+    """Command line of one worker: the extractor script, or the frozen executable itself."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable, "--section-worker", str(memory_mb)]
+    return [sys.executable, EXTRACTOR_SCRIPT, "--serve", str(memory_mb)]
+
+
+class SectionWorker:
+    """One persistent section_extractor.py --serve process."""
+
+    def __init__(self, memory_mb: int = WORKER_MEMORY_MB, start_timeout: float = WORKER_START_TIMEOUT):
+        try:
+            self.process = subprocess.Popen(
+                worker_command(memory_mb),
+                stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=None,  # worker logs -> our console
+                text=True, encoding="utf-8", bufsize=1,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0)
+            )
+        except OSError as e:
+            raise SectionWorkerStartError(f"Section worker could not start: {e}")
+        self.jobs_done = 0
+        self.peak_mb = 0.0
+        self._replies = queue.Queue()
+        self._ids = itertools.count()
+        threading.Thread(target=self._read_replies, daemon=True).start()
+
+        # Startup (interpreter, imports) has its own limit: job timeouts start once the worker is ready
+        try:
+            self._next_reply(time.monotonic() + start_timeout, lambda reply: reply.get("ready"))
+        except SectionWorkerError as e:
+            self.stop()
+            raise SectionWorkerStartError(f"Section worker not ready: {e}")
+
+    def _read_replies(self):
+        for line in self.process.stdout:
+            self._replies.put(line)
+        self._replies.put(None)  # EOF: the process exited
+
+    def _next_reply(self, deadline: float, match) -> dict:
+        """First JSON reply accepted by match() before the deadline; other stdout lines are skipped."""
+        while True:
+            try:
+                line = self._replies.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self.stop()
+                raise SectionTimeoutError("no reply in time (worker stopped)")
+            if line is None:
+                raise SectionWorkerError(f"Section worker exited (code {self.process.poll()})")
+            try:
+                reply = json.loads(line)
+            except ValueError:
+                print(f"[SECTION-WORKERS] Worker {self.process.pid} stdout: {line.rstrip()}")
+                continue
+            if isinstance(reply, dict) and match(reply):
+                return reply
+
+    def alive(self) -> bool:
+        return self.process.poll() is None
+
+    def run(self, job: dict, timeout: float) -> dict:
+        """Send one job and wait for its reply (kills the worker on timeout)."""
+        job_id = next(self._ids)
+        try:
+            self.process.stdin.write(json.dumps({**job, "id": job_id}) + "\n")
+            self.process.stdin.flush()
+        except OSError as e:
+            raise SectionWorkerError(f"Section worker unavailable: {e}")
+
+        try:
+            reply = self._next_reply(time.monotonic() + timeout, lambda reply: reply.get("id") == job_id)
+        except SectionTimeoutError:
+            raise SectionTimeoutError(f"Section calculation exceeded {timeout:.0f} s (worker stopped)")
+
+        self.jobs_done += 1
+        self.peak_mb = reply.get("peak_mb", 0.0)
+        if reply.get("status") != "success":
+            raise SectionWorkerError(reply.get("message", "Section calculation failed"))
+        return reply["result"]
+
+    def stop(self):
+        if self.alive():
+            self.process.kill()
+        try:
+            self.process.wait(timeout=5)
+        except subprocess.TimeoutExpired:
+            pass
+
+
+class SectionWorkerPool:
+    """
+    At most 'workers' section jobs at a time, each on its own worker process.
+    Workers start lazily and are recycled on timeout, crash, memory or job count.
+    """
+
+    def __init__(self, workers: int = SECTION_POOL_WORKERS, timeout: float = SECTION_JOB_TIMEOUT,
+                 memory_mb: int = WORKER_MEMORY_MB, max_jobs: int = WORKER_MAX_JOBS):
+        self.workers = workers
+        self.timeout = timeout
+        self.memory_mb = memory_mb
+        self.max_jobs = max_jobs
+        self._idle = []
+        self._lock = threading.Lock()
+        self._in_process = False  # set when no worker process can be started
+        # Dispatch threads only wait on pipes: one per worker bounds the concurrent jobs
+        self._dispatch = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="section-worker")
+
+    def _acquire(self) -> SectionWorker:
+        with self._lock:
+            while self._idle:
+                worker = self._idle.pop()
+                if worker.alive():
+                    return worker
+        return SectionWorker(self.memory_mb)
+
+    def _release(self, worker: SectionWorker):
+        recycle = None
+        if not worker.alive():
+            recycle = "exited"
+        elif worker.jobs_done >= self.max_jobs:
+            recycle = f"{worker.jobs_done} jobs"
+        elif self.memory_mb and worker.peak_mb > 0.75 * self.memory_mb:
+            recycle = f"peak memory {worker.peak_mb:.0f} MB"
+
+        if recycle:
+            print(f"[SECTION-WORKERS] Recycling worker {worker.process.pid} ({recycle})")
+            worker.stop()
+            return
+        with self._lock:
+            self._idle.append(worker)
+
+    def _run(self, job: dict, timeout: float) -> dict:
+        if self._in_process:
+            return self._run_in_process(job)
+        try:
+            worker = self._acquire()
+        except SectionWorkerStartError as e:
+            print(f"[SECTION-WORKERS] {e}; running section jobs in-process (no timeout)")
+            self._in_process = True
+            return self._run_in_process(job)
+        try:
+            return worker.run(job, timeout)
+        except SectionTimeoutError:
+            print(f"[SECTION-WORKERS] Timeout {job.get('type')} after {timeout:.0f} s, worker {worker.process.pid} killed")
+            raise
+        finally:
+            self._release(worker)
+
+    @staticmethod
+    def _run_in_process(job: dict) -> dict:
+        from services.section_extractor import run_job
+        return run_job(job)
+
+    def submit(self, section_type: str, params: dict, with_image: bool = False, timeout: float = None):
+        """Future of the (disk-cached) section result computed in a worker process."""
+        job = {"type": section_type, "params": params, "with_image": with_image}
+        return self._dispatch.submit(self._run, job, timeout or self.timeout)
+
+    def shutdown(self):
+        self._dispatch.shutdown(wait=False, cancel_futures=True)
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for worker in idle:
+            worker.stop()
@@ -0,0 +1,201 @@
+"""
+Simulation Cache - solve-skipping cache of completed Code_Aster runs
+"Save and run" after a change that does not reach the solver (report, UI settings...) used to
+re-solve an identical model. Each run is keyed by:
+  - the normalized calcul.comm (the '# Generated at' timestamp line removed)
+  - the content hashes of the input files of export.export ('F <type> <path> D <unit>': meshes...)
+  - the solver version ('P version' + the as_run executable)
+A completed run stores resu.med / mass_properties.csv / reactions.csv / message under
+<CACHE_DIR>/<key>/; a later run with the same key gets them copied back instead of launching as_run.
+Shared by every project (the key has no project path in it), size-bounded, least recently used evicted first.
+"""
+import os
+import re
+import json
+import shutil
+import hashlib
+import threading
+from datetime import datetime
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CACHE_DIR = os.environ.get("PROSOLVE_RUN_CACHE", os.path.join(BACKEND_DIR, ".cache", "runs"))
+MAX_CACHE_BYTES = int(os.environ.get("PROSOLVE_RUN_CACHE_MB", "4096")) * 1024 * 1024
+EVICT_TARGET = 0.9
+
+# resu.med is required, the others are restored when the run produced them
+RESULT_FILES = ("resu.med", "mass_properties.csv", "reactions.csv", "message")
+ENTRY_FILE = "entry.json"
+
+TIMESTAMP_PREFIX = "# Generated at"
+INPUT_LINE = re.compile(r"^F\s+(\S+)\s+(.+?)\s+D\s+(\d+)\s*$", flags=re.MULTILINE)
+VERSION_LINE = re.compile(r"^P\s+version\s+(\S+)", flags=re.MULTILINE)
+HASH_CHUNK = 8 * 1024 * 1024
+
+_lock = threading.Lock()
+# (path, size, mtime_ns) -> sha256: large meshes are hashed once per change
+_file_hashes = {}
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def file_hash(path: str) -> str:
+    st = os.stat(path)
+    memo_key = (os.path.abspath(path), st.st_size, st.st_mtime_ns)
+    digest = _file_hashes.get(memo_key)
+    if digest is None:
+        sha = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                sha.update(chunk)
+        digest = sha.hexdigest()
+        _file_hashes[memo_key] = digest
+    return digest
+
+
+def normalized_comm(comm_path: str) -> bytes:
+    with open(comm_path, "r", encoding="utf-8", errors="ignore") as f:
+        lines = [line.rstrip() for line in f if not line.startswith(TIMESTAMP_PREFIX)]
+    return "\n".join(lines).strip().encode("utf-8")
+
+
+def solver_version(export_content: str, aster_bin: str = None) -> str:
+    """'P version' of the export + the as_run executable (an upgraded install changes its size/mtime)."""
+    match = VERSION_LINE.search(export_content)
+    version = match.group(1) if match else "unknown"
+    if aster_bin and os.path.exists(aster_bin):
+        st = os.stat(aster_bin)
+        return f"{version}|{os.path.abspath(aster_bin)}|{st.st_size}|{int(st.st_mtime)}"
+    return f"{version}|{aster_bin or ''}"
+
+
+def run_key(comm_path: str, export_path: str, aster_bin: str = None):
+    """Cache key of a run, None when an input file is missing (the run then always solves)."""
+    try:
+        with open(export_path, "r", encoding="utf-8", errors="ignore") as f:
+            export_content = f.read()
+        inputs = []
+        for kind, path, unit in INPUT_LINE.findall(export_content):
+            if kind == "comm":
+                continue
+            inputs.append([kind, int(unit), file_hash(path)])
+        payload = {
+            "comm": hashlib.sha256(normalized_comm(comm_path)).hexdigest(),
+            "inputs": sorted(inputs),
+            "solver": solver_version(export_content, aster_bin)
+        }
+    except OSError as e:
+        print(f"[RUN-CACHE] No key for {export_path}: {e}")
+        return None
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def _entry_dir(key: str) -> str:
+    return os.path.join(CACHE_DIR, key)
+
+
+def _copy_atomic(src: str, dst: str):
+    """Copy through a temp name + os.replace: a reader never sees a half-copied resu.med."""
+    tmp_path = dst + ".cachetmp"
+    shutil.copyfile(src, tmp_path)
+    os.replace(tmp_path, dst)
+
+
+def load_run(key: str):
+    """Entry {key, files, created_at, source} of a completed run, None if not cached."""
+    if not key:
+        return None
+    entry_path = os.path.join(_entry_dir(key), ENTRY_FILE)
+    try:
+        with open(entry_path, "r", encoding="utf-8") as f:
+            entry = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not all(os.path.exists(os.path.join(_entry_dir(key), name)) for name in entry.get("files", [])):
+        return None
+    try:
+        os.utime(entry_path, None)  # recently used
+    except OSError:
+        pass
+    return entry
+
+
+def restore_run(key: str, sim_dir: str):
+    """Copy the cached results into sim_dir; returns the entry, None on a miss."""
+    entry = load_run(key)
+    if entry is None:
+        return None
+    try:
+        for name in entry["files"]:
+            _copy_atomic(os.path.join(_entry_dir(key), name), os.path.join(sim_dir, name))
+        # Outputs the cached run did not produce must not survive from another model
+        for name in set(RESULT_FILES) - set(entry["files"]):
+            if os.path.exists(os.path.join(sim_dir, name)):
+                os.remove(os.path.join(sim_dir, name))
+    except OSError as e:
+        print(f"[RUN-CACHE] Restore failed for {key[:12]}: {e}")
+        return None
+    print(f"[RUN-CACHE] Hit {key[:12]}: results restored into {sim_dir}")
+    return entry
+
+
+def store_run(key: str, sim_dir: str):
+    """Keep the outputs of a completed run (called by the scheduler when as_run exits with 0)."""
+    if not key or not os.path.exists(os.path.join(sim_dir, RESULT_FILES[0])):
+        return
+    entry_dir = _entry_dir(key)
+    files = [name for name in RESULT_FILES if os.path.exists(os.path.join(sim_dir, name))]
+    try:
+        os.makedirs(entry_dir, exist_ok=True)
+        for name in files:
+            _copy_atomic(os.path.join(sim_dir, name), os.path.join(entry_dir, name))
+        # Written last: an entry without entry.json is never served
+        entry = {"key": key, "files": files, "created_at": _now(), "source": sim_dir}
+        with open(os.path.join(entry_dir, ENTRY_FILE), "w", encoding="utf-8") as f:
+            json.dump(entry, f, indent=1)
+    except OSError as e:
+        print(f"[RUN-CACHE] Store failed for {key[:12]}: {e}")
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        return
+    print(f"[RUN-CACHE] Stored {key[:12]} ({', '.join(files)})")
+    evict_if_needed()
+
+
+def evict_if_needed(max_bytes: int = None):
+    """Size-bounded eviction of whole entries, least recently used (entry.json mtime) first."""
+    max_bytes = MAX_CACHE_BYTES if max_bytes is None else max_bytes
+    with _lock:
+        if not os.path.isdir(CACHE_DIR):
+            return
+        entries = []
+        total = 0
+        for key in os.listdir(CACHE_DIR):
+            entry_dir = _entry_dir(key)
+            if not os.path.isdir(entry_dir):
+                continue
+            size = 0
+            for name in os.listdir(entry_dir):
+                try:
+                    size += os.path.getsize(os.path.join(entry_dir, name))
+                except OSError:
+                    pass
+            try:
+                used = os.path.getmtime(os.path.join(entry_dir, ENTRY_FILE))
+            except OSError:
+                used = 0  # incomplete entry: evicted first
+            entries.append((used, size, entry_dir))
+            total += size
+
+        if total <= max_bytes:
+            return
+        target = max_bytes * EVICT_TARGET
+        removed = 0
+        for _, size, entry_dir in sorted(entries):
+            if total <= target:
+                break
+            shutil.rmtree(entry_dir, ignore_errors=True)
+            total -= size
+            removed += 1
+        print(f"[RUN-CACHE] Evicted {removed} runs (cache now {total / 1e6:.1f} MB)")
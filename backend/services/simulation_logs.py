@@ -0,0 +1,187 @@
+"""
+Simulation Logs - incremental tail of the Code_Aster output (message / run_<job id>.log)
+The legacy get_logs re-read the whole message file on every poll (hundreds of MB on long runs).
+Here every file is read once, only the appended bytes:
+  - one shared LogScan per file keeps the scanned offset, the run status (exit marker first,
+    then <F>/FATAL lines) and the <A> alarms, updated incrementally from the last complete line
+  - clients only read their own byte range [offset, EOF); new clients start near the end
+    (TAIL_BYTES) and the offsets of polling clients are remembered per client id
+  - stream() yields Server-Sent Events (event id = byte offset, so an EventSource resumes
+    with Last-Event-ID after a reconnect)
+Standard library only: also used by prosolve/main.pyw.
+"""
+import os
+import json
+import time
+import threading
+from collections import OrderedDict, deque
+
+# What a client sees when it attaches (~ the last 100-200 lines)
+TAIL_BYTES = 16 * 1024
+# Largest range returned by one poll / SSE event
+MAX_READ_BYTES = 1024 * 1024
+SCAN_CHUNK_BYTES = 8 * 1024 * 1024
+MAX_CLIENTS = 256
+MAX_KEPT_LINES = 20
+
+SUCCESS_MARKERS = (b"EXECUTION_CODE_ASTER_EXIT_0000=0", b"EXIT_STATUS=0")
+FAILURE_MARKERS = (b"<F>", b"FATAL")
+ALARM_MARKER = b"<A>"
+FINAL_STATES = ("SUCCESS", "FAILED")
+
+
+def _marked_lines(chunk: bytes, marker: bytes) -> list:
+    return [line.decode("utf-8", errors="ignore").strip() for line in chunk.splitlines() if marker in line]
+
+
+class LogScan:
+    """Status / alarms of one log file, scanned incrementally (complete lines only)."""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._reset()
+
+    def _reset(self):
+        self.offset = 0
+        self.status = "RUNNING"
+        self.succeeded = False
+        self.failed = False
+        self.alarms = 0
+        self.alarm_lines = deque(maxlen=MAX_KEPT_LINES)
+        self.error_lines = deque(maxlen=MAX_KEPT_LINES)
+
+    def _scan(self, chunk: bytes):
+        if any(marker in chunk for marker in FAILURE_MARKERS):
+            self.failed = True
+            for marker in FAILURE_MARKERS:
+                self.error_lines.extend(_marked_lines(chunk, marker))
+        if any(marker in chunk for marker in SUCCESS_MARKERS):
+            self.succeeded = True
+        # Same precedence as the legacy get_logs: the exit marker wins over <F>/FATAL text
+        self.status = "SUCCESS" if self.succeeded else "FAILED" if self.failed else "RUNNING"
+        count = chunk.count(ALARM_MARKER)
+        if count:
+            self.alarms += count
+            self.alarm_lines.extend(_marked_lines(chunk, ALARM_MARKER))
+
+    def update(self) -> dict:
+        with self._lock:
+            try:
+                size = os.path.getsize(self.path)
+            except OSError:
+                return self.summary(exists=False)
+            if size < self.offset:
+                self._reset()  # file rewritten by a new run
+            if size > self.offset:
+                with open(self.path, "rb") as f:
+                    f.seek(self.offset)
+                    while self.offset < size:
+                        chunk = f.read(min(SCAN_CHUNK_BYTES, size - self.offset))
+                        end = chunk.rfind(b"\n") + 1
+                        if not end:
+                            if len(chunk) < SCAN_CHUNK_BYTES:
+                                break  # partial last line: scanned when it is complete
+                            end = len(chunk)
+                        self._scan(chunk[:end])
+                        self.offset += end
+                        f.seek(self.offset)
+            return self.summary(exists=True)
+
+    def summary(self, exists: bool = True) -> dict:
+        return {
+            "exists": exists,
+            "status": self.status,
+            "alarms": self.alarms,
+            "alarm_lines": list(self.alarm_lines),
+            "error_lines": list(self.error_lines),
+            "size": self.offset
+        }
+
+
+def read_range(path: str, offset: int = None, max_bytes: int = MAX_READ_BYTES):
+    """(text, next_offset) of the complete lines appended since 'offset' (None = start near the end)."""
+    try:
+        size = os.path.getsize(path)
+    except OSError:
+        return "", offset or 0
+    if offset is not None and offset > size:
+        offset = 0  # file rewritten: start over
+    with open(path, "rb") as f:
+        if offset is None:
+            offset = max(0, size - TAIL_BYTES)
+            if offset:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    offset += len(f.readline())  # skip the cut line
+        f.seek(offset)
+        data = f.read(min(max_bytes, size - offset))
+    end = data.rfind(b"\n") + 1
+    if not end and len(data) < max_bytes:
+        return "", offset
+    if end:
+        data = data[:end]
+    return data.decode("utf-8", errors="ignore"), offset + len(data)
+
+
+class LogTail:
+    """Shared scans + remembered client offsets."""
+
+    def __init__(self):
+        self._scans = {}
+        self._clients = OrderedDict()
+        self._lock = threading.Lock()
+
+    def scan(self, path: str) -> LogScan:
+        path = os.path.abspath(path)
+        with self._lock:
+            if path not in self._scans:
+                self._scans[path] = LogScan(path)
+            return self._scans[path]
+
+    def poll(self, path: str, client_id: str = None, offset: int = None) -> dict:
+        """New lines for a client + the file summary. Without 'offset' the client's last one is used."""
+        key = (client_id, os.path.abspath(path))
+        if offset is None and client_id:
+            with self._lock:
+                offset = self._clients.get(key)
+        summary = self.scan(path).update()
+        text, offset = read_range(path, offset)
+        if client_id:
+            with self._lock:
+                self._clients[key] = offset
+                self._clients.move_to_end(key)
+                while len(self._clients) > MAX_CLIENTS:
+                    self._clients.popitem(last=False)
+        return {**summary, "lines": text, "offset": offset}
+
+    def stream(self, path: str, offset: int = None, is_done=None, interval: float = 1.0, heartbeat: float = 15.0):
+        """
+        SSE generator: 'log' events ({lines, status, alarms}) as the file grows, 'end' once
+        everything was sent and is_done() is true (default: the status is final).
+        """
+        last_sent = time.monotonic()
+        while True:
+            # Checked before reading: whatever the run wrote before it ended is still sent
+            done = is_done() if is_done is not None else False
+            summary = self.scan(path).update()
+            text, offset = read_range(path, offset)
+            if text:
+                payload = {"lines": text, "status": summary["status"], "alarms": summary["alarms"]}
+                yield f"id: {offset}\nevent: log\ndata: {json.dumps(payload)}\n\n"
+                last_sent = time.monotonic()
+                continue  # drain a large backlog before sleeping
+            if done or (is_done is None and summary["status"] in FINAL_STATES):
+                yield f"id: {offset}\nevent: end\ndata: {json.dumps({**summary, 'offset': offset})}\n\n"
+                return
+            if time.monotonic() - last_sent > heartbeat:
+                yield ": keep-alive\n\n"
+                last_sent = time.monotonic()
+            time.sleep(interval)
+
+
+_tail = LogTail()
+
+
+def get_log_tail() -> LogTail:
+    return _tail
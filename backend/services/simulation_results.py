@@ -0,0 +1,117 @@
+"""
+Simulation Results - parsers of the Code_Aster IMPR_TABLE outputs in simulation_files
+  mass_properties.csv  POST_ELEM MASS_INER (unit 26)
+  reactions.csv        POST_RELEVE_T RESULTANTE/MOMENT per load case (unit 27)
+Used by /api/verification and the parametric sweep table.
+"""
+import os
+
+MASS_FILE = "mass_properties.csv"
+REACTIONS_FILE = "reactions.csv"
+
+
+def read_mass_properties(sim_dir: str):
+    """{mass, cdg_x, cdg_y, cdg_z, ix_g, iy_g, iz_g} of the whole model, None if not available."""
+    mass_file = os.path.join(sim_dir, MASS_FILE)
+    if not os.path.exists(mass_file):
+        return None
+    try:
+        # Code_Aster CSV format is specific: Skip header comments (#)
+        # find the header line starting with LIEU,ENTITE,MASSE...
+        with open(mass_file, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        header_idx = -1
+        for i, line in enumerate(lines):
+            if line.strip().startswith("LIEU"):
+                header_idx = i
+                break
+
+        if header_idx != -1 and header_idx + 1 < len(lines):
+            # Data is usually on the next line
+            data_line = lines[header_idx + 1]
+            parts = [p.strip() for p in data_line.split(',')]
+            # Filter out empty strings result of trailing commas
+            vals = [x for x in parts if x]
+
+            if len(vals) >= 15: # Ensure we have enough columns
+                # Mapping based on standard Code_Aster header
+                # LIEU, ENTITE, MASSE, CDG_X, CDG_Y, CDG_Z, IX_G, IY_G, IZ_G...
+                return {
+                    "mass": float(vals[2]),
+                    "cdg_x": float(vals[3]),
+                    "cdg_y": float(vals[4]),
+                    "cdg_z": float(vals[5]),
+                    "ix_g": float(vals[6]),
+                    "iy_g": float(vals[7]),
+                    "iz_g": float(vals[8])
+                }
+    except Exception as e:
+        print(f"Error parsing mass CSV: {e}")
+    return None
+
+
+def read_reactions(sim_dir: str) -> list:
+    """[{case_name, fx, fy, fz, mx, my, mz}] resultant support reactions per load case."""
+    reac_file = os.path.join(sim_dir, REACTIONS_FILE)
+    reactions_data = []
+    if not os.path.exists(reac_file):
+        return reactions_data
+    try:
+        with open(reac_file, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+
+        # REAC_NODA format often has multiple tables in one file or multiple files
+        # Simplified parser: look for data lines after headers
+        # We expect headers like: NOEUD, DX, DY, DZ, DRX, DRY, DRZ...
+        # BUT IMPR_TABLE output for RESULTANTE is simpler: Parameter names and values
+
+        # Strategy: Detect case name from TITRE comments or Intitule column
+        current_case = "Unknown"
+        for line in lines:
+            line = line.strip()
+
+            # Code_Aster IMPR_TABLE with TITRE prints usually # TITRE : REACTIONS_Case 1
+            # But can appear as ##REACTIONS_Case 1 in some versions
+            if "REACTIONS_" in line and line.startswith('#'):
+                # Extract everything after REACTIONS_ until a space or end of string
+                parts = line.split("REACTIONS_")
+                if len(parts) > 1:
+                    # Take the first word and clean it
+                    current_case = parts[1].split()[0].split(',')[0].strip()
+                    continue
+
+            if not line or line.startswith('#') or "DX" in line or "NOEUD" in line: # Skip header/comments
+                continue
+
+            parts = [p.strip() for p in line.split(',')]
+            vals = [v for v in parts if v]
+
+            # Heuristic: line with numbers corresponding to forces
+            if len(vals) >= 6:
+                try:
+                    # Fallback: If case is unknown, look at the first column (Intitule)
+                    # which often contains 'Reac_Case_1'
+                    row_case = current_case
+                    if row_case == "Unknown" and len(vals) > 6:
+                        first_col = vals[0]
+                        if "Reac_" in first_col:
+                            row_case = first_col.split("Reac_")[-1].strip()
+
+                    # Try to parse at least 6 floats from the end
+                    floats = [float(v) for v in vals[-6:]]
+                    reactions_data.append({
+                        "case_name": row_case,
+                        "fx": floats[0],
+                        "fy": floats[1],
+                        "fz": floats[2],
+                        "mx": floats[3],
+                        "my": floats[4],
+                        "mz": floats[5]
+                    })
+                except:
+                    continue
+
+    except Exception as e:
+        print(f"Error parsing reaction CSV: {e}")
+    return reactions_data
@@ -0,0 +1,368 @@
+"""
+Simulation Scheduler - local queue of Code_Aster runs
+Replaces the fire-and-forget console launches of /run_simulation:
+  - persistent job table (JSON, atomic writes): queued runs survive a restart, runs that were
+    in progress when the backend stopped are marked 'interrupted'
+  - at most MAX_RUNS concurrent runs, within a core budget (export 'P ncpus' x 'P mpi_nbcpu')
+    and a memory budget (export 'P memory_limit' x 'P mpi_nbcpu'); a run larger than the
+    budgets still starts when nothing else is running
+  - one dispatcher thread starts queued runs, polls the running ones and records
+    start/end times and exit codes; as_run output goes to simulation_files/run_<job id>.log
+  - jobs may depend on other jobs (depends_on): they wait for them to finish and are cancelled
+    when one of them fails (sharded runs + their MED merge, see submit_command)
+  - jobs submitted with a cache_key store their outputs in the run cache when they finish
+    (simulation_cache); a cache hit is recorded as an already finished job (record_cached)
+Limits: env PROSOLVE_SIM_MAX_RUNS / PROSOLVE_SIM_CORES / PROSOLVE_SIM_MEMORY_MB (0 = no limit).
+"""
+import os
+import re
+import sys
+import json
+import uuid
+import signal
+import tempfile
+import threading
+import subprocess
+from datetime import datetime
+
+from services.simulation_cache import store_run
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+JOBS_FILE = os.environ.get("PROSOLVE_SIM_JOBS", os.path.join(BACKEND_DIR, ".cache", "simulations", "jobs.json"))
+
+MAX_RUNS = int(os.environ.get("PROSOLVE_SIM_MAX_RUNS", "2"))
+MAX_CORES = int(os.environ.get("PROSOLVE_SIM_CORES", str(os.cpu_count() or 1)))
+MAX_MEMORY_MB = int(os.environ.get("PROSOLVE_SIM_MEMORY_MB", "0"))
+# Finished jobs kept in the table (oldest dropped first)
+MAX_FINISHED_JOBS = 200
+POLL_INTERVAL = 1.0
+
+ACTIVE_STATES = ("queued", "running", "cancelling")
+# Per-job log file (cwd/<prefix>_<job id>.log): jobs of one project never share a log
+LOG_PREFIX = "run"
+
+
+def _now():
+    return datetime.now().isoformat(timespec="seconds")
+
+
+def _new_job_id():
+    return uuid.uuid4().hex[:12]
+
+
+def _log_path(cwd: str, job_id: str, prefix: str = LOG_PREFIX) -> str:
+    return os.path.join(cwd, f"{prefix}_{job_id}.log")
+
+
+def atomic_write(path: str, data: bytes):
+    """Write through a temp file + os.replace so concurrent readers never see partial files."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def export_resources(export_path: str) -> dict:
+    """{ncpus, mpi_nbcpu, memory_limit} from the 'P key value' lines of an .export file."""
+    resources = {"ncpus": 1, "mpi_nbcpu": 1, "memory_limit": 0}
+    try:
+        with open(export_path, "r", encoding="utf-8", errors="ignore") as f:
+            content = f.read()
+    except OSError:
+        return resources
+    for key in resources:
+        match = re.search(rf"^P {key}\s+(\S+)", content, flags=re.MULTILINE)
+        if match:
+            try:
+                resources[key] = max(0, int(float(match.group(1))))
+            except ValueError:
+                pass
+    resources["ncpus"] = max(1, resources["ncpus"])
+    resources["mpi_nbcpu"] = max(1, resources["mpi_nbcpu"])
+    return resources
+
+
+def _kill_tree(process: subprocess.Popen):
+    """as_run starts the solver as a child process: stop the whole tree."""
+    if process.poll() is not None:
+        return
+    if sys.platform == "win32":
+        subprocess.call(["taskkill", "/F", "/T", "/PID", str(process.pid)],
+                        stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    else:
+        try:
+            os.killpg(process.pid, signal.SIGKILL)
+        except OSError:
+            process.kill()
+
+
+class SimulationScheduler:
+    """Job table + dispatcher thread. Jobs are plain dicts (JSON-ready, returned by the API)."""
+
+    def __init__(self, jobs_file: str = JOBS_FILE, max_runs: int = MAX_RUNS,
+                 max_cores: int = MAX_CORES, max_memory_mb: int = MAX_MEMORY_MB):
+        self.jobs_file = jobs_file
+        self.max_runs = max(1, max_runs)
+        self.max_cores = max_cores
+        self.max_memory_mb = max_memory_mb
+        self._jobs = {}
+        self._processes = {}
+        self._logs = {}
+        self._cond = threading.Condition()
+        self._load()
+        self._thread = threading.Thread(target=self._dispatch_loop, name="simulation-scheduler", daemon=True)
+        self._thread.start()
+
+    # --- Job table ---
+    def _load(self):
+        if not os.path.exists(self.jobs_file):
+            return
+        try:
+            with open(self.jobs_file, "r", encoding="utf-8") as f:
+                jobs = json.load(f)
+        except Exception as e:
+            print(f"[SIM-SCHEDULER] Job table unreadable, starting empty: {e}")
+            return
+        for job in jobs:
+            if job.get("status") in ("running", "cancelling"):
+                # The process belonged to a previous backend session: its outcome is unknown
+                job.update(status="interrupted", ended_at=_now(), pid=None)
+            self._jobs[job["id"]] = job
+        print(f"[SIM-SCHEDULER] Loaded {len(self._jobs)} jobs from {self.jobs_file}")
+
+    def _save(self):
+        """Caller holds self._cond."""
+        # Insertion order = submission order
+        finished = [j for j in self._jobs.values() if j["status"] not in ACTIVE_STATES]
+        for job in finished[:max(0, len(finished) - MAX_FINISHED_JOBS)]:
+            del self._jobs[job["id"]]
+        try:
+            atomic_write(self.jobs_file, json.dumps(list(self._jobs.values()), indent=1).encode("utf-8"))
+        except Exception as e:
+            print(f"[SIM-SCHEDULER] Job table write failed: {e}")
+
+    # --- API ---
+    def _queue(self, job: dict, **state) -> dict:
+        job.update({
+            "id": job.get("id") or _new_job_id(),
+            "status": "queued",
+            "created_at": _now(),
+            "started_at": None,
+            "ended_at": None,
+            "exit_code": None,
+            "pid": None,
+            "message": None,
+            **state
+        })
+        with self._cond:
+            self._jobs[job["id"]] = job
+            self._save()
+            self._cond.notify()
+        print(f"[SIM-SCHEDULER] {job['status'].capitalize()} {job['id']} ({job['cores']} cores, {job['memory_mb']} MB): "
+              f"{job['export_path'] or job['command']}")
+        return dict(job)
+
+    def _solver_job(self, folder_path: str, export_path: str, aster_bin: str, depends_on: list = None,
+                    cache_key: str = None) -> dict:
+        resources = export_resources(export_path)
+        job_id = _new_job_id()
+        return {
+            "id": job_id,
+            "folder_path": folder_path,
+            "export_path": export_path,
+            "command": [aster_bin, export_path],
+            "cwd": os.path.dirname(export_path),
+            "depends_on": list(depends_on or []),
+            "cache_key": cache_key,
+            "cores": resources["ncpus"] * resources["mpi_nbcpu"],
+            "memory_mb": resources["memory_limit"] * resources["mpi_nbcpu"],
+            "log_path": _log_path(os.path.dirname(export_path), job_id)
+        }
+
+    def submit(self, folder_path: str, export_path: str, aster_bin: str, depends_on: list = None,
+               cache_key: str = None) -> dict:
+        return self._queue(self._solver_job(folder_path, export_path, aster_bin, depends_on, cache_key))
+
+    def record_cached(self, folder_path: str, export_path: str, aster_bin: str, cache_key: str) -> dict:
+        """Finished job for a run served from the run cache (nothing is launched)."""
+        job = self._solver_job(folder_path, export_path, aster_bin, cache_key=cache_key)
+        message = f"Results reused from the run cache ({cache_key[:12]}): model unchanged since a completed run"
+        try:
+            with open(job["log_path"], "w", encoding="utf-8") as f:
+                f.write(f"[RUN-CACHE] {message}\n")
+        except OSError:
+            pass
+        now = _now()
+        return self._queue(job, status="finished", started_at=now, ended_at=now, exit_code=0, message=message)
+
+    def submit_command(self, folder_path: str, command, cwd: str, log_prefix: str = LOG_PREFIX,
+                       depends_on: list = None, cache_key: str = None) -> dict:
+        """Non-solver step (e.g. the MED merge of sharded runs): one core, started when depends_on finished."""
+        job_id = _new_job_id()
+        return self._queue({
+            "id": job_id,
+            "folder_path": folder_path,
+            "export_path": None,
+            "command": command,
+            "cwd": cwd,
+            "depends_on": list(depends_on or []),
+            "cache_key": cache_key,
+            "cores": 1,
+            "memory_mb": 0,
+            "log_path": _log_path(cwd, job_id, log_prefix)
+        })
+
+    def list_jobs(self, folder_path: str = None) -> list:
+        with self._cond:
+            jobs = [dict(j) for j in self._jobs.values()
+                    if folder_path is None or j["folder_path"] == folder_path]
+        return jobs[::-1]
+
+    def get_job(self, job_id: str):
+        with self._cond:
+            job = self._jobs.get(job_id)
+            return dict(job) if job else None
+
+    def cancel(self, job_id: str):
+        """Cancelled job dict, None if unknown; finished jobs are returned unchanged."""
+        with self._cond:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            if job["status"] == "queued":
+                job.update(status="cancelled", ended_at=_now())
+            elif job["status"] == "running":
+                process = self._processes.get(job_id)
+                if process is not None:
+                    _kill_tree(process)
+                # The dispatcher records the exit code when it reaps the process
+                job["status"] = "cancelling"
+            else:
+                return dict(job)
+            self._save()
+            self._cond.notify()
+        print(f"[SIM-SCHEDULER] Cancel requested for {job_id}")
+        return self.get_job(job_id)
+
+    def usage(self) -> dict:
+        with self._cond:
+            running = [j for j in self._jobs.values() if j["status"] in ("running", "cancelling")]
+            return {
+                "running": len(running),
+                "queued": sum(1 for j in self._jobs.values() if j["status"] == "queued"),
+                "cores": sum(j["cores"] for j in running),
+                "memory_mb": sum(j["memory_mb"] for j in running),
+                "limits": {"runs": self.max_runs, "cores": self.max_cores, "memory_mb": self.max_memory_mb}
+            }
+
+    # --- Dispatcher ---
+    def _fits(self, job: dict, running: list) -> bool:
+        if not running:
+            return True  # never block forever on a run larger than the budgets
+        if len(running) >= self.max_runs:
+            return False
+        if self.max_cores and sum(j["cores"] for j in running) + job["cores"] > self.max_cores:
+            return False
+        if self.max_memory_mb and sum(j["memory_mb"] for j in running) + job["memory_mb"] > self.max_memory_mb:
+            return False
+        return True
+
+    def _start(self, job: dict):
+        """Caller holds self._cond."""
+        try:
+            log = open(job["log_path"], "w", encoding="utf-8", errors="ignore")
+            process = subprocess.Popen(
+                job["command"],
+                cwd=job.get("cwd") or os.path.dirname(job["export_path"]),
+                shell=isinstance(job["command"], str),
+                stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL,
+                creationflags=getattr(subprocess, "CREATE_NO_WINDOW", 0),
+                start_new_session=sys.platform != "win32"
+            )
+        except Exception as e:
+            job.update(status="failed", ended_at=_now(), message=f"Launch failed: {e}")
+            print(f"[SIM-SCHEDULER] Launch failed for {job['id']}: {e}")
+            return
+        self._processes[job["id"]] = process
+        self._logs[job["id"]] = log
+        job.update(status="running", started_at=_now(), pid=process.pid)
+        print(f"[SIM-SCHEDULER] Started {job['id']} (pid {process.pid})")
+
+    def _reap(self, job: dict, exit_code: int):
+        """Caller holds self._cond."""
+        self._processes.pop(job["id"])
+        self._logs.pop(job["id"]).close()
+        if job["status"] == "cancelling":
+            status = "cancelled"
+        else:
+            status = "finished" if exit_code == 0 else "failed"
+        job.update(status=status, ended_at=_now(), exit_code=exit_code, pid=None)
+        print(f"[SIM-SCHEDULER] {job['id']} {status} (exit code {exit_code})")
+        return status == "finished" and job.get("cache_key")
+
+    def _blocked(self, job: dict) -> bool:
+        """Caller holds self._cond. True while a dependency is active; cancels the job if one did not finish."""
+        waiting = False
+        for dep_id in job.get("depends_on") or []:
+            dep = self._jobs.get(dep_id)
+            status = dep["status"] if dep else "unknown"
+            if status in ACTIVE_STATES:
+                waiting = True
+            elif status != "finished":
+                job.update(status="cancelled", ended_at=_now(), message=f"Dependency {dep_id} {status}")
+                print(f"[SIM-SCHEDULER] {job['id']} cancelled: dependency {dep_id} {status}")
+                return True
+        return waiting
+
+    def _dispatch_loop(self):
+        while True:
+            completed = []
+            with self._cond:
+                changed = False
+                for job_id, process in list(self._processes.items()):
+                    exit_code = process.poll()
+                    if exit_code is not None:
+                        if self._reap(self._jobs[job_id], exit_code):
+                            completed.append(dict(self._jobs[job_id]))
+                        changed = True
+
+                running = [j for j in self._jobs.values() if j["status"] in ("running", "cancelling")]
+                queued = [j for j in self._jobs.values() if j["status"] == "queued"]
+                for job in queued:
+                    if self._blocked(job):
+                        changed = changed or job["status"] != "queued"
+                        continue  # waiting jobs do not hold the queue
+                    if not self._fits(job, running):
+                        break  # FIFO: a large run is not overtaken by smaller ones
+                    self._start(job)
+                    changed = True
+                    if job["status"] == "running":
+                        running.append(job)
+
+                if changed:
+                    self._save()
+                if not completed:
+                    self._cond.wait(POLL_INTERVAL)
+
+            # Outside the lock: copying a large resu.med must not stall the API
+            for job in completed:
+                store_run(job["cache_key"], job["cwd"])
+
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+def get_simulation_scheduler(**limits) -> SimulationScheduler:
+    """Process-wide scheduler, created on first use (limits only apply to that first call)."""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = SimulationScheduler(**{k: v for k, v in limits.items() if v is not None})
+        return _scheduler
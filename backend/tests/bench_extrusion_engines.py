@@ -0,0 +1,97 @@
+import json
+import os
+import sys
+import time
+
+# Benchmark: vtk_extruder (welded / legacy vtk shell modes) vs med_extruder (native MEDCoupling skin)
+# on the shell groups of testcases/shell and testcases/hibrido.
+# - In-memory modes run on the mesh dumps (*.json) stored with each test case.
+# - Full engines (subprocess + extrusion) run only when the case has .med files and the MED env exists.
+
+REPEAT = 5
+DEFAULT_THICKNESS = 10.0
+CASES = ["shell", "hibrido"]
+
+
+def best_of(fn, repeat=REPEAT):
+    best, result = None, None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        dt = time.perf_counter() - t0
+        best = dt if best is None else min(best, dt)
+    return best, result
+
+
+def load_shell_dumps(case_dir):
+    dumps = []
+    for name in sorted(os.listdir(case_dir)):
+        if not name.endswith(".json") or "extrusion" in name or name == "project.json":
+            continue
+        with open(os.path.join(case_dir, name), "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("status") == "success" and data.get("vtk_type") in (5, 9):
+            dumps.append((name, data))
+    return dumps
+
+
+def load_geometries(case_dir):
+    project_json = os.path.join(case_dir, "project.json")
+    if not os.path.exists(project_json):
+        return []
+    with open(project_json, "r", encoding="utf-8") as f:
+        return json.load(f).get("geometries", [])
+
+
+def bench_case(case):
+    from services.med.vtk_extruder import (
+        MED_ENV_DIR, extrude_shell_memory, med_to_vtk_pipeline, med_extruder_pipeline
+    )
+
+    case_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "..", "testcases", case))
+    print(f"--- {case} ({case_dir}) ---")
+
+    # 1. In-memory shell extrusion on the stored mesh dumps
+    params = {"thickness": DEFAULT_THICKNESS, "offset": 0.0}
+    for name, data in load_shell_dumps(case_dir):
+        shell_input = {"points": data["points"], "connectivity": data["connectivity"], "vtk_type": data["vtk_type"]}
+        for mode in ("welded", "vtk"):
+            dt, res = best_of(lambda: extrude_shell_memory(shell_input, params, mode=mode))
+            print(f"   {name:<20} shell_mode={mode:<7} {dt * 1000:8.2f} ms | "
+                  f"points={len(res['points']) // 3:<7} cells={res['count']}")
+
+    # 2. Full engines on the .med files (require the MEDCoupling environment)
+    med_files = [f for f in os.listdir(case_dir) if f.lower().endswith(".med") and "resu" not in f.lower()]
+    if not med_files or not os.path.exists(MED_ENV_DIR):
+        print("   [SKIP] engine comparison: no .med files or MEDCoupling environment missing")
+        return
+
+    geometries = load_geometries(case_dir)
+    for g in geometries:
+        if g.get("_category") == "2D":
+            g.setdefault("section_params", {}).setdefault("thickness", DEFAULT_THICKNESS)
+
+    for med_file in med_files:
+        full_path = os.path.join(case_dir, med_file)
+        engines = {
+            "vtk": lambda: med_to_vtk_pipeline(full_path, geometries=geometries),
+            "med": lambda: med_extruder_pipeline(full_path, geometries=geometries),
+        }
+        for engine, fn in engines.items():
+            dt, res = best_of(fn, repeat=1)
+            if res.get("status") != "success":
+                print(f"   {med_file:<20} engine={engine:<4} [FAIL] {res.get('message')}")
+                continue
+            n_cells = sum(len(c["offsets"]) - 1 for c in res["cells"].values())
+            print(f"   {med_file:<20} engine={engine:<4} {dt * 1000:8.2f} ms | "
+                  f"points={res['num_points']:<7} cells={n_cells}")
+
+
+if __name__ == "__main__":
+    # Add backend to path so we can import services
+    backend_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    if backend_dir not in sys.path:
+        sys.path.append(backend_dir)
+
+    for case in CASES:
+        bench_case(case)
@@ -17,8 +17,13 @@ import ConnectionConfig from './config/ConnectionsConfig'
 import VerificationConfig from './config/VerificationConfig'
 import SummaryConfig from './config/SummaryConfig'
 import CodeAsterPreview from './config/CodeAsterPreview'
+import SimulationConsole from './config/SimulationConsole'
 import { commOrchestrator } from '../lib/codeAster/orchestrator/commOrchestrator'
 import { exportOrchestrator } from '../lib/codeAster/orchestrator/exportOrchestrator'
+import { geometryIntelligence } from '../lib/codeAster/builders/geometryIntelligence'
+
+// Limit of the text kept in the simulation console
+const MAX_LOG_CHARS = 200000
 
 
 interface StructuralWorkspaceProps {
@@ -85,7 +90,11 @@ export default function StructuralWorkspace({
     const [allGroupsData, setAllGroupsData] = useState<any>({}) // Full group metadata
     const [meshFiles, setMeshFiles] = useState<string[]>([])
     const [simulationRunning, setSimulationRunning] = useState(false)
+    const [simStatus, setSimStatus] = useState('IDLE')
+    const [simLogs, setSimLogs] = useState('')
+    const [simAlarms, setSimAlarms] = useState(0)
     const [vtkGeometries, setVtkGeometries] = useState<any[]>([])
+    const [vtkPointSets, setVtkPointSets] = useState<any[]>([])
 
 
     const updateModel = useCallback((modelData: any) => {
@@ -133,6 +142,7 @@ export default function StructuralWorkspace({
 
                     if (json.status === 'success') {
                         console.log("📦 [3D] Geometrias recebidas via stream:", json.data.length);
+                        setVtkPointSets(json.point_sets || []);
                         setVtkGeometries(json.data);
                     } else {
                         console.error('[3D] Falha na geração:', json.message);
@@ -148,6 +158,26 @@ export default function StructuralWorkspace({
     }, [activeTab, projectPath])
 
 
+    // Live solver output in the simulation console (SSE: only the appended lines are sent)
+    const streamSimulationLog = (jobId: string) => {
+        setSimLogs('')
+        setSimStatus('RUNNING')
+        setSimAlarms(0)
+        const source = new EventSource(`/api/simulations/${jobId}/log/stream`)
+        source.addEventListener('log', (e: MessageEvent) => {
+            const data = JSON.parse(e.data)
+            setSimLogs(prev => (prev + data.lines).slice(-MAX_LOG_CHARS))
+            setSimStatus(data.status)
+            setSimAlarms(data.alarms)
+        })
+        source.addEventListener('end', (e: MessageEvent) => {
+            const data = JSON.parse(e.data)
+            setSimStatus(data.status)
+            setSimAlarms(data.alarms)
+            source.close()
+        })
+    }
+
     const handleRunSimulation = async () => {
         if (!projectPath) return
         setSimulationRunning(true)
@@ -162,7 +192,9 @@ export default function StructuralWorkspace({
             const data = await res.json()
 
             if (data.status === 'success') {
-                alert('Simulation Completed!\nCheck "simulation_files/message" for details.')
+                streamSimulationLog(data.job.id)
+                setActiveTab('simulation')
+                alert(data.message + '\nCheck "simulation_files/message" for details.')
             } else {
                 alert('Simulation Failed:\n' + data.message)
             }
@@ -174,13 +206,41 @@ export default function StructuralWorkspace({
         }
     }
 
+    // Beams saved with closed-form section properties: wait for the FEM values before generating the .comm
+    const resolvePendingSections = async (config: any) => {
+        const geometries = config.geometries || []
+        if (!geometries.some((g: any) => geometryIntelligence.isFemPending(g))) return config
+
+        const resolved = await Promise.all(geometries.map(async (g: any) => {
+            if (!geometryIntelligence.isFemPending(g)) return g
+            const res = await fetch('/api/calculate_section', {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: JSON.stringify({ type: g.profile_type, params: g.section_params })
+            })
+            const data = await res.json()
+            if (data.status !== 'success') throw new Error(data.message)
+            return { ...g, section_properties: data.properties, section_mesh: data.viz_mesh || data.mesh }
+        }))
+
+        updateGeometries(resolved)
+        return {
+            ...config,
+            geometries: resolved,
+            geometry_commands: geometryIntelligence.generateGeometryCommands(
+                resolved.filter((g: any) => geometryIntelligence.isReadyForCommands(g))
+            )
+        }
+    }
+
     const handleSaveProject = async () => {
         if (!projectPath) return
         try {
             console.log("Saving project...")
+            const config = await resolvePendingSections(projectConfig)
 
             // Orchestrate .comm content for direct execution
-            const orchestration = commOrchestrator.orchestrateComm(projectConfig)
+            const orchestration = commOrchestrator.orchestrateComm(config)
             const commContent = orchestration.fullCommFile
 
             // Orchestrate .export content
@@ -206,7 +266,7 @@ export default function StructuralWorkspace({
                     comm_content: commContent,
                     export_content: exportContent, // NEW: Deliver .export content
                     config: {
-                        ...projectConfig,
+                        ...config,
                         meshes: meshFiles.map(f => ({
                             name: f.split('.')[0].replace(/[- ]/g, '_'),
                             filename: f
@@ -680,6 +740,7 @@ export default function StructuralWorkspace({
                                     projectPath={projectPath}
                                     meshKey={Date.now()}
                                     geometries={vtkGeometries}
+                                    pointSets={vtkPointSets}
                                 />
                             )}
                             {activeTab === 'analysis' && (
@@ -719,7 +780,12 @@ export default function StructuralWorkspace({
                                 />
                             )}
                             {activeTab === 'simulation' && (
-                                <CodeAsterPreview projectConfig={projectConfig} />
+                                <div className="h-full flex flex-col">
+                                    <div className="flex-1 min-h-0">
+                                        <CodeAsterPreview projectConfig={projectConfig} />
+                                    </div>
+                                    <SimulationConsole status={simStatus} logs={simLogs} alarms={simAlarms} />
+                                </div>
                             )}
                         </div>
                     </>
@@ -26,13 +26,22 @@ interface GeometryConfigProps {
 }
 
 const PROFILE_TYPES = {
-    'RECTANGLE': { label: 'Solid Rectangle', default: { hy: 100, hz: 50, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0 } },
-    'BOX': { label: 'Rectangular Tube', default: { hy: 100, hz: 50, t: 5, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0 } },
-    'CIRCLE': { label: 'Solid Circle', default: { r: 50, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0 } },
-    'TUBE': { label: 'Circular Tube', default: { r: 50, t: 5, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0 } },
-    'I_SECTION': { label: 'I-Section', default: { h: 200, tw: 6.3, bf_top: 100, tf_top: 8, bf_bot: 100, tf_bot: 8, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0 } }
+    'RECTANGLE': { label: 'Solid Rectangle', default: { hy: 100, hz: 50, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } },
+    'BOX': { label: 'Rectangular Tube', default: { hy: 100, hz: 50, t: 5, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } },
+    'CIRCLE': { label: 'Solid Circle', default: { r: 50, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } },
+    'TUBE': { label: 'Circular Tube', default: { r: 50, t: 5, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } },
+    'I_SECTION': { label: 'I-Section', default: { h: 200, tw: 6.3, bf_top: 100, tf_top: 8, bf_bot: 100, tf_bot: 8, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } },
+    'CHANNEL': { label: 'Channel', default: { h: 200, b: 75, tw: 8.5, tf: 11.5, r: 0, slope: 0, offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } },
+    'POLYGON': { label: 'Custom Outline', default: { outer: [[0, 0], [100, 0], [100, 200], [0, 200]], holes: [], offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0, mesh_tol: 0 } }
 }
 
+// Placement parameters kept when a standard profile is picked
+const POSE_DEFAULT = { offset_y: 0, offset_z: 0, rotation: 0, fiber_y: 0, fiber_z: 0 }
+
+// POLYGON outline keys: edited as JSON, not in the parameter grid
+// {outer: [[z, y], ...], holes: [[[z, y], ...]]} or {parts: [{outer, holes, material: {name, E, nu, fy, density}}]}
+const OUTLINE_KEYS = ['outer', 'holes', 'parts']
+
 const SHELL_DEFAULT = { thickness: 10.0, offset: 0.0, vx: 1.0, vy: 0.0, vz: 0.0 }
 
 export default function GeometryConfig({ projectPath, availableGeometries = [], onUpdate, onGeometryCommandsUpdate }: GeometryConfigProps) {
@@ -43,6 +52,9 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
     const [calcLoading, setCalcLoading] = useState(false)
     const [calcError, setCalcError] = useState<string | null>(null)
     const [inspectorTab, setInspectorTab] = useState<'DIM' | 'PROP'>('DIM')
+    const [catalogue, setCatalogue] = useState<any[]>([])
+    const [outlineDraft, setOutlineDraft] = useState('')
+    const [outlineError, setOutlineError] = useState<string | null>(null)
     
     // Code_Aster preview state
     const [showPreview, setShowPreview] = useState(false)
@@ -91,9 +103,9 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                 console.log(`🔸 [SHELL] ${g.group}: ready = ${isReady} (has params: ${!!g.section_params})`)
                 return isReady
             } else if (g._category === '1D') {
-                // Beams: Need section_properties (calculated inertias)
-                const isReady = g.section_properties && Object.keys(g.section_properties).length > 0
-                console.log(`🔸 [BEAM] ${g.group}: ready = ${isReady} (has props: ${!!g.section_properties})`)
+                // Beams: Need section_properties (calculated inertias, FEM values included)
+                const isReady = geometryIntelligence.isReadyForCommands(g)
+                console.log(`🔸 [BEAM] ${g.group}: ready = ${isReady} (has props: ${!!g.section_properties}, fem pending: ${geometryIntelligence.isFemPending(g)})`)
                 return isReady
             }
             return false
@@ -178,6 +190,14 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
         }
     }, [geometries, onUpdate])
 
+    // Standard steel profiles (precomputed properties, no FEM run)
+    useEffect(() => {
+        fetch('/api/section_catalogue')
+            .then(res => res.json())
+            .then(data => { if (data.status === 'success') setCatalogue(data.profiles) })
+            .catch(err => console.warn('⚠️ [CATALOGUE] Profile list unavailable:', err))
+    }, [])
+
     // Sync selection state
     useEffect(() => {
         if (geometries[selectedIdx]) {
@@ -186,6 +206,49 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
         }
     }, [selectedIdx, geometries])
 
+    // Outline editor text of a POLYGON section (reset when the selection / type changes)
+    useEffect(() => {
+        const g = geometries[selectedIdx]
+        if (g?.profile_type === 'POLYGON') {
+            const outline = Object.fromEntries(OUTLINE_KEYS.filter(k => k in (g.section_params || {})).map(k => [k, g.section_params[k]]))
+            setOutlineDraft(JSON.stringify(outline, null, 1))
+            setOutlineError(null)
+        }
+    }, [selectedIdx, geometries[selectedIdx]?.profile_type])
+
+    // Polls the background FEM job started by mode 'fast' and merges J/Iw/shear areas/plastic moduli + mesh
+    const awaitFemResult = async (group: string, type: string, params: any) => {
+        const paramsKey = JSON.stringify(params)
+        try {
+            while (true) {
+                const response = await fetch('/api/section_result', {
+                    method: 'POST',
+                    headers: { 'Content-Type': 'application/json' },
+                    body: JSON.stringify({ type, params })
+                })
+                const data = await response.json()
+                if (data.status === 'pending') {
+                    await new Promise(resolve => setTimeout(resolve, 500))
+                    continue
+                }
+                if (data.status !== 'success') throw new Error(data.message)
+
+                console.log('🧮 [GEOMETRY] FEM section properties completed for:', group)
+                // Only if the section was not edited meanwhile
+                setGeometries(prev => prev.map(g =>
+                    g.group === group && JSON.stringify(g.section_params) === paramsKey ? {
+                        ...g,
+                        section_properties: data.properties,
+                        section_mesh: data.viz_mesh || data.mesh
+                    } : g
+                ))
+                return
+            }
+        } catch (err: any) {
+            setCalcError(`FEM: ${err.message}`)
+        }
+    }
+
     const calculateSection = async () => {
         if (!selected) return
         const isBeam = selected._category === '1D'
@@ -205,7 +268,8 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                 headers: { 'Content-Type': 'application/json' },
                 body: JSON.stringify({
                     type: selected.profile_type,  // Send profile type for calculation
-                    params: selected.section_params
+                    params: selected.section_params,
+                    mode: 'fast'  // Closed-form properties now, FEM values via awaitFemResult
                 })
             })
 
@@ -213,15 +277,17 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
 
             if (data.status === 'success') {
                 console.log('🧮 [GEOMETRY] Section calculation completed for:', selected.group)
-                setSectionImage(data.image)
+                // Drawing is served separately (cacheable GET); base64 only if the backend embedded it
+                const sectionImageSrc = data.image || data.image_url || null
+                setSectionImage(sectionImageSrc)
                 setCalculatedProps(data.properties)
 
                 const updatedGeometries = geometries.map((g, i) =>
                     i === selectedIdx ? {
                         ...g,
                         section_properties: data.properties,
-                        section_mesh: data.mesh,
-                        section_image: data.image
+                        section_mesh: data.viz_mesh || data.mesh,
+                        section_image: sectionImageSrc
                     } : g
                 )
                 
@@ -249,6 +315,10 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                 } else {
                     console.log('❌ [CALLBACK] onUpdate callback is null/undefined')
                 }
+
+                if (data.complete === false) {
+                    awaitFemResult(selected.group, selected.profile_type, selected.section_params)
+                }
             } else {
                 throw new Error(data.message)
             }
@@ -263,7 +333,11 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
         console.log('✏️ [EDIT] Editing parameter:', { idx, key, value, group: geometries[idx]?.group })
         
         const updatedGeometries = geometries.map((g, i) =>
-            i === idx ? { ...g, profile_name: 'Custom', section_params: { ...g.section_params, [key]: value } } : g
+            i === idx ? {
+                ...g,
+                profile_name: key in POSE_DEFAULT ? g.profile_name : 'Custom',  // Placement keeps a standard profile
+                section_params: { ...g.section_params, [key]: value }
+            } : g
         )
         
         console.log('📤 [EDIT] Updated geometries for global state:', updatedGeometries.map(g => ({
@@ -284,6 +358,30 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
         }
     }
 
+    const handleOutlineEdit = (idx: number, text: string) => {
+        let outline: any
+        try {
+            outline = JSON.parse(text)
+        } catch (e: any) {
+            setOutlineError(`Invalid JSON: ${e.message}`)
+            return
+        }
+        if (!outline || typeof outline !== 'object' || (!Array.isArray(outline.outer) && !Array.isArray(outline.parts))) {
+            setOutlineError('Expected {"outer": [[z, y], ...], "holes": [...]} or {"parts": [...]}')
+            return
+        }
+        setOutlineError(null)
+
+        const updatedGeometries = geometries.map((g, i) => {
+            if (i !== idx) return g
+            const scalars = Object.fromEntries(Object.entries(g.section_params || {}).filter(([k]) => !OUTLINE_KEYS.includes(k)))
+            const shape = Object.fromEntries(OUTLINE_KEYS.filter(k => k in outline).map(k => [k, outline[k]]))
+            return { ...g, profile_name: 'Custom', section_params: { ...shape, ...scalars } }
+        })
+        setGeometries(updatedGeometries)
+        if (onUpdate) onUpdate(updatedGeometries)
+    }
+
     const handleSectionTypeChange = (idx: number, profileType: string) => {
         const updatedGeometries = geometries.map((g, i) =>
             i === idx ? { 
@@ -301,6 +399,29 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
         }
     }
 
+    const handleCatalogueSelect = (idx: number, name: string) => {
+        const profile = catalogue.find(p => p.name === name)
+        if (!profile) return
+        const updatedGeometries = geometries.map((g, i) => {
+            if (i !== idx) return g
+            // Keep the placement (rotation/offsets/fibers) of the member, replace the shape
+            const pose = Object.fromEntries(
+                Object.keys(POSE_DEFAULT).map(k => [k, g.section_params?.[k] ?? (POSE_DEFAULT as any)[k]])
+            )
+            return {
+                ...g,
+                profile_type: profile.type,
+                profile_name: profile.name,
+                section_params: { ...profile.params, ...pose }
+            }
+        })
+        setGeometries(updatedGeometries)
+
+        if (onUpdate) {
+            onUpdate(updatedGeometries)
+        }
+    }
+
     if (!projectPath) return <div className="p-10 text-center text-slate-500 font-mono italic">SESSION_HALTED: PROJECT_ID_NULL</div>
 
     if (geometries.length === 0) {
@@ -441,6 +562,52 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                                         </div>
                                     </section>
 
+                                    {/* Standard Profile Catalogue */}
+                                    {isBeam && catalogue.length > 0 && (
+                                        <section>
+                                            <div className="flex items-center gap-2 mb-3">
+                                                <Layers className="w-3.5 h-3.5 text-orange-500" />
+                                                <h4 className="text-[10px] font-black text-slate-400 uppercase tracking-widest">Standard_Profile</h4>
+                                            </div>
+                                            <div className="bg-slate-950/50 border border-slate-800 p-1">
+                                                <select
+                                                    className="w-full bg-transparent text-xs font-bold text-white p-2.5 focus:outline-none border-l-2 border-orange-500 hover:bg-slate-900 transition-all cursor-pointer"
+                                                    value={catalogue.some(p => p.name === selected.profile_name) ? selected.profile_name : ''}
+                                                    onChange={(e) => handleCatalogueSelect(selectedIdx, e.target.value)}
+                                                >
+                                                    <option value="" className="bg-slate-950">Custom dimensions</option>
+                                                    {Array.from(new Set(catalogue.map(p => p.family))).map(family => (
+                                                        <optgroup key={family} label={family} className="bg-slate-950">
+                                                            {catalogue.filter(p => p.family === family).map(p => (
+                                                                <option key={p.name} value={p.name} className="bg-slate-950">{p.name}</option>
+                                                            ))}
+                                                        </optgroup>
+                                                    ))}
+                                                </select>
+                                            </div>
+                                        </section>
+                                    )}
+
+                                    {/* Custom Outline (POLYGON) */}
+                                    {isBeam && selected.profile_type === 'POLYGON' && (
+                                        <section>
+                                            <div className="flex items-center gap-2 mb-3">
+                                                <Layers className="w-3.5 h-3.5 text-orange-500" />
+                                                <h4 className="text-[10px] font-black text-slate-400 uppercase tracking-widest">Outline_Geometry</h4>
+                                            </div>
+                                            <textarea
+                                                className={`w-full h-40 bg-slate-950/50 border ${outlineError ? 'border-red-500/60' : 'border-slate-800'} p-2.5 text-[10px] font-mono text-slate-100 focus:outline-none resize-y`}
+                                                value={outlineDraft}
+                                                spellCheck={false}
+                                                onChange={(e) => setOutlineDraft(e.target.value)}
+                                                onBlur={() => handleOutlineEdit(selectedIdx, outlineDraft)}
+                                            />
+                                            <p className={`text-[9px] font-mono mt-1 ${outlineError ? 'text-red-400' : 'text-slate-600'}`}>
+                                                {outlineError || '[Z, Y] points in MM. Parts with "material": {"name", "E", "nu", "fy", "density"} form a composite section.'}
+                                            </p>
+                                        </section>
+                                    )}
+
                                     {/* Parameters Grid */}
                                     <section>
                                         <div className="flex items-center gap-2 mb-4">
@@ -449,7 +616,7 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                                         </div>
 
                                         <div className="grid grid-cols-2 gap-3">
-                                            {Object.entries(selected.section_params || {}).map(([k, v]: [string, any]) => {
+                                            {Object.entries(selected.section_params || {}).filter(([k]) => !OUTLINE_KEYS.includes(k)).map(([k, v]: [string, any]) => {
                                                 const isOffset = k.includes('offset') || k === 'rotation'
                                                 const isFiber = k.includes('fiber')
 
@@ -462,7 +629,9 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                                                     'h': 'Height', 'tw': 'Web_T', 'bf_top': 'TF_Width', 'tf_top': 'TF_Thick',
                                                     'bf_bot': 'BF_Width', 'tf_bot': 'BF_Thick', 'rotation': 'Rotation_Θ',
                                                     'offset_y': 'Shift_Y', 'offset_z': 'Shift_Z', 'fiber_y': 'Fiber_Y', 'fiber_z': 'Fiber_Z',
-                                                    'thickness': 'Thickness_T', 'offset': 'Shift_N', 'vx': 'Dir_X', 'vy': 'Dir_Y', 'vz': 'Dir_Z'
+                                                    'thickness': 'Thickness_T', 'offset': 'Shift_N', 'vx': 'Dir_X', 'vy': 'Dir_Y', 'vz': 'Dir_Z',
+                                                    'b': 'Flange_W', 'tf': 'Flange_T', 'slope': 'Slope_%', 'r_out': 'Corner_R',
+                                                    'mesh_tol': 'Mesh_Tol'
                                                 }
 
                                                 return (
@@ -477,7 +646,7 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                                                                 onChange={(e) => handleParamEdit(selectedIdx, k, e.target.value)}
                                                                 className={`w-full bg-transparent text-base font-black text-white font-mono focus:outline-none ${variant === 'POSITION' ? 'text-cyan-400' : variant === 'FIBER' ? 'text-emerald-400' : 'text-slate-100'}`}
                                                             />
-                                                            <span className="text-[8px] font-bold text-slate-700">{isOffset && k !== 'rotation' ? 'MM' : k === 'rotation' ? 'DEG' : isShell ? 'MM' : 'MM'}</span>
+                                                            <span className="text-[8px] font-bold text-slate-700">{isOffset && k !== 'rotation' ? 'MM' : k === 'rotation' ? 'DEG' : k === 'mesh_tol' ? 'REL' : isShell ? 'MM' : 'MM'}</span>
                                                         </div>
                                                         <div className={`absolute top-0 right-0 p-1 opacity-0 group-hover:opacity-100 transition-opacity`}>
                                                             <div className={`w-1 h-1 rounded-full ${variant === 'POSITION' ? 'bg-cyan-500' : variant === 'FIBER' ? 'bg-emerald-500' : 'bg-slate-700'}`} />
@@ -503,7 +672,11 @@ export default function GeometryConfig({ projectPath, availableGeometries = [],
                                         <Database className="w-5 h-5 text-emerald-400" />
                                         <div>
                                             <h4 className="text-sm font-black text-white uppercase italic">Section_Datasheet</h4>
-                                            <p className="text-[10px] text-slate-600 font-mono">Real-time evaluated mechanical properties</p>
+                                            <p className="text-[10px] text-slate-600 font-mono">
+                                                {selected && geometryIntelligence.isFemPending(selected)
+                                                    ? 'Closed-form values - FEM warping/plastic analysis running...'
+                                                    : 'Real-time evaluated mechanical properties'}
+                                            </p>
                                         </div>
                                     </div>
 
@@ -0,0 +1,57 @@
+import { useEffect, useRef } from 'react'
+import { Terminal } from 'lucide-react'
+
+interface SimulationConsoleProps {
+    status: string
+    logs: string
+    alarms: number
+}
+
+// Live as_run output of the last job (streamed by StructuralWorkspace from /api/simulations/<id>/log/stream)
+export default function SimulationConsole({ status, logs, alarms }: SimulationConsoleProps) {
+    const endRef = useRef<HTMLDivElement>(null)
+
+    useEffect(() => {
+        endRef.current?.scrollIntoView({ block: 'nearest' })
+    }, [logs])
+
+    if (status === 'IDLE' && !logs) return null
+
+    return (
+        <div className="shrink-0 bg-slate-900 border-t border-slate-800 p-4 space-y-3">
+            <div className="flex items-center justify-between">
+                <h3 className="text-xs uppercase font-bold text-slate-400 tracking-widest flex items-center gap-2">
+                    <Terminal className="w-4 h-4" />
+                    <span>Simulation Console</span>
+                    {status === 'RUNNING' && <span className="w-2 h-2 bg-blue-500 rounded-full animate-ping"></span>}
+                </h3>
+                <div className="text-xs font-mono text-slate-500 flex gap-4">
+                    <span>Alarms: <span className={alarms ? 'text-amber-400' : 'text-slate-400'}>{alarms}</span></span>
+                    <span>Status: <span className={
+                        status === 'SUCCESS' ? 'text-green-500' :
+                            status === 'FAILED' ? 'text-red-500' :
+                                'text-blue-400'
+                    }>{status}</span></span>
+                </div>
+            </div>
+
+            <div className="bg-black/80 rounded-lg border border-slate-700 p-4 font-mono text-xs max-h-64 overflow-y-auto space-y-1">
+                {logs ? (
+                    logs.trimEnd().split('\n').map((line, i) => (
+                        <div key={i} className={
+                            line.includes('<F>') || line.includes('ERR') ? 'text-red-400' :
+                                line.includes('<A>') || line.includes('<W>') ? 'text-amber-400' :
+                                    line.includes('<S>') ? 'text-green-400' :
+                                        'text-slate-300'
+                        }>
+                            {line}
+                        </div>
+                    ))
+                ) : (
+                    <div className="text-slate-600 italic">Waiting for Code_Aster output...</div>
+                )}
+                <div ref={endRef} />
+            </div>
+        </div>
+    )
+}
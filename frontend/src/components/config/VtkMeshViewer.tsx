@@ -26,13 +26,38 @@ import vtkActor from '@kitware/vtk.js/Rendering/Core/Actor'
 import vtkMapper from '@kitware/vtk.js/Rendering/Core/Mapper'
 import vtkPolyData from '@kitware/vtk.js/Common/DataModel/PolyData'
 
+// Arrays tipados serializados pelo backend (pack_typed_array): bytes little-endian em base64
+interface PackedTypedArray {
+    dtype: 'float32' | 'uint32'
+    length: number
+    b64: string
+}
+
+const decodeTypedArray = (packed: PackedTypedArray): Float32Array | Uint32Array => {
+    const bytes = Uint8Array.from(atob(packed.b64), c => c.charCodeAt(0))
+    return packed.dtype === 'float32'
+        ? new Float32Array(bytes.buffer, 0, packed.length)
+        : new Uint32Array(bytes.buffer, 0, packed.length)
+}
+
+// LOD: tamanho da seção em pixels na tela que decide o nível exibido por grupo
+// (tier 0 = só o fio base, tier 1 = contorno simplificado, tier 2 = seção completa)
+const LOD_PX_OUTLINE = 3
+const LOD_PX_FULL = 16
+
+// Componentes tier 1 (sufixo _LOD1) seguem o estado de UI do componente 3D completo
+const lodOwnerId = (id: string) => id.replace(/_LOD1$/, '')
+const lodGroupKey = (id: string) => id.replace(/_EXTRUSION(_LOD1)?$/, '')
+
 interface VtkMeshViewerProps {
     projectPath: string | null
     meshKey: number
     geometries: any[]
+    // Pontos de cada arquivo MED (enviados uma vez); componentes referenciam por data.point_set
+    pointSets?: PackedTypedArray[]
 }
 
-const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
+const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries, pointSets = [] }) => {
     const vtkContainerRef = useRef<HTMLDivElement>(null)
 
     // Referências vitais do VTK
@@ -46,6 +71,10 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
     // Mapa para acessar os atores rapidamente sem recriar a cena
     const actorsMap = useRef<Map<string, vtkActor>>(new Map())
 
+    // Grupos com LOD: tamanho da seção e se existe o nível de contorno (tier 1)
+    const lodGroups = useRef<Map<string, { size: number; hasOutline: boolean }>>(new Map())
+    const [lodTiers, setLodTiers] = useState<Record<string, number>>({})
+
     // Estados de UI
     const [isParallel, setIsParallel] = useState(false)
     const [hiddenIds, setHiddenIds] = useState<Set<string>>(new Set())
@@ -98,6 +127,32 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
         setEdgeVisibleIds(newEdges)
     }
 
+    // Escolhe o tier de cada grupo pelo tamanho da seção projetado na tela
+    const updateLodTiers = useCallback(() => {
+        if (!context.current || lodGroups.current.size === 0) return
+        const camera = context.current.renderer.getActiveCamera()
+        const [, heightPx] = context.current.openglRenderWindow.getSize()
+        if (!camera || !heightPx) return
+
+        const worldPerPixel = camera.getParallelProjection()
+            ? (2 * camera.getParallelScale()) / heightPx
+            : (2 * camera.getDistance() * Math.tan((camera.getViewAngle() * Math.PI) / 360)) / heightPx
+        if (!(worldPerPixel > 0)) return
+
+        const next: Record<string, number> = {}
+        lodGroups.current.forEach(({ size, hasOutline }, key) => {
+            const px = size / worldPerPixel
+            if (px < LOD_PX_OUTLINE) next[key] = 0
+            else if (px < LOD_PX_FULL && hasOutline) next[key] = 1
+            else next[key] = 2
+        })
+        setLodTiers(prev => {
+            const changed = Object.keys(next).some(k => prev[k] !== next[k])
+                || Object.keys(prev).length !== Object.keys(next).length
+            return changed ? next : prev
+        })
+    }, [])
+
     // ------------------------------------------------------------------------
     // 1. INICIALIZAÇÃO DO AMBIENTE
     // ------------------------------------------------------------------------
@@ -138,8 +193,20 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
         })
         resizeObserver.observe(vtkContainerRef.current)
 
+        // Reavalia o LOD quando a câmera muda (no máximo uma vez por frame)
+        let lodFrame = 0
+        const cameraSubscription = renderer.getActiveCamera().onModified(() => {
+            if (lodFrame) return
+            lodFrame = requestAnimationFrame(() => {
+                lodFrame = 0
+                updateLodTiers()
+            })
+        })
+
         return () => {
             resizeObserver.disconnect()
+            cameraSubscription.unsubscribe()
+            if (lodFrame) cancelAnimationFrame(lodFrame)
             if (context.current) {
                 context.current.interactor.delete()
                 context.current.openglRenderWindow.delete()
@@ -160,6 +227,7 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
 
         renderer.removeAllActors()
         actorsMap.current.clear()
+        lodGroups.current.clear()
 
         // Configuração Padrão de Edges
         const defaultEdges = new Set<string>()
@@ -172,24 +240,44 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
 
         console.log(`[VTK Viewer] Construindo cena para ${geometries.length} objetos...`)
 
+        // Pontos compartilhados entre componentes do mesmo arquivo: decodifica uma vez por arquivo
+        const decodedPoints = new Map<number, Float32Array>()
+
         geometries.forEach((meshItem) => {
             const { data, id } = meshItem
-            if (!data || !data.points) return
-
-            const pointsArray = new Float32Array(data.points)
-            const cellArray: number[] = []
-            if (data.connectivity) {
-                data.connectivity.forEach((cell: number[]) => {
-                    cellArray.push(cell.length)
-                    cellArray.push(...cell)
-                })
+            if (!data) return
+
+            let pointsArray: Float32Array | undefined
+            if (data.point_set !== undefined && pointSets[data.point_set]) {
+                pointsArray = decodedPoints.get(data.point_set)
+                if (!pointsArray) {
+                    pointsArray = decodeTypedArray(pointSets[data.point_set]) as Float32Array
+                    decodedPoints.set(data.point_set, pointsArray)
+                }
+            } else if (Array.isArray(data.points)) {
+                pointsArray = new Float32Array(data.points)
+            }
+            if (!pointsArray) return
+
+            let cellsTyped: Uint32Array
+            if (data.cells) {
+                // Layout legado do VTK [n, i0, i1, ...] já pronto no backend
+                cellsTyped = decodeTypedArray(data.cells) as Uint32Array
+            } else {
+                const cellArray: number[] = []
+                if (data.connectivity) {
+                    data.connectivity.forEach((cell: number[]) => {
+                        cellArray.push(cell.length)
+                        cellArray.push(...cell)
+                    })
+                }
+                cellsTyped = new Uint32Array(cellArray)
             }
-            const cellsTyped = new Uint32Array(cellArray)
 
             const polyData = vtkPolyData.newInstance()
             polyData.getPoints().setData(pointsArray, 3)
 
-            if (data.vtk_type === 2 || data.vtk_type === 3) {
+            if (data.vtk_type === 2 || data.vtk_type === 3 || data.vtk_type === 21) {
                 polyData.getLines().setData(cellsTyped)
             } else {
                 polyData.getPolys().setData(cellsTyped)
@@ -207,6 +295,13 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
 
             renderer.addActor(actor)
             actorsMap.current.set(id, actor)
+
+            if (data.lod && data.lod.tier > 0) {
+                const key = lodGroupKey(id)
+                const entry = lodGroups.current.get(key) || { size: data.lod.section_size, hasOutline: false }
+                if (data.lod.tier === 1) entry.hasOutline = true
+                lodGroups.current.set(key, entry)
+            }
         })
 
         // Inicializa opacidade 100% para novos itens detectados
@@ -219,9 +314,10 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
         })
 
         renderer.resetCamera()
+        updateLodTiers()
         renderWindow.render()
 
-    }, [geometries])
+    }, [geometries, pointSets, updateLodTiers])
 
     // ------------------------------------------------------------------------
     // 3. ATUALIZAÇÃO VISUAL
@@ -230,9 +326,13 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
         if (!context.current) return
         const { renderWindow } = context.current
 
-        actorsMap.current.forEach((actor, id) => {
-            const meshItem = geometries.find(g => g.id === id)
+        actorsMap.current.forEach((actor, actorId) => {
+            const meshItem = geometries.find(g => g.id === actorId)
             const isBase = meshItem?.data?.is_base
+            const lod = meshItem?.data?.lod
+            const id = lodOwnerId(actorId)
+            const activeTier = lodTiers[lodGroupKey(actorId)] ?? 2
+            const lodVisible = !lod || lod.tier === 0 || lod.tier === activeTier
 
             const prop = actor.getProperty()
             const baseColor = getMeshColor(id, isBase)
@@ -243,7 +343,7 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
             const showEdges = edgeVisibleIds.has(id)
             const userOpacity = opacityMap[id] !== undefined ? opacityMap[id] : 1.0
 
-            actor.setVisibility(!isHidden)
+            actor.setVisibility(!isHidden && lodVisible)
             prop.setEdgeVisibility(showEdges)
             prop.setEdgeColor(0.05, 0.05, 0.05) // Quase preto para o grid
 
@@ -270,7 +370,7 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
         })
 
         renderWindow.render()
-    }, [hiddenIds, selectedId, edgeVisibleIds, opacityMap, geometries])
+    }, [hiddenIds, selectedId, edgeVisibleIds, opacityMap, geometries, lodTiers])
 
     // ------------------------------------------------------------------------
     // CONTROLADORES
@@ -353,7 +453,7 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
                                 Opaque
                             </button>
                             <span className="text-[10px] font-mono font-bold text-orange-500 bg-orange-500/10 px-2 py-0.5 border border-orange-500/20 rounded-full">
-                                {geometries?.length || 0}
+                                {geometries?.filter(g => g.data?.lod?.tier !== 1).length || 0}
                             </span>
                         </div>
                     </div>
@@ -361,7 +461,7 @@ const VtkMeshViewer: React.FC<VtkMeshViewerProps> = ({ geometries }) => {
                     {/* Lista de Objetos */}
                     <div className="p-3 flex flex-col gap-2 overflow-y-auto custom-scrollbar">
                         {geometries && geometries.length > 0 ? (
-                            geometries.map((mesh) => {
+                            geometries.filter(g => g.data?.lod?.tier !== 1).map((mesh) => {
                                 const isBase = mesh.data?.is_base
                                 const color = getMeshColor(mesh.id, isBase)
                                 const isHidden = hiddenIds.has(mesh.id)
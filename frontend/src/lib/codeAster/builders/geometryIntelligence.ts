@@ -66,12 +66,32 @@ export class GeometryIntelligence {
         }
     }
 
+    /**
+     * Beam with instant (closed-form) properties whose FEM values (J, Iw, shear areas) are still computing
+     */
+    isFemPending(g: Geometry): boolean {
+        return g._category === '1D' && !!g.section_properties && g.section_properties["Torsion J"] == null
+    }
+
+    /**
+     * Geometry has everything needed for AFFE_CARA_ELEM (shell params / complete beam properties)
+     */
+    isReadyForCommands(g: Geometry): boolean {
+        if (g._category === '2D') {
+            return !!g.section_params && Object.keys(g.section_params).length > 0
+        }
+        if (g._category === '1D') {
+            return !!g.section_properties && Object.keys(g.section_properties).length > 0 && !this.isFemPending(g)
+        }
+        return false
+    }
+
     /**
      * Check if section calculation is complete for all beam geometries
      */
     isSectionCalculationComplete(geometries: Geometry[]): boolean {
         return geometries.every(g =>
-            g._category === '2D' || (g.section_properties && Object.keys(g.section_properties).length > 0)
+            g._category === '2D' || (g.section_properties && Object.keys(g.section_properties).length > 0 && !this.isFemPending(g))
         )
     }
 
@@ -91,6 +111,11 @@ export class GeometryIntelligence {
             errors.push(`Missing section properties for beams: ${beamsWithoutProperties.map(g => g.group).join(', ')}`)
         }
 
+        const beamsPendingFem = geometries.filter(g => this.isFemPending(g))
+        if (beamsPendingFem.length > 0) {
+            errors.push(`FEM section properties still computing for beams: ${beamsPendingFem.map(g => g.group).join(', ')}`)
+        }
+
         // Check for duplicate groups
         const groupNames = geometries.map(g => g.group)
         const duplicates = groupNames.filter((name, index) => groupNames.indexOf(name) !== index)
@@ -15,6 +15,7 @@ a = Analysis(
         'flask_cors',
         'webview',
         'jinja2',
+        'services.section_extractor',  # section worker (app.py --section-worker)
     ],
     hookspath=[],
     hooksconfig={},
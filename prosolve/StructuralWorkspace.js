@@ -2,6 +2,8 @@ const { useState, useEffect } = React;
 
 // API Configuration
 const API_BASE = 'http://localhost:5000/api';
+// Limite do texto acumulado no console de simulação
+const MAX_LOG_CHARS = 200000;
 
 // GLOBAL STATE MANAGER - Shared across all components
 window.projectState = window.projectState || {
@@ -575,6 +577,7 @@ function StructuralApp({ onBack, onToggleMaximize, projectPath, setProjectPath }
     // EFFECT: Polling logs if running
     useEffect(() => {
         let pollInterval;
+        let logOffset = null;
 
         if (isPolling && projectPath) {
             console.log("[Global Polling] Starting log polling...");
@@ -583,12 +586,15 @@ function StructuralApp({ onBack, onToggleMaximize, projectPath, setProjectPath }
                     const response = await fetch(`${API_BASE}/get_logs`, {
                         method: 'POST',
                         headers: { 'Content-Type': 'application/json' },
-                        body: JSON.stringify({ folder_path: projectPath })
+                        body: JSON.stringify({ folder_path: projectPath, offset: logOffset })
                     });
 
                     if (response.ok) {
                         const data = await response.json();
-                        setSimLogs(data.logs);
+                        // Só as linhas novas: acumula (limitado) em vez de substituir
+                        if (data.offset === null || logOffset === null) setSimLogs(data.logs);
+                        else if (data.logs) setSimLogs(prev => (prev + data.logs).slice(-MAX_LOG_CHARS));
+                        logOffset = data.offset;
                         setSimStatus(data.status);
 
                         if (data.status === 'SUCCESS' || data.status === 'FAILED') {
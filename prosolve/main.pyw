@@ -34,6 +34,11 @@ import base64
 
 # --- CONFIGURAÇÃO GERAL ---
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Serviços compartilhados com o backend (tail incremental dos logs, fila de simulações)
+sys.path.insert(0, os.path.join(os.path.dirname(BASE_DIR), "backend"))
+from services.simulation_logs import get_log_tail
+from services.simulation_scheduler import get_simulation_scheduler
 CONFIG_FILE = os.path.join(BASE_DIR, "config.txt")
 
 def get_config_value(key):
@@ -205,20 +210,14 @@ def init_aster_files(folder_path, mesh_files):
     return True
 
 def run_simulation_async(folder_path):
-    """Chama o wrapper run_aster.py passando o arquivo export"""
-    # Procura run_aster.py na mesma pasta do main.pyw
-    script_path = os.path.join(BASE_DIR, "run_aster.py")
-    python_exe = sys.executable 
+    """Coloca o export na fila de simulações (mesmos limites de núcleos/memória do backend)"""
+    aster_bin = get_config_value("ASTER_BIN")
     
     # Caminho do export
     export_file = os.path.join(folder_path, "simulation_files", "export.export")
     
-    print(f"[ASTER] Disparando Code_Aster...")
-    print(f"        Wrapper: {script_path}")
-    print(f"        Export:  {export_file}")
-    
-    if not os.path.exists(script_path):
-        print(f"[ASTER] [ERRO] run_aster.py não encontrado.")
+    if not aster_bin or not os.path.exists(aster_bin):
+        print(f"[ASTER] [ERRO] ASTER_BIN não configurado ou não encontrado: {aster_bin}")
         return False
         
     if not os.path.exists(export_file):
@@ -226,10 +225,9 @@ def run_simulation_async(folder_path):
         return False
 
     try:
-        # Chama o wrapper Python em um NOVO CONSOLE para ser visível
-        subprocess.Popen([python_exe, script_path, export_file], 
-                         close_fds=True, 
-                         creationflags=subprocess.CREATE_NEW_CONSOLE if os.name == 'nt' else 0)
+        # Saída do as_run em simulation_files/run_<job id>.log (antes: novo console via run_aster.py)
+        job = get_simulation_scheduler().submit(folder_path, export_file, aster_bin)
+        print(f"[ASTER] Simulação {job['id']} na fila ({job['status']}): {export_file}")
         return True
     except Exception as e:
         print(f"[API] Error triggering simulation: {e}")
@@ -308,23 +306,20 @@ def api_get_logs():
     # Logs em simulation_files
     aster_log = os.path.join(folder_path, "simulation_files", "message")
     
-    combined_logs = ""
-    status = "RUNNING" 
-    
-    if os.path.exists(aster_log):
-        try:
-            with open(aster_log, 'r', encoding='utf-8', errors='ignore') as f:
-                lines = f.readlines()
-                combined_logs += "".join(lines[-100:])
-                full = "".join(lines)
-                if "EXECUTION_CODE_ASTER_EXIT_0000=0" in full: status = "SUCCESS"
-                elif "EXIT_STATUS=0" in full: status = "SUCCESS"
-                elif "<F>" in full or "FATAL" in full: status = "FAILED"
-        except: pass
-    else:
-        combined_logs = "Waiting for Code_Aster logs..."
-
-    return jsonify({"status": status, "logs": combined_logs})
+    # Leitura incremental: só os bytes novos desde o offset enviado pelo cliente. O offset só é lembrado
+    # no servidor com um client_id explícito (body ou ?client=): clientes locais têm o mesmo remote_addr
+    client_id = data.get('client_id') or request.args.get('client')
+    result = get_log_tail().poll(aster_log, client_id=client_id, offset=data.get('offset'))
+    if not result["exists"]:
+        return jsonify({"status": "RUNNING", "logs": "Waiting for Code_Aster logs...", "offset": None})
+
+    return jsonify({
+        "status": result["status"],
+        "logs": result["lines"],
+        "offset": result["offset"],
+        "alarms": result["alarms"],
+        "errors": result["error_lines"]
+    })
 
 # --- BROWSE NATIVO ---
 class BROWSEINFO(ctypes.Structure):
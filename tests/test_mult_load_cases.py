@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+MACRO_ELAS_MULT load cases (meca_statique.load_case_mode = "MULT")
+All cases share one result: case k is written to resu.med at time step (k, k), so the
+/post readers must read each field at its own iteration, not at (1, 1).
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).parent.parent / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / "services" / "med"))
+
+from services.jinja.generate_comm import generate_comm, prepare_study
+from services.jinja.builders.load_cases import _nom_cas_names
+
+CASE_1 = "DEAD LOAD CASE NUMBER 1"
+CASE_2 = "DEAD LOAD CASE NUMBER 2"
+
+
+def mult_project():
+    """Two-case beam study: same supports, one load per case (MULT applies)."""
+    beam = {
+        "group": "BEAM", "type": "POU_D_T", "phenomenon": "MECANIQUE", "_category": "1D",
+        "section_type": "BEAM", "profile_type": "I_SECTION",
+        "section_params": {"h": 200, "tw": 6.3, "bf_top": 100, "tf_top": 8, "bf_bot": 100, "tf_bot": 8},
+        "section_properties": {"Area (A)": 2759.2, "Iyy (Local)": 1.337e6, "Izz (Local)": 1.802e7, "Torsion J": 3.5e4}
+    }
+    return {
+        "meshes": [{"name": "beam", "filename": "beam.med"}],
+        "geometries": [beam],
+        "materials": [{"name": "S355", "E": 2.1e11, "nu": 0.3, "rho": 7850, "assignedGroups": ["BEAM"]}],
+        "restrictions": [{"name": "BC_1", "group": "SUPPORT", "dof": {"DX": 0, "DY": 0, "DZ": 0, "DRX": 0, "DRY": 0, "DRZ": 0}}],
+        "loads": [
+            {"name": "GRAV", "type": "PESANTEUR", "direction": [0, 0, -1], "gravite": 9.81},
+            {"name": "F_TIP", "type": "FORCE_NODALE", "group": "TIP", "fx": 100}
+        ],
+        "load_cases": [
+            {"name": CASE_1, "loads": ["GRAV"], "restrictions": ["BC_1"]},
+            {"name": CASE_2, "loads": ["CHARGE_NOD"], "restrictions": ["BC_1"]}
+        ],
+        "meca_statique": {"meca_statique": {"load_case_mode": "MULT"}}
+    }
+
+
+def test_nom_cas_unique_after_suffix():
+    # The 3rd name is truncated onto the 2nd, its suffixed form onto the 1st
+    names = _nom_cas_names(["X" * 14 + "_3", "X" * 16, "X" * 17])
+    assert len(set(names)) == 3
+    assert all(len(n) <= 16 for n in names)
+
+
+def test_mult_study_renders_both_cases():
+    study = prepare_study(mult_project())
+    runs = study["lc_data"]["runs"]
+    assert study["lc_data"]["mult"] is not None
+    assert [r["result_name"] for r in runs] == ["RESU_MULT", "RESU_MULT"]
+    assert runs[0]["nom_cas"] != runs[1]["nom_cas"]
+
+    comm = generate_comm(mult_project())
+    assert comm.count("MACRO_ELAS_MULT(") == 1
+    case_2 = runs[1]["case_name"]
+    assert f"NOM_CAS='{runs[1]['nom_cas']}'" in comm
+    assert f"'DEPL_{case_2}'" in comm
+
+
+def _write_mult_resu(path, case_names):
+    """resu.med as IMPR_RESU writes a MACRO_ELAS_MULT result: case k at iteration (k, k)."""
+    ml = pytest.importorskip("MEDLoader")
+    mesh = ml.MEDCouplingUMesh("MAIL", 1)
+    mesh.setCoords(ml.DataArrayDouble([0, 0, 0, 1, 0, 0, 2, 0, 0], 3, 3))
+    mesh.allocateCells(2)
+    mesh.insertNextCell(ml.NORM_SEG2, [0, 1])
+    mesh.insertNextCell(ml.NORM_SEG2, [1, 2])
+    mesh.finishInsertingCells()
+    ml.WriteUMesh(str(path), mesh, True)
+    for k, case_name in enumerate(case_names, start=1):
+        for prefix in ("DEPL_", "VM_"):
+            field = ml.MEDCouplingFieldDouble(ml.ON_NODES, ml.ONE_TIME)
+            field.setName(prefix + case_name)
+            field.setMesh(mesh)
+            field.setArray(ml.DataArrayDouble([float(k)] * 9, 3, 3))
+            field.setTime(float(k), k, k)
+            ml.WriteFieldUsingAlreadyWrittenMesh(str(path), field)
+
+
+def test_mult_case_2_read_back(tmp_path):
+    runs = prepare_study(mult_project())["lc_data"]["runs"]
+    resu = tmp_path / "resu.med"
+    _write_mult_resu(resu, [r["case_name"] for r in runs])
+    case_2 = runs[1]["case_name"]
+
+    import med_analysis_report
+    import med_analysis_service
+
+    report = med_analysis_report.get_field_report(str(resu), f"DEPL_{case_2}")
+    assert report["status"] == "success", report
+    assert report["data"]["values"] == [2.0] * 9
+
+    data = med_analysis_service.get_field_data(str(resu), f"VM_{case_2}")
+    assert data["status"] == "success", data
+    assert data["data"] == [2.0] * 3